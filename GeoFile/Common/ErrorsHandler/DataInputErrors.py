@@ -8,12 +8,13 @@ import logging
 import os
 import shutil
 import tempfile
-import geopandas as gpd
+from concurrent.futures.process import BrokenProcessPool
 
 from pyproj.exceptions import CRSError
 from pyogrio.errors import DataSourceError
 from pandas.errors import EmptyDataError, ParserError
 
+from GeoFile.Tools.LayerReadTools import read_vector
 from connection_manager import manager
 
 
@@ -146,9 +147,13 @@ class CRSErrorHandler(BaseErrorHandler):
             prj_removed = True
             logging.info(f"已临时移除PRJ文件: {prj_path} → {temp_prj.name}")
 
-        # 尝试重新读取数据（无.prj文件状态）
+        # 尝试重新读取数据（无.prj文件状态），与画像相同，在文件解析进程中读取，不阻塞事件循环
+        from GeoFile.Processors.DataInputProcessor import worker_pool
         try:
-            gdf = gpd.read_file(self.file_path)
+            gdf = await worker_pool.run(read_vector, self.file_path)
+        except (TimeoutError, BrokenProcessPool):
+            # 超时和进程异常退出由对应的异常处理器报告
+            raise
         except Exception as read_error:
             # 生成详细错误报告
             error_info = {
@@ -254,6 +259,46 @@ class ExcelReadErrorHandler(BaseErrorHandler):
         })
 
 
+class TimeoutErrorHandler(BaseErrorHandler):
+    """文件解析超时处理"""
+    ERROR_TYPE = TimeoutError
+
+    def build_error_info(self):
+        self.error_info.update({
+            "原因": "文件解析超时",
+            "技术诊断": [
+                f"文件路径: {self.file_path}",
+                f"详细消息: {str(self.error_obj)}",
+                "解析任务已被终止，未影响其他请求"
+            ],
+            "修复建议": [
+                "1. 确认文件大小及要素数量是否过大",
+                "2. 在配置文件中调大“文件解析超时时间”",
+                "3. 将数据裁剪或拆分后分别上传"
+            ]
+        })
+
+
+class WorkerCrashErrorHandler(BaseErrorHandler):
+    """文件解析进程异常退出处理"""
+    ERROR_TYPE = BrokenProcessPool
+
+    def build_error_info(self):
+        self.error_info.update({
+            "原因": "文件解析进程异常退出",
+            "技术诊断": [
+                f"文件路径: {self.file_path}",
+                f"详细消息: {str(self.error_obj)}",
+                "解析进程已重建，未影响其他请求"
+            ],
+            "修复建议": [
+                "1. 检查文件完整性（必须包含.shp/.shx/.dbf等）",
+                "2. 使用QGIS打开文件验证数据有效性",
+                "3. 重新导出数据后再次上传"
+            ]
+        })
+
+
 class GeoFileErrorFactory:
     """异常处理工厂"""
     HANDLERS = {
@@ -264,6 +309,8 @@ class GeoFileErrorFactory:
             DataSourceErrorHandler,
             CSVReadErrorHandler,
             ExcelReadErrorHandler,
+            TimeoutErrorHandler,
+            WorkerCrashErrorHandler,
             ValueErrorHandler
         ]
     }
@@ -0,0 +1,170 @@
+# GeoFile/Common/ProfileCache.py
+"""
+文件画像缓存模块
+
+以文件指纹（绝对路径、大小、修改时间，以及.dbf/.shx/.prj/.cpg等同名附属文件的大小和修改时间）为键缓存画像结果；
+内存LRU在前，SQLite持久化在后，判断命中只需stat文件，不会打开文件；
+命中时只在内存中记录使用顺序，写入缓存或关闭时再批量落盘
+"""
+import glob
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class ProfileCache:
+    """指纹校验的文件画像缓存"""
+
+    def __init__(self, path: str, max_entries: int = 256, max_disk_entries: int = 10000):
+        """
+        :param path: SQLite缓存文件路径
+        :param max_entries: 内存中保留的条目数
+        :param max_disk_entries: 磁盘中保留的条目数，超出后淘汰最久未使用的条目
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._tick = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS profiles ("
+            "  path TEXT PRIMARY KEY,"
+            "  fingerprint TEXT NOT NULL,"
+            "  result TEXT NOT NULL,"
+            "  last_used INTEGER NOT NULL"
+            ")"
+        )
+        self._conn.commit()
+        self._count, self._tick = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(MAX(last_used), 0) FROM profiles"
+        ).fetchone()
+        # 尚未落盘的使用顺序：路径 -> 最近一次使用的计数
+        self._touched = {}
+
+    @staticmethod
+    def fingerprint(file_path: str, options: dict = None) -> Optional[str]:
+        """
+        计算文件指纹，文件不存在时返回None
+
+        shapefile等多文件格式的属性、索引、投影保存在同名附属文件中，附属文件变化同样会使指纹变化
+
+        :param options: 影响画像结果的选项（画像层级、输出格式版本等），选项变化同样会使指纹变化
+        """
+        file_path = os.path.abspath(file_path)
+        if not os.path.isfile(file_path):
+            return None
+        stem = os.path.splitext(file_path)[0]
+        files = {file_path, *glob.glob(glob.escape(stem) + ".*")}
+        parts = []
+        for path in sorted(files):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            parts.append([os.path.basename(path).lower(), stat.st_size, stat.st_mtime_ns])
+        payload = json.dumps([file_path, parts, options or {}], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, file_path: str, fingerprint: str) -> Optional[Any]:
+        """读取缓存，指纹不一致（文件已变化）时视为未命中"""
+        key = os.path.abspath(file_path)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                row = self._conn.execute(
+                    "SELECT fingerprint, result FROM profiles WHERE path = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    entry = (row[0], json.loads(row[1]))
+                    self._remember(key, entry)
+
+            if entry is None or entry[0] != fingerprint:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._memory.move_to_end(key)
+            self._tick += 1
+            self._touched[key] = self._tick
+            return entry[1]
+
+    def put(self, file_path: str, fingerprint: str, result: Any) -> None:
+        """
+        写入缓存
+
+        :param fingerprint: 开始处理前计算的指纹，处理期间文件发生变化时下次读取自然失效
+        :param result: 可JSON序列化的画像结果
+        """
+        key = os.path.abspath(file_path)
+        try:
+            payload = json.dumps(result, ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            logging.warning(f"文件画像无法序列化，不写入缓存: {e}")
+            return
+
+        with self._lock:
+            self._remember(key, (fingerprint, result))
+            self._tick += 1
+            exists = self._conn.execute("SELECT 1 FROM profiles WHERE path = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO profiles (path, fingerprint, result, last_used) VALUES (?, ?, ?, ?)",
+                (key, fingerprint, payload, self._tick)
+            )
+            if not exists:
+                self._count += 1
+            self._touched.pop(key, None)
+            self._flush_touched()
+            if self._count > self.max_disk_entries:
+                # 淘汰到容量的90%，避免每次写入都触发淘汰
+                evict = self._count - int(self.max_disk_entries * 0.9)
+                self._conn.execute(
+                    "DELETE FROM profiles WHERE path IN "
+                    "(SELECT path FROM profiles ORDER BY last_used ASC LIMIT ?)",
+                    (evict,)
+                )
+                self._count -= evict
+            self._conn.commit()
+
+    def _flush_touched(self) -> None:
+        """将内存中记录的使用顺序写入数据库（调用方持有锁并负责提交）"""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE profiles SET last_used = ? WHERE path = ?",
+                [(tick, key) for key, tick in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def _remember(self, key: str, entry: tuple) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "memory_entries": len(self._memory),
+            "disk_entries": self._count,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+            self._conn.close()
@@ -4,20 +4,44 @@
 
 提供标准化的成功/错误响应格式生成功能
 """
+import asyncio
 import json
 import logging
+import multiprocessing
 import os
 import pandas as pd
-import geopandas as gpd
 from itertools import combinations
 from abc import ABC, abstractmethod
 
 from GeoFile.Common.ErrorsHandler.DataInputErrors import GeoFileErrorFactory
 from GeoFile.Common.Message import success
 from GeoFile.Common.Message import error
-from GeoFile.Tools.DataInputTools import classify_field_type
+from GeoFile.Common.ProfileCache import ProfileCache
+from GeoFile.Processors.WorkerPool import WorkerPool
+from GeoFile.Tools.DataInputTools import classify_dtype, classify_field_type
+from GeoFile.Tools.LayerReadTools import pyogrio, read_attributes, read_layer_info, read_vector
+from GeoFile.Tools.StreamingProfiler import profile_csv
 from connection_manager import manager
 
+with open('config.json', 'r', encoding='utf-8') as configFile:
+    config = json.load(configFile)
+
+# 文件画像缓存：文件及其附属文件未变化时直接返回上次的画像，不再读取文件；
+# 只在主进程中使用，文件解析进程导入本模块时不打开缓存文件
+profile_cache = ProfileCache(
+    config.get("文件画像缓存路径", os.path.join("cache", "geofile_profiles.sqlite3")),
+    max_entries=config.get("文件画像缓存容量", 256)
+) if multiprocessing.parent_process() is None else None
+
+# 画像输出格式版本，画像内容或格式变化时递增，使已缓存的旧画像失效
+PROFILE_FORMAT_VERSION = 2
+
+# 文件解析进程池：读取和统计在独立进程中执行，不阻塞事件循环
+worker_pool = WorkerPool(
+    max_workers=config.get("文件解析进程数", 2),
+    timeout=config.get("文件解析超时时间", 300)
+)
+
 
 class BaseFileProcessor(ABC):
     """文件处理器基类"""
@@ -45,6 +69,11 @@ class BaseFileProcessor(ABC):
         """检查扩展名是否支持"""
         return self.extension in self.SUPPORTED_EXTENSIONS
 
+    @classmethod
+    def cache_options(cls) -> dict:
+        """影响画像结果的配置项，作为画像缓存键的一部分"""
+        return {}
+
     @abstractmethod
     async def core(self):
         """处理入口方法（需子类实现）"""
@@ -56,13 +85,80 @@ class ShpProcessor(BaseFileProcessor):
 
     SUPPORTED_EXTENSIONS = ['.shp']
 
+    @classmethod
+    def cache_options(cls) -> dict:
+        return {
+            "level": config.get("文件画像层级", "attributes"),
+            "geometry_stats": config.get("文件画像几何统计", False)
+        }
+
     async def core(self):
-        gdf = gpd.read_file(self.file_path)
-        return await self.process(gdf)
+        # 读取和统计在工作进程中执行
+        summary, result_msg = await worker_pool.run(
+            profile_shapefile, self.file_path,
+            level=config.get("文件画像层级", "attributes"),
+            geometry_stats=config.get("文件画像几何统计", False)
+        )
+        return await self._publish(summary, result_msg)
 
     async def process(self, gdf):
+        """处理已读取的数据（如坐标系修复后重新读取的数据）"""
+        loop = asyncio.get_running_loop()
+        summary, result_msg = await loop.run_in_executor(None, self.summarize, gdf, self.file_path)
+        return await self._publish(summary, result_msg)
+
+    @staticmethod
+    async def _publish(summary: dict, result_msg: str) -> str:
+        # 发送处理结果
+        await manager.send_message(result_msg)
+
+        # 记录原始数据
+        logging.info(f"SHP处理原始数据：{json.dumps(summary, indent=2, default=str)}")
+
+        return result_msg
+
+    @staticmethod
+    def summarize(gdf, file_path: str) -> tuple:
+        """
+        根据完整读取的GeoDataFrame生成数据画像（同步执行，可在工作进程中调用）
+
+        :return: (原始统计数据, 格式化的画像文本)
+        """
+        file_info = {
+            "crs": str(gdf.crs),
+            "geometry_type": gdf.geometry.type.unique().tolist(),
+            "total_features": len(gdf),
+            "bounds": gdf.total_bounds
+        }
+        return ShpProcessor._summarize(file_path, file_info, gdf.drop(columns=gdf.geometry.name))
+
+    @staticmethod
+    def summarize_layer(info: dict, attributes, file_path: str) -> tuple:
+        """
+        根据图层元数据和属性表生成数据画像，不需要读取几何
+
+        :param info: read_layer_info 返回的图层元数据
+        :param attributes: 不含几何的属性表，为None时只根据字段结构列出字段类型
+        :return: (原始统计数据, 格式化的画像文本)
+        """
+        file_info = {
+            "crs": str(info["crs"]),
+            "geometry_type": [info["geometry_type"]] if info["geometry_type"] else [],
+            "total_features": info["features"],
+            "bounds": info["total_bounds"]
+        }
+        schema = None if attributes is not None else dict(zip(info["fields"], info["dtypes"]))
+        return ShpProcessor._summarize(file_path, file_info, attributes, schema)
+
+    @staticmethod
+    def _summarize(file_path: str, file_info: dict, attributes, schema: dict = None) -> tuple:
+        """
+        :param file_info: 坐标系、几何类型、要素数及范围
+        :param attributes: 不含几何的属性表
+        :param schema: 未读取属性表时的 {字段名: 类型}
+        """
         # 计算坐标范围
-        bounds = gdf.total_bounds
+        bounds = file_info["bounds"]
         coord_range = {
             "min_lon": bounds[0],
             "max_lon": bounds[2],
@@ -73,10 +169,10 @@ class ShpProcessor(BaseFileProcessor):
         # 构建特征摘要
         summary = {
             "file_info": {
-                "file_name": os.path.basename(self.file_path),
-                "crs": str(gdf.crs),
-                "geometry_type": gdf.geometry.type.unique().tolist(),
-                "total_features": len(gdf),
+                "file_name": os.path.basename(file_path),
+                "crs": file_info["crs"],
+                "geometry_type": file_info["geometry_type"],
+                "total_features": file_info["total_features"],
                 "coord_range": coord_range
             },
             "attributes": {
@@ -89,29 +185,33 @@ class ShpProcessor(BaseFileProcessor):
             }
         }
 
-        # 分析每个字段
-        for col in gdf.columns:
-            if col == 'geometry':
-                summary['attributes']['special_fields']['Geometry'].append({
-                    "type": "Geometry",
-                    "count": len(gdf)
-                })
-                continue
+        summary['attributes']['special_fields']['Geometry'].append({
+            "type": "Geometry",
+            "count": file_info["total_features"]
+        })
+
+        # 只有字段结构时仅记录字段类型
+        if schema is not None:
+            for col, dtype in schema.items():
+                summary['attributes']['fields'][col] = {"type": classify_dtype(dtype)}
+            attributes = pd.DataFrame()
 
-            field_type = classify_field_type(gdf[col].dtype, gdf[col])
+        # 分析每个字段
+        for col in attributes.columns:
+            field_type = classify_field_type(attributes[col].dtype, attributes[col])
             stats = {}
 
             # 数值型处理
             if field_type in ["Float", "Double", "Short Integer", "Long Integer"]:
                 stats = {
                     "type": field_type,
-                    "min": gdf[col].min(),
-                    "max": gdf[col].max(),
-                    "mean": gdf[col].mean()
+                    "min": attributes[col].min(),
+                    "max": attributes[col].max(),
+                    "mean": attributes[col].mean()
                 }
             # 文本型处理
             elif field_type == "Text":
-                unique_values = gdf[col].dropna().unique()
+                unique_values = attributes[col].dropna().unique()
                 stats = {
                     "type": "Text",
                     "unique_count": len(unique_values),
@@ -121,14 +221,14 @@ class ShpProcessor(BaseFileProcessor):
             elif field_type == "Date":
                 stats = {
                     "type": "Date",
-                    "min": gdf[col].min().strftime("%Y-%m-%d"),
-                    "max": gdf[col].max().strftime("%Y-%m-%d")
+                    "min": attributes[col].min().strftime("%Y-%m-%d"),
+                    "max": attributes[col].max().strftime("%Y-%m-%d")
                 }
             # 特殊字段处理
             elif col.lower() in ['fid', 'objectid']:
                 summary['attributes']['special_fields']['ObjectID'].append({
                     "type": "Long Integer",
-                    "count": len(gdf[col].unique())
+                    "count": len(attributes[col].unique())
                 })
                 continue
 
@@ -150,7 +250,9 @@ class ShpProcessor(BaseFileProcessor):
 
         # 添加字段详细信息
         for col, stats in summary['attributes']['fields'].items():
-            if stats['type'] in ["Float", "Double", "Short Integer", "Long Integer"]:
+            if len(stats) == 1:
+                output.append(f"    - 字段 [{col}]：{stats['type']}类型")
+            elif stats['type'] in ["Float", "Double", "Short Integer", "Long Integer"]:
                 output.append(
                     f"    - 数值字段 [{col}]（{stats['type']}）："
                     f"平均 {stats['mean']:.2f} | 最大 {stats['max']} | 最小 {stats['min']}"
@@ -173,14 +275,7 @@ class ShpProcessor(BaseFileProcessor):
                     f"    - 系统字段 [{field_type}]：{entry['type']}类型，共{entry['count']}条记录"
                 )
 
-        # 发送处理结果
-        result_msg = "\n".join(output)
-        await manager.send_message(result_msg)
-
-        # 记录原始数据
-        logging.info(f"SHP处理原始数据：{json.dumps(summary, indent=2)}")
-
-        return result_msg
+        return summary, "\n".join(output)
 
 
 class TabularProcessor(BaseFileProcessor):
@@ -188,12 +283,24 @@ class TabularProcessor(BaseFileProcessor):
 
     SUPPORTED_EXTENSIONS = ['.csv', '.txt', '.xlsx', '.xls']
 
+    CHINA_LON_RANGE = (73.66, 135.05)
+    CHINA_LAT_RANGE = (18.15, 53.55)
+
+    @classmethod
+    def cache_options(cls) -> dict:
+        # 超过精确计数上限或样本容量的大文件，唯一值数量和坐标列识别依赖这些配置
+        return {
+            "exact_limit": config.get("流式画像精确计数上限", 50000),
+            "sample_size": config.get("流式画像样本容量", 100000)
+        }
+
     def __init__(self, file_path: str):
         super().__init__(file_path)
         self.lon_col = None
         self.lat_col = None
         self.header_mode = None
         self.df = None
+        self.columns = []
 
     def detect_col(self, target_type: str):
         """
@@ -214,7 +321,7 @@ class TabularProcessor(BaseFileProcessor):
 
         # 尝试匹配列名
         for candidate in auto_detect_map[target_type]:
-            if candidate in self.df.columns:
+            if candidate in self.columns:
                 return candidate
 
         # 无表头模式返回默认列索引
@@ -224,71 +331,115 @@ class TabularProcessor(BaseFileProcessor):
         return None
 
     async def core(self):
+        # 读取和统计在工作进程中执行
+        result_msg = await worker_pool.run(profile_tabular, self.file_path, self.lon_col, self.lat_col)
+
+        # ================= 结果推送 =================
+        await manager.send_message(result_msg)
+
+        return result_msg
+
+    def profile(self) -> str:
+        """生成数据画像（同步执行，可在工作进程中调用）"""
         # ================= 文件验证 =================
         if not os.path.exists(self.file_path):
             raise FileNotFoundError
         file_ext = os.path.splitext(self.file_path)[1].lower()
 
-        # ================= 数据加载 =================
+        # ================= 数据加载及分析 =================
         if file_ext in ['.xlsx', '.xls']:
             self.df = pd.read_excel(self.file_path)
-        elif file_ext in ['.txt', '.csv']:
-            sep = '\t' if file_ext == '.txt' else ','
-            self.df = pd.read_csv(self.file_path, sep=sep, engine='python')
+            self.columns = list(self.df.columns)
+            analysis = self._analyze_frame(file_ext)
+        else:
+            # CSV/TXT分块流式统计，内存占用与文件大小无关
+            analysis = self._analyze_stream(file_ext)
 
-        # ================= 坐标字段检测 =================
+        return self._format(analysis)
+
+    def _detect_by_name(self):
+        """按列名检测坐标列"""
         if self.lon_col is None or self.lat_col is None:
             try:
-                self.header_mode = not self.df.columns.str.contains('^Unnamed').all()
+                self.header_mode = not pd.Index(self.columns).str.contains('^Unnamed').all()
             except AttributeError as e:
                 self.header_mode = True
 
             self.lon_col = self.detect_col('lon') or (0 if not self.header_mode else None)
             self.lat_col = self.detect_col('lat') or (1 if not self.header_mode else None)
 
+    def _select_coordinate_pair(self, numeric_cols: list, sample_size: int, range_ratio, median):
+        """
+        按取值范围在数值列中选择经纬度列
+
+        :param numeric_cols: 全部取值均为数值的列
+        :param sample_size: 数据行数
+        :param range_ratio: (列, 范围序号) -> 落入范围的比例，范围序号0为经度、1为纬度
+        :param median: 列 -> 中位数
+        """
+        if not numeric_cols:
+            raise ValueError("数据中未找到有效的数值列")
+
+        ranges = [self.CHINA_LON_RANGE, self.CHINA_LAT_RANGE]
+        candidate_pairs = []
+        confidence = 0.8 if sample_size < 1000 else 0.95
+
+        def is_valid_range(col, index):
+            target_range = ranges[index]
+            return (
+                    (range_ratio(col, index) > confidence) and
+                    (abs(median(col) - (target_range[0] + target_range[1]) / 2) < 5
+                     ))
+
+        # 遍历所有列组合
+        for col1, col2 in combinations(numeric_cols, 2):
+            try:
+                if is_valid_range(col1, 0) and is_valid_range(col2, 1):
+                    candidate_pairs.append((col1, col2))
+                elif is_valid_range(col2, 0) and is_valid_range(col1, 1):
+                    candidate_pairs.append((col2, col1))
+            except TypeError as e:
+                pass
+
+        # 选择最佳候选对
+        if candidate_pairs:
+            # 优先选择置信度最高的列对
+            best_pair = max(candidate_pairs, key=lambda pair: range_ratio(pair[0], 0) + range_ratio(pair[1], 1))
+            self.lon_col, self.lat_col = best_pair
+            logging.info(f"智能选择坐标列：{self.lon_col}(经度), {self.lat_col}(纬度)")
+        else:
+            raise ValueError("3")
+
+    def _new_analysis(self, file_ext: str, total_points: int, coordinates_range: dict) -> dict:
+        return {
+            "file_info": {
+                "file_name": os.path.basename(self.file_path),
+                "file_type": file_ext.strip('.'),
+                "total_points": total_points,
+                "coordinates_range": coordinates_range
+            },
+            "attributes": {
+                "fields": {},
+                "system_fields": []
+            }
+        }
+
+    def _analyze_frame(self, file_ext: str) -> dict:
+        """分析整体读取的数据（Excel）"""
+        # ================= 坐标字段检测 =================
+        self._detect_by_name()
+
         # ================= 智能识别增强 =================
         if self.lon_col is None or self.lat_col is None:
             # 改进的数值列检测
             numeric_cols = self.df.apply(pd.to_numeric, errors='coerce').notnull().all()
             numeric_cols = numeric_cols[numeric_cols].index.tolist()
-
-            if not numeric_cols:
-                raise ValueError("数据中未找到有效的数值列")
-
-            CHINA_LON_RANGE = (73.66, 135.05)
-            CHINA_LAT_RANGE = (18.15, 53.55)
-            candidate_pairs = []
-            sample_size = len(self.df)
-            confidence = 0.8 if sample_size < 1000 else 0.95
-
-            def is_valid_range(col, target_range):
-                data = self.df[col].dropna()
-                return (
-                        (data.between(*target_range).mean() > confidence) and
-                        (abs(data.median() - (target_range[0] + target_range[1]) / 2) < 5
-                         ))
-
-            # 遍历所有列组合
-            for col1, col2 in combinations(numeric_cols, 2):
-                try:
-                    if is_valid_range(col1, CHINA_LON_RANGE) and is_valid_range(col2, CHINA_LAT_RANGE):
-                        candidate_pairs.append((col1, col2))
-                    elif is_valid_range(col2, CHINA_LON_RANGE) and is_valid_range(col1, CHINA_LAT_RANGE):
-                        candidate_pairs.append((col2, col1))
-                except TypeError as e:
-                    pass
-
-            # 选择最佳候选对
-            if candidate_pairs:
-                # 优先选择置信度最高的列对
-                best_pair = max(candidate_pairs, key=lambda pair: (
-                        self.df[pair[0]].between(*CHINA_LON_RANGE).mean() +
-                        self.df[pair[1]].between(*CHINA_LAT_RANGE).mean()
-                ))
-                self.lon_col, self.lat_col = best_pair
-                logging.info(f"智能选择坐标列：{self.lon_col}(经度), {self.lat_col}(纬度)")
-            else:
-                raise ValueError("3")
+            ranges = [self.CHINA_LON_RANGE, self.CHINA_LAT_RANGE]
+            self._select_coordinate_pair(
+                numeric_cols, len(self.df),
+                range_ratio=lambda col, index: self.df[col].dropna().between(*ranges[index]).mean(),
+                median=lambda col: self.df[col].dropna().median()
+            )
 
         # 验证坐标字段有效性
         for col, col_type in [(self.lon_col, "经度"), (self.lat_col, "纬度")]:
@@ -299,23 +450,12 @@ class TabularProcessor(BaseFileProcessor):
                 raise ValueError(err_msg)
 
         # ================= 数据分析 =================
-        analysis = {
-            "file_info": {
-                "file_name": os.path.basename(self.file_path),
-                "file_type": file_ext.strip('.'),
-                "total_points": len(self.df),
-                "coordinates_range": {
-                    "min_lon": self.df[self.lon_col].min(),
-                    "max_lon": self.df[self.lon_col].max(),
-                    "min_lat": self.df[self.lat_col].min(),
-                    "max_lat": self.df[self.lat_col].max()
-                }
-            },
-            "attributes": {
-                "fields": {},
-                "system_fields": []
-            }
-        }
+        analysis = self._new_analysis(file_ext, len(self.df), {
+            "min_lon": self.df[self.lon_col].min(),
+            "max_lon": self.df[self.lon_col].max(),
+            "min_lat": self.df[self.lat_col].min(),
+            "max_lat": self.df[self.lat_col].max()
+        })
 
         # 处理每个字段
         for col in self.df.columns:
@@ -360,6 +500,88 @@ class TabularProcessor(BaseFileProcessor):
 
             analysis['attributes']['fields'][col] = stats
 
+        return analysis
+
+    def _analyze_stream(self, file_ext: str) -> dict:
+        """分块流式分析CSV/TXT，统计口径与整体读取一致"""
+        sep = '\t' if file_ext == '.txt' else ','
+        table = profile_csv(
+            self.file_path, sep=sep,
+            chunksize=config.get("流式画像分块行数", 100000),
+            ranges=[self.CHINA_LON_RANGE, self.CHINA_LAT_RANGE],
+            exact_limit=config.get("流式画像精确计数上限", 50000),
+            sample_size=config.get("流式画像样本容量", 100000),
+            engine=config.get("表格读取引擎", "pyarrow"),
+            block_size=config.get("Arrow读取块大小", 16 << 20)
+        )
+        self.columns = table.columns
+        profiles = table.profiles
+
+        # ================= 坐标字段检测 =================
+        self._detect_by_name()
+
+        # ================= 智能识别增强 =================
+        if self.lon_col is None or self.lat_col is None:
+            numeric_cols = [col for col in self.columns if profiles[col].numeric and not profiles[col].nulls]
+            self._select_coordinate_pair(
+                numeric_cols, table.rows,
+                range_ratio=lambda col, index: profiles[col].range_ratio(index),
+                median=lambda col: profiles[col].median()
+            )
+
+        # 验证坐标字段有效性
+        for col, col_type in [(self.lon_col, "经度"), (self.lat_col, "纬度")]:
+            if col not in profiles:
+                raise KeyError(col)
+            if not profiles[col].numeric:
+                err_msg = f"{col_type}字段 {col} 包含非数值数据"
+                raise ValueError(err_msg)
+
+        # ================= 数据分析 =================
+        lon, lat = profiles[self.lon_col], profiles[self.lat_col]
+        analysis = self._new_analysis(file_ext, table.rows, {
+            "min_lon": lon.min,
+            "max_lon": lon.max,
+            "min_lat": lat.min,
+            "max_lat": lat.max
+        })
+
+        # 处理每个字段
+        for col in self.columns:
+            if col in [self.lon_col, self.lat_col]:
+                continue  # 跳过坐标字段
+
+            profile = profiles[col]
+            field_type = profile.field_type()
+            stats = {}
+
+            # 数值型处理
+            if field_type in ["Double", "Short Integer", "Long Integer"]:
+                stats = {"type": field_type, **profile.stats()}
+            # 文本型处理
+            elif field_type == "Text":
+                unique_count = profile.distinct.count()
+                stats = {
+                    "type": "Text",
+                    "unique_count": unique_count,
+                    "sample_values": profile.samples[:3] if unique_count <= 3 else None
+                }
+            # 系统字段检测（唯一值计数包含缺失值）
+            elif col.lower() in ['id', 'fid', 'oid']:
+                analysis['attributes']['system_fields'].append({
+                    "name": col,
+                    "type": field_type,
+                    "count": profile.distinct.count() + (1 if profile.nulls else 0)
+                })
+                continue
+
+            analysis['attributes']['fields'][col] = stats
+
+        return analysis
+
+    @staticmethod
+    def _format(analysis: dict) -> str:
+        """生成画像文本"""
         # ================= 消息生成 =================
         output = [
             f"- 地理数据处理完成：{analysis['file_info']['file_name']}",
@@ -398,11 +620,33 @@ class TabularProcessor(BaseFileProcessor):
                 f"    - 系统字段 [{field['name']}]：{field['type']}类型，共{field['count']}条记录"
             )
 
-        # ================= 结果推送 =================
-        result_msg = "\n".join(output)
-        await manager.send_message(result_msg)
+        return "\n".join(output)
 
-        return result_msg
+
+def profile_shapefile(file_path: str, level: str = "attributes", geometry_stats: bool = False) -> tuple:
+    """
+    读取shapefile并生成画像（在工作进程中执行）
+
+    分两级：metadata 只读取图层元数据（坐标系、几何类型、要素数、范围、字段结构），不读取任何要素；
+    attributes 另外跳过几何读取属性表，计算字段统计；只有需要几何统计（按要素统计几何类型和范围）时才读取几何
+
+    :param level: 画像层级，metadata 或 attributes
+    :param geometry_stats: 是否读取几何进行统计
+    """
+    if geometry_stats or pyogrio is None:
+        gdf = read_vector(file_path)
+        return ShpProcessor.summarize(gdf, file_path)
+
+    info = read_layer_info(file_path)
+    attributes = read_attributes(file_path) if level != "metadata" else None
+    return ShpProcessor.summarize_layer(info, attributes, file_path)
+
+
+def profile_tabular(file_path: str, lon_col=None, lat_col=None) -> str:
+    """读取表格数据并生成画像（在工作进程中执行）"""
+    processor = TabularProcessor(file_path)
+    processor.lon_col, processor.lat_col = lon_col, lat_col
+    return processor.profile()
 
 
 class FileProcessorFactory:
@@ -415,22 +659,25 @@ class FileProcessorFactory:
 
     @classmethod
     async def create_processor(cls, file_path: str):
-        """创建处理器实例"""
-
-        ext = os.path.splitext(file_path)[1].lower()
-
-        if ext not in cls.PROCESSORS:
-            raise ValueError("2")
-        processor_class = cls.PROCESSORS[ext]
-        processor = processor_class(file_path)
-
-        process_result = await processor.core()
+        """创建处理器实例并生成文件画像，文件未变化时直接返回缓存的画像"""
         try:
             ext = os.path.splitext(file_path)[1].lower()
 
             if ext not in cls.PROCESSORS:
                 raise ValueError("2")
+
             processor_class = cls.PROCESSORS[ext]
+
+            # 按文件指纹查找缓存，只需stat文件；画像配置或输出格式变化时指纹随之变化
+            fingerprint = profile_cache.fingerprint(
+                file_path, {"version": PROFILE_FORMAT_VERSION, **processor_class.cache_options()}
+            )
+            if fingerprint is not None:
+                cached = profile_cache.get(file_path, fingerprint)
+                if cached is not None:
+                    logging.info(f"文件画像缓存命中：{file_path}")
+                    return await success(cached)
+
             processor = processor_class(file_path)
 
             try:
@@ -441,7 +688,11 @@ class FileProcessorFactory:
                 if isinstance(response, str):
                     return await error(response)
                 else:
-                    process_result = await processor.process()
+                    # 异常处理器修复后返回重新读取的数据
+                    process_result = await processor.process(response)
+
+            if fingerprint is not None:
+                profile_cache.put(file_path, fingerprint, process_result)
             return await success(process_result)
         except Exception as e:
             handler = GeoFileErrorFactory.get_handler(file_path, e)
@@ -0,0 +1,128 @@
+# GeoFile/Processors/WorkerPool.py
+"""
+文件解析进程池模块
+
+geopandas/pandas的读取和统计是CPU密集的同步操作，放到独立进程中执行，避免阻塞事件循环上的WebSocket和HTTP请求；
+任务只返回可序列化的画像摘要，支持单任务超时和取消：正在执行的任务超时或被取消时终止工作进程并重建进程池，
+因此中断的其他任务自动重新提交；工作进程异常退出时无法确定是哪个任务导致的，受影响的任务各自在单独的进程中重新执行
+"""
+import asyncio
+import functools
+import logging
+import multiprocessing
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
+
+
+class WorkerPool:
+    """带超时和取消的进程池"""
+
+    def __init__(self, max_workers: int = 2, timeout: float = 300, max_retries: int = 2):
+        """
+        :param max_workers: 工作进程数
+        :param timeout: 默认的单任务超时时间（秒），None表示不限制
+        :param max_retries: 任务因其他任务超时/取消导致进程池重建而中断时的最大重新提交次数
+        """
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._executor = None
+        self._lock = threading.Lock()
+        # 因超时/取消被主动终止的进程池，其中中断的其他任务并未出错，可以直接重新提交
+        self._terminated = weakref.WeakSet()
+
+    @staticmethod
+    def _create_executor(max_workers: int) -> ProcessPoolExecutor:
+        # 使用spawn启动，避免fork带有事件循环和线程的主进程
+        return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """首次使用时创建进程池"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._create_executor(self.max_workers)
+            return self._executor
+
+    @staticmethod
+    def _terminate(executor: ProcessPoolExecutor) -> None:
+        # ProcessPoolExecutor没有终止运行中任务的公开接口，只能直接结束工作进程
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _restart(self, executor: ProcessPoolExecutor, deliberate: bool = True) -> None:
+        """
+        终止进程池中的工作进程，下次提交任务时重新创建
+
+        :param deliberate: 是否因超时/取消主动终止
+        """
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+            if deliberate:
+                self._terminated.add(executor)
+        self._terminate(executor)
+        logging.warning("文件解析进程池已重建")
+
+    async def _await(self, executor: ProcessPoolExecutor, job: Callable, timeout: float, on_abort: Callable) -> Any:
+        """提交任务并等待结果，超时或被取消时调用 on_abort 终止正在执行的任务"""
+        future = executor.submit(job)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            if not future.cancel():
+                on_abort()
+            raise TimeoutError(f"文件解析超时（超过{timeout}秒）")
+        except asyncio.CancelledError:
+            # 调用方取消（如连接断开）时，尚未开始的任务直接取消，已开始的任务终止工作进程
+            if not future.cancel():
+                on_abort()
+            raise
+
+    async def _run_isolated(self, job: Callable, timeout: float) -> Any:
+        """在单独的进程中执行任务，只有任务自身导致进程退出时才报告异常"""
+        executor = self._create_executor(1)
+        try:
+            return await self._await(executor, job, timeout, on_abort=lambda: None)
+        except BrokenProcessPool as e:
+            raise BrokenProcessPool("文件解析进程异常退出") from e
+        finally:
+            self._terminate(executor)
+
+    async def run(self, func: Callable, *args, timeout: float = None, **kwargs) -> Any:
+        """
+        在工作进程中执行任务
+
+        :param func: 模块级函数（需可被pickle），返回值同样需要可序列化
+        :param timeout: 超时时间（秒），默认使用进程池的超时设置
+        :raises TimeoutError: 任务超时
+        :raises BrokenProcessPool: 任务导致工作进程异常退出（如读取文件时崩溃）
+        """
+        timeout = self.timeout if timeout is None else timeout
+        job = functools.partial(func, *args, **kwargs)
+        for attempt in range(self.max_retries + 1):
+            executor = self._get_executor()
+            try:
+                return await self._await(executor, job, timeout, on_abort=lambda: self._restart(executor))
+            except (BrokenProcessPool, RuntimeError) as e:
+                # 进程池已关闭/已损坏时提交或等待任务会抛出RuntimeError（BrokenProcessPool是其子类），
+                # 任务自身抛出的RuntimeError原样返回
+                if executor in self._terminated:
+                    if attempt < self.max_retries:
+                        logging.info(f"进程池已重建，重新提交文件解析任务（第{attempt + 1}次）")
+                        continue
+                elif not isinstance(e, BrokenProcessPool):
+                    raise
+                else:
+                    self._restart(executor, deliberate=False)
+                    return await self._run_isolated(job, timeout)
+                raise
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
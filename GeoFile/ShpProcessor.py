@@ -4,7 +4,6 @@ from connection_manager import manager
 from autogen_core.tools import FunctionTool
 from pyproj.exceptions import CRSError
 from pyogrio.errors import DataSourceError
-import geopandas as gpd
 import os
 import json
 import logging
@@ -15,6 +14,8 @@ from typing import Annotated
 from pydantic import Field
 from datetime import datetime
 
+from GeoFile.Tools.LayerReadTools import read_vector
+
 
 def classify_field_type(dtype, data):
     """详细字段类型分类判断"""
@@ -57,7 +58,7 @@ async def read_file(file_path: str):
 
         # 读取shp文件
         try:
-            gdf = gpd.read_file(file_path)
+            gdf = read_vector(file_path)
         except CRSError as crs_err:
             # 尝试自动修复无效的EPSG代码
             try:
@@ -307,7 +308,7 @@ async def handle_crs_error(file_path, error, manager):
         logging.info(f"已临时移除PRJ文件: {prj_path} → {temp_prj.name}")
 
     # 尝试重新读取数据（无.prj文件状态）
-    gdf = gpd.read_file(file_path)
+    gdf = read_vector(file_path)
 
     await manager.send_message(
         f"成功读取文件 {os.path.basename(file_path)}\n"
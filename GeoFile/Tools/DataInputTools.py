@@ -23,3 +23,21 @@ def classify_field_type(dtype, data):
             return "Text"
         return "BLOB"  # 实际shapefile不支持，保留识别能力
     return "Unknown"
+
+
+def classify_dtype(dtype):
+    """仅根据字段类型分类（未读取数据时使用，整数按位宽区分短整型和长整型）"""
+    dtype = np.dtype(dtype)
+    if np.issubdtype(dtype, np.floating):
+        if dtype == np.float32:
+            return "Float"
+        return "Double"
+    elif np.issubdtype(dtype, np.integer):
+        if dtype.itemsize <= 2:
+            return "Short Integer"
+        return "Long Integer"
+    elif np.issubdtype(dtype, np.datetime64):
+        return "Date"
+    elif dtype == object:
+        return "Text"
+    return "Unknown"
@@ -0,0 +1,62 @@
+# GeoFile/Tools/LayerReadTools.py
+"""
+矢量图层按需读取工具
+
+基于pyogrio：图层元数据只读取文件头（shapefile的要素数和范围记录在.shp/.shx头中），
+属性表读取时跳过几何；安装了pyarrow时按列以Arrow格式批量解码，避免逐要素构造Python对象
+"""
+import math
+
+import geopandas as gpd
+
+try:
+    import pyogrio
+except ImportError:  # pyogrio为可选依赖，未安装时调用方回退到完整读取
+    pyogrio = None
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_ARROW = True
+except ImportError:
+    HAS_ARROW = False
+
+
+def read_layer_info(file_path: str) -> dict:
+    """
+    读取图层元数据，不读取任何要素
+
+    :return: 包含 crs、geometry_type、features、total_bounds、fields、dtypes 的字典，
+             total_bounds 在空图层时为 NaN
+    """
+    info = pyogrio.read_info(file_path, force_feature_count=True, force_total_bounds=True)
+    bounds = info.get("total_bounds")
+    return {
+        "crs": info.get("crs"),
+        "geometry_type": info.get("geometry_type"),
+        "features": max(info.get("features", 0), 0),
+        "total_bounds": tuple(bounds) if bounds is not None else (math.nan,) * 4,
+        "fields": list(info.get("fields", [])),
+        "dtypes": list(info.get("dtypes", []))
+    }
+
+
+def read_vector(file_path: str, **kwargs):
+    """
+    读取矢量文件为GeoDataFrame，pyogrio和pyarrow可用时使用Arrow读取模式
+
+    :param kwargs: 传给 gpd.read_file 的其他参数
+    """
+    if pyogrio is not None and HAS_ARROW:
+        kwargs.setdefault("engine", "pyogrio")
+        kwargs.setdefault("use_arrow", True)
+    return gpd.read_file(file_path, **kwargs)
+
+
+def read_attributes(file_path: str, columns: list = None):
+    """
+    读取属性表，不读取几何
+
+    :param columns: 只读取的字段，None表示全部字段
+    :return: pandas.DataFrame
+    """
+    return pyogrio.read_dataframe(file_path, columns=columns, read_geometry=False, use_arrow=HAS_ARROW)
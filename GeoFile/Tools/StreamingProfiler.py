@@ -0,0 +1,404 @@
+# GeoFile/Tools/StreamingProfiler.py
+"""
+表格数据流式画像模块
+
+分块读取CSV/TXT（安装了pyarrow时使用Arrow多线程解码，直接在Arrow数组上统计；否则使用pandas的C解析引擎），
+每块更新各字段的在线统计后即释放：
+均值按Welford方法逐块合并，最小/最大值逐块比较，唯一值数量较少时精确计数、超过上限后转为HyperLogLog估计，
+数值字段保留蓄水池样本用于估计中位数；内存占用与文件大小无关。
+所有字段按字符串读取，字段类型按整体读取时pandas的推断规则在最后确定，
+唯一值和样本未超过上限的文件（即一般的小文件）统计结果与整体读取一致
+"""
+import logging
+import re
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.errors import ParserError
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow为可选依赖，未安装时使用pandas分块读取
+    pa = None
+
+# pandas推断为整数/浮点数/布尔类型的取值（数值解析时忽略首尾空白，inf/infinity不允许空白）；
+# Python的int()/float()还接受下划线分隔和全角等Unicode数字，pandas将这些取值视为文本，需先按模式校验
+_INTEGER_PATTERN = r"\s*[+-]?[0-9]+\s*"
+_NUMBER_PATTERN = r"(?:\s*[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?\s*|[+-]?(?i:inf|infinity))"
+_BOOL_TOKENS = {"True", "TRUE", "true", "False", "FALSE", "false"}
+# pandas默认识别为缺失值的取值，Arrow读取时使用相同的口径
+_NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"
+]
+# 字段数不一致时C解析引擎的报错，转换为整体读取（python解析引擎）时的报错格式
+_FIELD_COUNT_ERROR = re.compile(r"Expected (\d+) fields in line (\d+), saw (\d+)")
+# 按出现顺序保留的前几个唯一值，用于展示取值较少的文本字段
+_SAMPLE_LIMIT = 4
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """uint64数组每个元素的有效位数"""
+    values = values.copy()
+    length = np.zeros(values.shape, dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        mask = values >= (np.uint64(1) << np.uint64(shift))
+        length[mask] += shift
+        values[mask] >>= np.uint64(shift)
+    return length + (values > 0)
+
+
+class HyperLogLog:
+    """HyperLogLog基数估计，precision为14时相对误差约0.8%，占用16KB"""
+
+    def __init__(self, precision: int = 14):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = np.zeros(self.size, dtype=np.uint8)
+
+    def update(self, hashes: np.ndarray) -> None:
+        """:param hashes: uint64哈希值"""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        width = 64 - self.precision
+        index = (hashes >> np.uint64(width)).astype(np.int64)
+        rest = hashes & np.uint64((1 << width) - 1)
+        rank = (width - _bit_length(rest) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def count(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.size)
+        estimate = alpha * self.size ** 2 / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * self.size and zeros:
+            # 基数较小时使用线性计数修正
+            estimate = self.size * np.log(self.size / zeros)
+        return int(round(estimate))
+
+
+class DistinctCounter:
+    """唯一值计数：不超过 exact_limit 时精确计数，超过后转为HyperLogLog估计"""
+
+    def __init__(self, exact_limit: int = 50000, precision: int = 14):
+        self.exact_limit = exact_limit
+        self.precision = precision
+        self._values = set()
+        self._sketch = None
+
+    @property
+    def exact(self) -> bool:
+        return self._sketch is None
+
+    @staticmethod
+    def _hash(values: np.ndarray) -> np.ndarray:
+        return pd.util.hash_array(np.asarray(values, dtype=object))
+
+    def update(self, uniques: np.ndarray) -> None:
+        """:param uniques: 本块中的唯一值"""
+        if self._sketch is not None:
+            self._sketch.update(self._hash(uniques))
+            return
+        self._values.update(uniques)
+        if len(self._values) > self.exact_limit:
+            self._sketch = HyperLogLog(self.precision)
+            self._sketch.update(self._hash(list(self._values)))
+            self._values = None
+
+    def count(self) -> int:
+        return len(self._values) if self._sketch is None else self._sketch.count()
+
+
+class Reservoir:
+    """蓄水池抽样（Algorithm R），数据量未超过样本容量时保留全部数据"""
+
+    def __init__(self, size: int = 100000, seed: int = 0):
+        self.size = size
+        self.seen = 0
+        self._samples = []
+        self._buffer = None
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        fill = min(self.size - self.seen, len(values)) if self._buffer is None else 0
+        if fill > 0:
+            self._samples.append(values[:fill])
+        if self.seen + fill == self.size and self._buffer is None:
+            # 样本已满，合并为定长数组后开始随机替换
+            self._buffer = np.concatenate(self._samples) if self._samples else np.empty(0)
+            self._samples = []
+        rest = values[fill:]
+        if len(rest):
+            positions = self.seen + fill + np.arange(len(rest))
+            slots = self._rng.integers(0, positions + 1)
+            keep = slots < self.size
+            self._buffer[slots[keep]] = rest[keep]
+        self.seen += len(values)
+
+    def values(self) -> np.ndarray:
+        if self._buffer is not None:
+            return self._buffer
+        return np.concatenate(self._samples) if self._samples else np.empty(0)
+
+
+class ColumnProfile:
+    """单个字段的在线统计"""
+
+    def __init__(self, name, ranges: Sequence[Tuple[float, float]] = (), exact_limit: int = 50000,
+                 sample_size: int = 100000):
+        """
+        :param ranges: 需要统计落入比例的数值范围（闭区间），如坐标列检测使用的经纬度范围
+        :param exact_limit: 精确计数唯一值的上限
+        :param sample_size: 数值样本容量
+        """
+        self.name = name
+        self.ranges = list(ranges)
+        self.count = 0  # 非空值数
+        self.nulls = 0
+        self.first = None  # 首个非空值
+        self.samples: List[str] = []  # 按出现顺序的前几个唯一值
+        self.distinct = DistinctCounter(exact_limit)
+
+        # 以下统计只在字段的全部非空值都是数值时有效
+        self.numeric = True
+        self.integer = True
+        self.boolean = True
+        self.mean = float("nan")
+        self.min = float("nan")
+        self.max = float("nan")
+        # 整数字段按整数精确解析的最值（超过2^53的整数经float64会丢失精度）
+        self.int_min = None
+        self.int_max = None
+        self.in_range = [0] * len(self.ranges)
+        self.reservoir = Reservoir(sample_size)
+
+    def update(self, column: pd.Series) -> None:
+        """:param column: 按字符串读取的一块数据，缺失值为NaN"""
+        values = column.dropna()
+        self.nulls += len(column) - len(values)
+        if values.empty:
+            return
+        if self.first is None:
+            self.first = values.iloc[0]
+
+        uniques = pd.unique(values.to_numpy())
+        self._update_samples(uniques[:_SAMPLE_LIMIT])
+        self.distinct.update(uniques)
+        self.boolean = self.boolean and bool(values.isin(_BOOL_TOKENS).all())
+
+        if self.numeric:
+            try:
+                if not values.str.fullmatch(_NUMBER_PATTERN).all():
+                    raise ValueError
+                numbers = values.to_numpy(dtype=np.float64)
+            except (TypeError, ValueError):
+                self._drop_numeric()
+            else:
+                integer = self.integer and bool(values.str.fullmatch(_INTEGER_PATTERN).all())
+                self._update_numeric(numbers, self._exact_integers(values.to_numpy()) if integer else None)
+        self.count += len(values)
+
+    def update_arrow(self, column) -> None:
+        """:param column: Arrow字符串数组，缺失值为null"""
+        values = column.drop_null()
+        self.nulls += len(column) - len(values)
+        if not len(values):
+            return
+        if self.first is None:
+            self.first = values[0].as_py()
+
+        uniques = pc.unique(values)
+        self._update_samples(uniques[:_SAMPLE_LIMIT].to_pylist())
+        self.distinct.update(uniques.to_numpy(zero_copy_only=False))
+        if self.boolean:
+            self.boolean = pc.all(pc.is_in(values, value_set=pa.array(sorted(_BOOL_TOKENS)))).as_py()
+
+        if self.numeric:
+            # 与pandas解析数值时一致，忽略首尾空白
+            trimmed = pc.utf8_trim_whitespace(values)
+            numbers = self._arrow_cast(trimmed, pa.float64(), np.float64, _NUMBER_PATTERN)
+            if numbers is None:
+                self._drop_numeric()
+            else:
+                integers = None
+                if self.integer and pc.all(pc.match_substring_regex(trimmed, f"^{_INTEGER_PATTERN}$")).as_py():
+                    integers = self._arrow_cast(trimmed, pa.int64(), np.int64, _INTEGER_PATTERN)
+                self._update_numeric(numbers, integers)
+        self.count += len(values)
+
+    @staticmethod
+    def _arrow_cast(values, arrow_type, numpy_type, pattern: str):
+        """
+        Arrow字符串数组转为数值，Arrow不接受的写法（如前导+号）按Python的int()/float()解析，
+        与pandas路径的结果一致；无法解析时返回None
+
+        :param pattern: pandas识别为该类型的取值模式，Python解析前先校验，避免接受pandas视为文本的写法
+        """
+        try:
+            return pc.cast(values, arrow_type).to_numpy()
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            pass
+        if not pc.all(pc.match_substring_regex(values, f"^{pattern}$")).as_py():
+            return None
+        try:
+            return values.to_numpy(zero_copy_only=False).astype(numpy_type)
+        except (OverflowError, TypeError, ValueError):
+            return None
+
+    def _update_samples(self, uniques) -> None:
+        for value in uniques:
+            if len(self.samples) >= _SAMPLE_LIMIT:
+                break
+            if value not in self.samples:
+                self.samples.append(value)
+
+    def _drop_numeric(self) -> None:
+        # 出现非数值后该字段按文本处理，释放数值样本
+        self.numeric = False
+        self.reservoir = None
+
+    @staticmethod
+    def _exact_integers(values: np.ndarray):
+        """按整数精确解析字符串（int()会忽略首尾空白），超出int64范围时返回None"""
+        try:
+            return np.asarray(values, dtype=object).astype(np.int64)
+        except (OverflowError, ValueError):
+            return None
+
+    def _update_numeric(self, numbers: np.ndarray, integers: np.ndarray = None) -> None:
+        """
+        :param numbers: 按float64解析的数值
+        :param integers: 全部为整数时按int64精确解析的数值，否则为None
+        """
+        self.integer = self.integer and integers is not None
+        if self.integer:
+            chunk_min, chunk_max = int(integers.min()), int(integers.max())
+            self.int_min = chunk_min if self.int_min is None else min(self.int_min, chunk_min)
+            self.int_max = chunk_max if self.int_max is None else max(self.int_max, chunk_max)
+
+        # Welford合并：按块的样本数加权更新均值
+        count = self.count + len(numbers)
+        chunk_mean = float(numbers.mean())
+        if self.count:
+            self.mean += (chunk_mean - self.mean) * len(numbers) / count
+        else:
+            self.mean = chunk_mean
+
+        chunk_min, chunk_max = float(numbers.min()), float(numbers.max())
+        self.min = chunk_min if not self.count else min(self.min, chunk_min)
+        self.max = chunk_max if not self.count else max(self.max, chunk_max)
+
+        for index, (low, high) in enumerate(self.ranges):
+            self.in_range[index] += int(np.count_nonzero((numbers >= low) & (numbers <= high)))
+        self.reservoir.update(numbers)
+
+    def median(self) -> float:
+        """中位数，数值个数超过样本容量时为样本估计值"""
+        if not self.numeric or not self.count:
+            return float("nan")
+        return float(np.median(self.reservoir.values()))
+
+    def range_ratio(self, index: int) -> float:
+        """落入第index个范围的非空值比例"""
+        return self.in_range[index] / self.count if self.count else float("nan")
+
+    def field_type(self) -> str:
+        """按整体读取时pandas推断的列类型分类，与 classify_field_type 的结果一致"""
+        if not self.count and not self.nulls:
+            return "Text"
+        if self.numeric:
+            if self.integer and self.count and not self.nulls:
+                if -32768 <= self.int_min and self.int_max <= 32767:
+                    return "Short Integer"
+                return "Long Integer"
+            return "Double"
+        if self.boolean:
+            # 不含缺失值时为布尔列，否则为混有缺失值的对象列
+            return "Unknown" if not self.nulls else "BLOB"
+        if isinstance(self.first, str) and len(self.first.encode('utf-8')) < 254:
+            return "Text"
+        return "BLOB"
+
+    def stats(self) -> dict:
+        """数值字段返回整数列的最值为int，与整体读取时的输出格式一致"""
+        if self.field_type() in ["Short Integer", "Long Integer"]:
+            return {"min": self.int_min, "max": self.int_max, "mean": self.mean}
+        return {"min": self.min, "max": self.max, "mean": self.mean}
+
+
+class TableProfile:
+    """表格数据的流式画像"""
+
+    def __init__(self, columns: list, profiles: dict, rows: int):
+        self.columns = columns
+        self.profiles = profiles
+        self.rows = rows
+
+
+def _arrow_batches(file_path: str, columns: list, sep: str, block_size: int):
+    """以Arrow流式读取CSV，所有字段按字符串解码"""
+    names = [str(col) for col in columns]
+    return pa_csv.open_csv(
+        file_path,
+        read_options=pa_csv.ReadOptions(column_names=names, skip_rows=1, block_size=block_size),
+        parse_options=pa_csv.ParseOptions(delimiter=sep),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={name: pa.string() for name in names},
+            null_values=_NA_VALUES,
+            strings_can_be_null=True
+        )
+    )
+
+
+def profile_csv(file_path: str, sep: str = ',', chunksize: int = 100000,
+                ranges: Sequence[Tuple[float, float]] = (), exact_limit: int = 50000,
+                sample_size: int = 100000, engine: str = "pyarrow",
+                block_size: int = 16 << 20) -> TableProfile:
+    """
+    分块读取CSV/TXT并生成各字段的在线统计
+
+    :param sep: 分隔符
+    :param chunksize: pandas读取时每块的行数
+    :param ranges: 需要统计落入比例的数值范围
+    :param engine: pyarrow 或 c，未安装pyarrow时使用c
+    :param block_size: Arrow读取时每块的字节数
+    """
+    # 表头按pandas的规则解析（重复列名、空列名的命名方式保持一致）
+    columns = list(pd.read_csv(file_path, sep=sep, engine='c', dtype=str, nrows=0).columns)
+
+    def new_profiles():
+        return {
+            col: ColumnProfile(col, ranges, exact_limit=exact_limit, sample_size=sample_size)
+            for col in columns
+        }
+
+    if engine == "pyarrow" and pa is not None:
+        profiles, rows = new_profiles(), 0
+        try:
+            for batch in _arrow_batches(file_path, columns, sep, block_size):
+                for index, col in enumerate(columns):
+                    profiles[col].update_arrow(batch.column(index))
+                rows += batch.num_rows
+            return TableProfile(columns, profiles, rows)
+        except pa.ArrowInvalid as e:
+            # Arrow对字段数不一致、字段内换行等更严格，改用pandas重新读取，
+            # 能读取的文件结果一致，不能读取的文件得到与整体读取相同的ParserError
+            logging.info(f"Arrow读取失败，改用pandas分块读取：{e}")
+
+    profiles, rows = new_profiles(), 0
+    try:
+        with pd.read_csv(file_path, sep=sep, engine='c', dtype=str, chunksize=chunksize) as reader:
+            for chunk in reader:
+                for col in columns:
+                    profiles[col].update(chunk[col])
+                rows += len(chunk)
+    except ParserError as e:
+        # 与整体读取时的报错保持一致
+        match = _FIELD_COUNT_ERROR.search(str(e))
+        if match is None:
+            raise
+        raise ParserError("Expected {} fields in line {}, saw {}".format(*match.groups())) from e
+
+    return TableProfile(columns, profiles, rows)
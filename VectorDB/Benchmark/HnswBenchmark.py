@@ -0,0 +1,175 @@
+# VectorDB/Benchmark/HnswBenchmark.py
+"""
+HNSW参数基准测试
+
+按给定规模生成带聚类结构的合成向量，对每组HNSW参数在临时目录中新建Chroma集合，
+统计构建耗时、查询延迟p50/p99、相对精确检索的recall@k以及常驻内存增量，用于确定生产节点规格；
+常驻内存增量需要安装psutil，未安装时在Linux/macOS上改为报告进程峰值常驻内存（peak_rss_mb）
+
+用法（在项目根目录执行）:
+    python -m VectorDB.Benchmark.HnswBenchmark --sizes 10000 100000 --M 16 32 --search-ef 50 100 200
+    python -m VectorDB.Benchmark.HnswBenchmark --sizes 1000000 --M 32 --construction-ef 200 --queries 100
+"""
+import argparse
+import gc
+import itertools
+import json
+import shutil
+import sys
+import tempfile
+import time
+
+import chromadb
+import numpy as np
+
+from VectorDB.VectorCompression import normalize
+
+
+def memory_usage() -> tuple:
+    """
+    返回 (指标名, MB)：安装psutil时为当前常驻内存（rss_mb）；
+    否则为进程启动以来的峰值常驻内存（peak_rss_mb），Windows上没有resource模块，无法测量时为None
+    """
+    try:
+        import psutil
+        return "rss_mb", psutil.Process().memory_info().rss / 1024 / 1024
+    except ImportError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return "peak_rss_mb", None
+    # ru_maxrss在macOS上单位为字节，在Linux上为KB
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return "peak_rss_mb", resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+class SyntheticCorpus:
+    """带聚类结构的合成语料，按批次生成，百万级规模时无需一次性放入内存"""
+
+    def __init__(self, size: int, dimensions: int, seed: int = 42, clusters: int = 1000):
+        self.size = size
+        self.dimensions = dimensions
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self.centers = rng.standard_normal((clusters, dimensions)).astype(np.float32)
+
+    def _sample(self, rng, count: int) -> np.ndarray:
+        labels = rng.integers(0, len(self.centers), count)
+        noise = rng.standard_normal((count, self.dimensions)).astype(np.float32)
+        return normalize(self.centers[labels] + noise)
+
+    def batches(self, batch_size: int):
+        rng = np.random.default_rng(self.seed + 1)
+        for start in range(0, self.size, batch_size):
+            yield start, self._sample(rng, min(batch_size, self.size - start))
+
+    def queries(self, count: int) -> np.ndarray:
+        return self._sample(np.random.default_rng(self.seed + 2), count)
+
+
+def ground_truth(corpus: SyntheticCorpus, queries: np.ndarray, k: int, batch_size: int) -> list:
+    """分批精确检索，逐批合并得分最高的k个结果"""
+    best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+    best_ids = np.zeros((len(queries), k), dtype=np.int64)
+    for start, batch in corpus.batches(batch_size):
+        scores = np.concatenate([best_scores, queries @ batch.T], axis=1)
+        ids = np.concatenate([best_ids, np.broadcast_to(np.arange(start, start + len(batch)), (len(queries), len(batch)))], axis=1)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(scores, top, axis=1)
+        best_ids = np.take_along_axis(ids, top, axis=1)
+    return [set(f"v{i}" for i in row) for row in best_ids]
+
+
+def memory_result(base_memory: float) -> dict:
+    """常驻内存增量；峰值常驻内存不会随集合释放而下降，无法计算增量，直接报告峰值"""
+    label, memory = memory_usage()
+    if memory is None:
+        return {label: None}
+    if label == "rss_mb":
+        memory -= base_memory
+    return {label: round(memory, 1)}
+
+
+def run_case(corpus: SyntheticCorpus, queries: np.ndarray, truth: list, k: int, params: dict,
+             add_batch_size: int) -> dict:
+    """以一组HNSW参数构建集合并测试"""
+    path = tempfile.mkdtemp(prefix="hnsw_benchmark_")
+    try:
+        gc.collect()
+        _, base_memory = memory_usage()
+        client = chromadb.PersistentClient(path=path)
+        collection = client.create_collection(
+            name="benchmark",
+            metadata={"hnsw:space": "cosine", **{f"hnsw:{key}": value for key, value in params.items()}}
+        )
+
+        start = time.perf_counter()
+        for offset, batch in corpus.batches(add_batch_size):
+            collection.add(ids=[f"v{offset + i}" for i in range(len(batch))], embeddings=batch)
+        build_seconds = time.perf_counter() - start
+
+        # 预热一次，避免首次查询的加载开销计入延迟
+        collection.query(query_embeddings=queries[:1], n_results=k, include=[])
+        latencies, hits = [], 0
+        for query, expected in zip(queries, truth):
+            start = time.perf_counter()
+            result = collection.query(query_embeddings=[query], n_results=k, include=[])
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += len(set(result['ids'][0]) & expected)
+
+        return {
+            "size": corpus.size,
+            **params,
+            "build_s": round(build_seconds, 2),
+            "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+            "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+            f"recall@{k}": round(hits / (k * len(queries)), 4),
+            **memory_result(base_memory)
+        }
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="HNSW参数基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000], help="语料规模")
+    parser.add_argument("--dimensions", type=int, default=1024, help="向量维度")
+    parser.add_argument("--queries", type=int, default=200, help="查询数")
+    parser.add_argument("--k", type=int, default=10, help="recall@k")
+    parser.add_argument("--M", type=int, nargs="+", default=[16], help="HNSW邻居数")
+    parser.add_argument("--construction-ef", type=int, nargs="+", default=[100], help="构建ef")
+    parser.add_argument("--search-ef", type=int, nargs="+", default=[10, 50, 100], help="检索ef")
+    parser.add_argument("--batch-size", type=int, default=100, help="HNSW批大小")
+    parser.add_argument("--sync-threshold", type=int, default=1000, help="HNSW同步阈值")
+    parser.add_argument("--add-batch-size", type=int, default=5000, help="每次写入的向量数")
+    parser.add_argument("--output", help="结果另存为JSON文件")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        corpus = SyntheticCorpus(size, args.dimensions, args.seed)
+        queries = corpus.queries(args.queries)
+        truth = ground_truth(corpus, queries, args.k, args.add_batch_size)
+        # search_ef在集合创建时确定，每组参数单独建一个集合
+        for M, construction_ef, search_ef in itertools.product(args.M, args.construction_ef, args.search_ef):
+            params = {
+                "M": M,
+                "construction_ef": construction_ef,
+                "search_ef": search_ef,
+                "batch_size": args.batch_size,
+                "sync_threshold": args.sync_threshold
+            }
+            result = run_case(corpus, queries, truth, args.k, params, args.add_batch_size)
+            results.append(result)
+            print(json.dumps(result, ensure_ascii=False), flush=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(results, output, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
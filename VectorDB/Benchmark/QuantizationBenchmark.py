@@ -0,0 +1,161 @@
+# VectorDB/Benchmark/QuantizationBenchmark.py
+"""
+向量压缩召回率基准测试
+
+以全精度float32精确检索结果为基准，比较各压缩方式（Matryoshka截断、float16、int8）
+在直接检索和全精度重排两种情况下的recall@k及每条记录的向量存储字节数；
+默认使用Embedding缓存中的真实向量，合成向量只用于检查流程，其结果不代表实际Embedding模型的截断效果
+
+用法（在项目根目录执行）:
+    python -m VectorDB.Benchmark.QuantizationBenchmark
+    python -m VectorDB.Benchmark.QuantizationBenchmark --source synthetic --size 50000 --dims 256 512
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+
+import numpy as np
+
+from VectorDB.EmbeddingCache import EmbeddingCache
+from VectorDB.VectorCompression import normalize, truncate, quantize_int8, dequantize_int8
+
+
+def load_cached_vectors(limit: int) -> np.ndarray:
+    """读取Embedding缓存中的真实向量（取维度最多的一组）"""
+    with open('config.json', 'r', encoding='utf-8') as configFile:
+        config = json.load(configFile)
+    path = os.path.join(os.path.normpath(config["向量数据库路径"]), EmbeddingCache.FILE_NAME)
+    conn = sqlite3.connect(path)
+    try:
+        row = conn.execute(
+            "SELECT dimensions FROM embeddings GROUP BY dimensions ORDER BY COUNT(*) DESC LIMIT 1"
+        ).fetchone()
+        if row is None:
+            raise SystemExit(f"Embedding缓存为空: {path}")
+        blobs = conn.execute(
+            "SELECT vector FROM embeddings WHERE dimensions = ? LIMIT ?", (row[0], limit)
+        ).fetchall()
+    finally:
+        conn.close()
+    return normalize(np.stack([np.frombuffer(blob, dtype=np.float32) for blob, in blobs]))
+
+
+def synthetic_vectors(size: int, dimensions: int, seed: int) -> np.ndarray:
+    """
+    生成带聚类结构的各向同性合成向量
+
+    各维度方差相同，不假设“前几维信息量最大”，Matryoshka截断在合成数据上的结果偏保守，
+    真实模型的截断效果需使用 --source cache 测量
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(1, size // 50), dimensions)).astype(np.float32)
+    labels = rng.integers(0, len(centers), size)
+    noise = rng.standard_normal((size, dimensions)).astype(np.float32) * 0.6
+    return normalize(centers[labels] + noise)
+
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """精确内积检索，返回每个查询得分最高的k个行号（按得分排序）"""
+    scores = queries @ corpus.T
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+
+def rescore(corpus: np.ndarray, queries: np.ndarray, candidates: np.ndarray, k: int) -> np.ndarray:
+    """用全精度向量对候选重新打分，取前k个"""
+    result = np.empty((len(queries), k), dtype=np.int64)
+    for i, (query, rows) in enumerate(zip(queries, candidates)):
+        scores = corpus[rows] @ query
+        result[i] = rows[np.argsort(-scores)[:k]]
+    return result
+
+
+def recall(found: np.ndarray, truth: np.ndarray) -> float:
+    k = truth.shape[1]
+    return float(np.mean([len(set(a[:k]) & set(b)) / k for a, b in zip(found, truth)]))
+
+
+def run(corpus: np.ndarray, queries: np.ndarray, k: int, rerank_factor: int, dims: list) -> list:
+    full_dims = corpus.shape[1]
+    truth = exact_top_k(corpus, queries, k)
+    candidates_k = k * rerank_factor
+
+    # 各压缩方式：(名称, 压缩后的语料, 压缩后的查询, 每条记录的字节数)
+    variants = [("float32", corpus, queries, full_dims * 4)]
+    variants.append(("float16", corpus.astype(np.float16).astype(np.float32), queries, full_dims * 2))
+    codes, scale = quantize_int8(corpus)
+    variants.append(("int8", dequantize_int8(codes, scale), queries, full_dims))
+    for dimensions in dims:
+        if dimensions < full_dims:
+            variants.append((f"matryoshka:{dimensions}", truncate(corpus, dimensions), truncate(queries, dimensions),
+                             dimensions * 4))
+
+    rows = []
+    for name, compact_corpus, compact_queries, size in variants:
+        start = time.perf_counter()
+        candidates = exact_top_k(compact_corpus, compact_queries, candidates_k)
+        search_ms = (time.perf_counter() - start) * 1000 / len(queries)
+        rows.append({
+            "method": name,
+            "bytes_per_vector": size,
+            "compression": round(full_dims * 4 / size, 2),
+            "recall": round(recall(candidates[:, :k], truth), 4),
+            "recall_rescored": round(recall(rescore(corpus, queries, candidates, k), truth), 4),
+            "search_ms": round(search_ms, 3)
+        })
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="向量压缩召回率基准测试")
+    parser.add_argument("--source", choices=["cache", "synthetic"], default="cache",
+                        help="cache: 使用Embedding缓存中的真实向量；synthetic: 各向同性合成向量（结果不代表实际模型）")
+    parser.add_argument("--size", type=int, default=20000, help="语料向量数")
+    parser.add_argument("--dimensions", type=int, default=1024, help="合成向量维度")
+    parser.add_argument("--queries", type=int, default=200, help="查询数（从语料中留出）")
+    parser.add_argument("--k", type=int, default=10, help="recall@k")
+    parser.add_argument("--rerank-factor", type=int, default=4, help="重排候选倍数")
+    parser.add_argument("--dims", type=int, nargs="+", default=[128, 256, 512], help="Matryoshka截断维度")
+    parser.add_argument("--min-recall", type=float, default=None,
+                        help="matryoshka重排后recall低于该值时返回非零退出码")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    if args.source == "cache":
+        vectors = load_cached_vectors(args.size + args.queries)
+    else:
+        vectors = synthetic_vectors(args.size + args.queries, args.dimensions, args.seed)
+    if len(vectors) <= args.queries + args.k * args.rerank_factor:
+        raise SystemExit(f"向量数量不足: {len(vectors)}")
+
+    rng = np.random.default_rng(args.seed)
+    order = rng.permutation(len(vectors))
+    queries, corpus = vectors[order[:args.queries]], vectors[order[args.queries:]]
+
+    if args.source == "synthetic":
+        print("注意: 使用合成向量，以下结果只用于检查流程，不代表实际Embedding模型的压缩效果")
+    print(f"语料: {len(corpus)} 条, 维度: {corpus.shape[1]}, 查询: {len(queries)} 条, "
+          f"k={args.k}, 重排候选: {args.k * args.rerank_factor}")
+    rows = run(corpus, queries, args.k, args.rerank_factor, args.dims)
+    header = f"{'method':<18}{'bytes/vec':>10}{'ratio':>8}{'recall':>10}{'rescored':>10}{'ms/query':>10}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(f"{row['method']:<18}{row['bytes_per_vector']:>10}{row['compression']:>8}"
+              f"{row['recall']:>10}{row['recall_rescored']:>10}{row['search_ms']:>10}")
+
+    if args.min_recall is not None:
+        failed = [row["method"] for row in rows
+                  if row["method"].startswith("matryoshka") and row["recall_rescored"] < args.min_recall]
+        if failed:
+            print(f"重排后recall低于 {args.min_recall}: {', '.join(failed)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
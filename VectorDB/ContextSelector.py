@@ -0,0 +1,108 @@
+# VectorDB/ContextSelector.py
+"""
+记忆注入选择模块
+
+从检索结果中选出需要注入对话上下文的记忆：按相关度阈值过滤，去除本轮对话中已注入或已出现在上下文中的内容，
+按Token预算依相关度顺序截取；每个对话维护独立的检索缓存，对话上下文对象释放后状态随之回收
+"""
+import hashlib
+import weakref
+from collections import OrderedDict
+from typing import List, Optional
+
+from VectorDB.DocumentChunker import count_tokens
+
+_HEADER = "以下是与当前对话相关的记忆内容："
+
+
+class ConversationState:
+    """单个对话的注入记录及检索缓存"""
+
+    def __init__(self, cache_size: int = 32):
+        self.cache_size = cache_size
+        # 已注入记忆的内容哈希
+        self.injected = set()
+        self._cache = OrderedDict()
+
+    def cached(self, query: str, generation: int) -> Optional[List[tuple]]:
+        """读取检索缓存，记忆库发生写入（代数变化）后失效"""
+        entry = self._cache.get(query)
+        if entry is None or entry[0] != generation:
+            return None
+        self._cache.move_to_end(query)
+        return entry[1]
+
+    def remember(self, query: str, hits: List[tuple], generation: int) -> None:
+        self._cache[query] = (generation, hits)
+        self._cache.move_to_end(query)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+
+class ContextSelector:
+    """按相关度、去重和Token预算选择注入的记忆"""
+
+    def __init__(self, token_budget: int = 1500, max_distance: float = 0.6, cache_size: int = 32):
+        """
+        :param token_budget: 每次注入的最大Token数
+        :param max_distance: 最大余弦距离，超过的向量检索结果视为不相关（词项检索结果没有距离，不受此限制）
+        :param cache_size: 每个对话的检索缓存条目数
+        """
+        self.token_budget = token_budget
+        self.max_distance = max_distance
+        self.cache_size = cache_size
+        self._states = weakref.WeakKeyDictionary()
+
+    def state(self, model_context) -> ConversationState:
+        """获取对话状态，以对话上下文对象区分不同对话"""
+        state = self._states.get(model_context)
+        if state is None:
+            state = self._states[model_context] = ConversationState(self.cache_size)
+        return state
+
+    @staticmethod
+    def query_text(messages: list) -> str:
+        """以最近一条文本消息作为检索文本（跳过函数调用结果等非文本消息）"""
+        for message in reversed(messages):
+            content = getattr(message, "content", None)
+            if isinstance(content, str) and content.strip():
+                return " ".join(content.split())
+        return ""
+
+    @staticmethod
+    def _content_key(content: str) -> str:
+        return hashlib.md5(content.encode()).hexdigest()
+
+    def select(self, hits: List[tuple], state: ConversationState, messages: list) -> List[tuple]:
+        """
+        选择需要注入的记忆
+
+        :param hits: 按相关度排序的 (ID, 内容, 元数据, 向量距离) 列表
+        :param state: 对话状态
+        :param messages: 当前上下文中的消息，已出现在其中的内容不再注入
+        :return: 选中的检索结果，同时记入对话状态
+        """
+        existing = [message.content for message in messages if isinstance(getattr(message, "content", None), str)]
+        remaining = self.token_budget - count_tokens(_HEADER)
+        selected = []
+        for hit in hits:
+            _, doc, _, distance = hit
+            if not doc or (distance is not None and distance > self.max_distance):
+                continue
+            key = self._content_key(doc)
+            if key in state.injected or any(doc in content for content in existing):
+                continue
+            tokens = count_tokens(doc) + 4
+            if tokens > remaining:
+                # 放不下时继续尝试后面较短的记忆
+                continue
+            remaining -= tokens
+            state.injected.add(key)
+            selected.append(hit)
+        return selected
+
+    @staticmethod
+    def render(hits: List[tuple]) -> str:
+        """将选中的记忆合并为一条系统消息"""
+        items = [f"[{index}] {doc}" for index, (_, doc, _, _) in enumerate(hits, start=1)]
+        return "\n\n".join([_HEADER, *items])
@@ -0,0 +1,145 @@
+# VectorDB/DocumentChunker.py
+"""
+文档分块模块
+
+按Token数将长文本切分为若干分块：优先在markdown标题处切分，其次是空行分隔的段落、单行，最后按Token数硬切分；
+相邻的小片段合并到接近上限，分块首尾相接，拼接后与原文完全一致，便于检索时还原完整文档
+"""
+import math
+import re
+from typing import List
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken为可选依赖，未安装时按字符类别估算
+    _ENCODING = None
+
+# 中文按单字、英文按单词、数字按连续数字、其余按单个符号估算Token数
+_TOKEN_PATTERN = re.compile(r"[㐀-䶿一-鿿]|[A-Za-z]+|\d+|\S")
+
+# 切分层级：(边界模式, 是否在匹配位置之前切分)
+_SPLIT_LEVELS = [
+    (re.compile(r"^#{1,6}\s", re.MULTILINE), True),  # markdown标题
+    (re.compile(r"\n[ \t]*\n\s*"), False),  # 段落
+    (re.compile(r"\n"), False),  # 单行
+]
+
+# 只有标题行（一行或连续多行）及空白的片段
+_HEADING_ONLY = re.compile(r"(?:#{1,6}[ \t][^\n]*\s*)+")
+
+
+def count_tokens(text: str) -> int:
+    """计算文本的Token数，未安装tiktoken时为估算值"""
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    total = 0
+    for token in _TOKEN_PATTERN.findall(text):
+        if len(token) == 1:
+            total += 1
+        elif token[0].isdigit():
+            total += math.ceil(len(token) / 3)
+        else:
+            total += math.ceil(len(token) / 4)
+    return total
+
+
+def _split_at(text: str, pattern: re.Pattern, before: bool) -> List[str]:
+    """在模式匹配处切分，切分后的片段首尾相接"""
+    positions = sorted({
+        match.start() if before else match.end()
+        for match in pattern.finditer(text)
+    } - {0, len(text)})
+    pieces, start = [], 0
+    for position in positions:
+        pieces.append(text[start:position])
+        start = position
+    pieces.append(text[start:])
+    return pieces
+
+
+class DocumentChunker:
+    """按markdown结构和Token数切分文档"""
+
+    def __init__(self, max_tokens: int = 512):
+        """
+        :param max_tokens: 单个分块的最大Token数
+        """
+        self.max_tokens = max_tokens
+
+    def split(self, text: str) -> List[str]:
+        """
+        切分文本
+
+        :return: 分块列表，"".join(分块) == text；未超过上限时只有一个分块
+        """
+        if count_tokens(text) <= self.max_tokens:
+            return [text]
+        return self._pack(self._split(text, 0))
+
+    def _split(self, text: str, level: int) -> List[tuple]:
+        """递归切分，返回 (片段, Token数) 列表"""
+        tokens = count_tokens(text)
+        if tokens <= self.max_tokens:
+            return [(text, tokens)]
+        if level == len(_SPLIT_LEVELS):
+            return self._hard_split(text, tokens)
+
+        pieces = []
+        for part in self._attach_headings(_split_at(text, *_SPLIT_LEVELS[level])):
+            pieces.extend(self._split(part, level + 1))
+        return pieces
+
+    @staticmethod
+    def _attach_headings(parts: List[str]) -> List[str]:
+        """
+        只有标题行的片段（包括连续的多级标题）与后一个片段合并，继续切分时标题始终位于所属正文之前，不会单独成块；
+        文末没有正文的标题并入前一个片段
+        """
+        merged, pending = [], ""
+        for part in parts:
+            if _HEADING_ONLY.fullmatch(part) or (pending and not part.strip()):
+                pending += part
+                continue
+            merged.append(pending + part)
+            pending = ""
+        if pending and merged:
+            merged[-1] += pending
+        elif pending:
+            merged.append(pending)
+        return merged
+
+    def _hard_split(self, text: str, tokens: int) -> List[tuple]:
+        """没有可用的结构边界时按Token数切分，每段取不超过上限的最长前缀"""
+        pieces, start = [], 0
+        while start < len(text):
+            # 单个Token不会超过32个字符，以此限定二分查找的范围
+            low, high = start + 1, min(len(text), start + self.max_tokens * 32)
+            while low < high:
+                middle = (low + high + 1) // 2
+                if count_tokens(text[start:middle]) <= self.max_tokens:
+                    low = middle
+                else:
+                    high = middle - 1
+            pieces.append((text[start:low], count_tokens(text[start:low])))
+            start = low
+        return pieces
+
+    def _pack(self, pieces: List[tuple]) -> List[str]:
+        """
+        按顺序合并相邻片段，每个分块不超过上限；当前分块已有一定长度时，在标题处开始新分块，避免标题与正文分离；
+        文末只有标题的片段不开始新分块
+        """
+        heading = _SPLIT_LEVELS[0][0]
+        chunks, current, current_tokens = [], [], 0
+        for index, (piece, tokens) in enumerate(pieces):
+            trailing = index == len(pieces) - 1 and _HEADING_ONLY.fullmatch(piece)
+            starts_section = current_tokens >= self.max_tokens // 4 and heading.match(piece) and not trailing
+            if current and (current_tokens + tokens > self.max_tokens or starts_section):
+                chunks.append("".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += tokens
+        if current:
+            chunks.append("".join(current))
+        return chunks
@@ -0,0 +1,166 @@
+# VectorDB/EmbeddingCache.py
+"""
+Embedding持久化缓存模块
+
+以 (模型名称, 向量维度, 文本哈希) 为键，将向量持久化到向量数据库目录下的SQLite文件中，
+按最近使用顺序进行LRU淘汰，并统计命中/未命中次数；
+命中时只在内存中记录使用顺序，写入缓存或关闭时再批量落盘，读取路径上没有磁盘写入；
+批量读写接口一次查询/一个事务处理整批文本，调用方应在线程池中调用，避免阻塞事件循环
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from array import array
+from typing import List, Optional
+
+
+class EmbeddingCache:
+    """内容寻址的Embedding缓存"""
+
+    FILE_NAME = "embedding_cache.sqlite3"
+    # 批量查询时每条SQL语句的键数量，不超过SQLite的参数个数上限
+    QUERY_BATCH_SIZE = 500
+
+    def __init__(self, db_path: str, max_entries: int = 50000):
+        """
+        :param db_path: 缓存文件所在目录（与向量数据库同目录）
+        :param max_entries: 最大缓存条目数，超出后淘汰最久未使用的条目
+        """
+        self.path = os.path.join(db_path, self.FILE_NAME)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "  key TEXT PRIMARY KEY,"
+            "  model TEXT NOT NULL,"
+            "  dimensions INTEGER NOT NULL,"
+            "  vector BLOB NOT NULL,"
+            "  last_used INTEGER NOT NULL"
+            ")"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON embeddings(last_used)")
+        self._conn.commit()
+
+        # 使用自增计数器代替时间戳记录使用顺序，避免同一时刻的并列
+        row = self._conn.execute("SELECT COUNT(*), COALESCE(MAX(last_used), 0) FROM embeddings").fetchone()
+        self._count, self._tick = row
+        # 尚未落盘的使用顺序：键 -> 最近一次使用的计数
+        self._touched = {}
+
+    @staticmethod
+    def make_key(model: str, dimensions: int, text: str) -> str:
+        """生成缓存键：模型名称 + 维度 + 文本的SHA-256"""
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{model}:{dimensions}:{text_hash}"
+
+    def get(self, model: str, dimensions: int, text: str) -> Optional[List[float]]:
+        """读取缓存，未命中时返回None"""
+        return self.get_many(model, dimensions, [text])[0]
+
+    def get_many(self, model: str, dimensions: int, texts: List[str]) -> List[Optional[List[float]]]:
+        """批量读取缓存，返回与texts一一对应的向量，未命中的位置为None"""
+        keys = [self.make_key(model, dimensions, text) for text in texts]
+        blobs = {}
+        with self._lock:
+            unique_keys = list(dict.fromkeys(keys))
+            for i in range(0, len(unique_keys), self.QUERY_BATCH_SIZE):
+                batch = unique_keys[i:i + self.QUERY_BATCH_SIZE]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({', '.join('?' * len(batch))})", batch
+                ).fetchall()
+                blobs.update(rows)
+
+            for key in keys:
+                if key in blobs:
+                    self.hits += 1
+                    self._tick += 1
+                    self._touched[key] = self._tick
+                else:
+                    self.misses += 1
+
+        vectors = []
+        for key in keys:
+            if key not in blobs:
+                vectors.append(None)
+                continue
+            vector = array("f")
+            vector.frombytes(blobs[key])
+            vectors.append(vector.tolist())
+        return vectors
+
+    def put(self, model: str, dimensions: int, text: str, vector: List[float]) -> None:
+        """写入缓存，超出容量时淘汰最久未使用的条目"""
+        self.put_many(model, dimensions, [text], [vector])
+
+    def put_many(self, model: str, dimensions: int, texts: List[str], vectors: List[List[float]]) -> None:
+        """批量写入缓存，整批在一个事务中提交，超出容量时淘汰最久未使用的条目"""
+        blobs = {
+            self.make_key(model, dimensions, text): array("f", vector).tobytes()
+            for text, vector in zip(texts, vectors)
+        }
+        if not blobs:
+            return
+        with self._lock:
+            keys = list(blobs)
+            existing = set()
+            for i in range(0, len(keys), self.QUERY_BATCH_SIZE):
+                batch = keys[i:i + self.QUERY_BATCH_SIZE]
+                existing.update(row[0] for row in self._conn.execute(
+                    f"SELECT key FROM embeddings WHERE key IN ({', '.join('?' * len(batch))})", batch
+                ))
+
+            rows = []
+            for key, blob in blobs.items():
+                self._tick += 1
+                rows.append((key, model, dimensions, blob, self._tick))
+                self._touched.pop(key, None)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, dimensions, vector, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._count += len(blobs) - len(existing)
+            self._flush_touched()
+
+            if self._count > self.max_entries:
+                # 一次性淘汰到容量的90%，避免每次写入都触发淘汰
+                evict = self._count - int(self.max_entries * 0.9)
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                    (evict,)
+                )
+                self._count -= evict
+                logging.info(f"Embedding缓存淘汰 {evict} 条记录")
+            self._conn.commit()
+
+    def _flush_touched(self) -> None:
+        """将内存中记录的使用顺序写入数据库（调用方持有锁并负责提交）"""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                [(tick, key) for key, tick in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def stats(self) -> dict:
+        """返回缓存命中统计"""
+        total = self.hits + self.misses
+        return {
+            "entries": self._count,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+            self._conn.close()
@@ -0,0 +1,77 @@
+# VectorDB/EmbeddingClient.py
+"""
+异步Embedding客户端模块
+
+所有向量库共享同一个 AsyncOpenAI 客户端及其底层 httpx 连接池，
+复用TLS/keep-alive连接，并通过信号量限制并发请求数
+"""
+import asyncio
+from typing import Dict, List, Tuple
+
+import httpx
+from openai import AsyncOpenAI
+
+
+class AsyncEmbeddingClient:
+    """基于连接池的异步Embedding客户端"""
+
+    def __init__(self, api_key: str, base_url: str, model: str, dimensions: int = 1024,
+                 max_concurrency: int = 8, max_connections: int = 16, timeout: float = 30.0):
+        """
+        :param api_key: Embedding模型密钥
+        :param base_url: Embedding模型地址
+        :param model: Embedding模型名称
+        :param dimensions: 向量维度
+        :param max_concurrency: 同时进行的Embedding请求上限
+        :param max_connections: 连接池最大连接数
+        :param timeout: 单次请求超时时间（秒）
+        """
+        self.model = model
+        self.dimensions = dimensions
+        self._http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            ),
+            timeout=httpx.Timeout(timeout)
+        )
+        self._client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=self._http_client,
+            timeout=timeout
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        批量获取文本向量
+
+        :param texts: 文本列表
+        :return: 与输入顺序一致的向量列表
+        """
+        async with self._semaphore:
+            response = await self._client.embeddings.create(
+                model=self.model,
+                input=texts,
+                dimensions=self.dimensions,
+                encoding_format="float"
+            )
+        # 接口返回顺序不保证与输入一致，按index重新排序
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+    async def close(self) -> None:
+        await self._client.close()
+
+
+# 共享客户端，按 (地址, 密钥, 模型, 维度) 复用
+_shared_clients: Dict[Tuple[str, str, str, int], AsyncEmbeddingClient] = {}
+
+
+def get_shared_client(api_key: str, base_url: str, model: str, dimensions: int = 1024,
+                      **kwargs) -> AsyncEmbeddingClient:
+    """获取共享的异步Embedding客户端，不存在时创建"""
+    key = (base_url, api_key, model, dimensions)
+    if key not in _shared_clients:
+        _shared_clients[key] = AsyncEmbeddingClient(api_key, base_url, model, dimensions, **kwargs)
+    return _shared_clients[key]
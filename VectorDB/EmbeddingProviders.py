@@ -0,0 +1,167 @@
+# VectorDB/EmbeddingProviders.py
+"""
+Embedding提供方模块
+
+统一的Embedding接口，支持远程OpenAI兼容接口和本地ONNX模型（MiniLM类句向量模型，CPU批量推理），
+通过配置文件中的 “Embedding提供方” 选择
+"""
+import asyncio
+import hashlib
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from VectorDB.EmbeddingClient import get_shared_client
+
+
+class BaseEmbeddingProvider(ABC):
+    """Embedding提供方基类"""
+
+    NAME = ""
+
+    def __init__(self, model: str, dimensions: int, batch_size: int):
+        """
+        :param model: 模型标识，用于缓存键和向量空间校验
+        :param dimensions: 向量维度
+        :param batch_size: 单次请求/推理的最大文本数
+        """
+        self.model = model
+        self.dimensions = dimensions
+        self.batch_size = batch_size
+
+    @property
+    def space(self) -> dict:
+        """向量空间标识，写入集合元数据，防止不同模型的向量混用"""
+        return {
+            "embedding:provider": self.NAME,
+            "embedding:model": self.model,
+            "embedding:dimensions": self.dimensions
+        }
+
+    @abstractmethod
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """批量计算向量（需子类实现）"""
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+class OpenAIEmbeddingProvider(BaseEmbeddingProvider):
+    """远程OpenAI兼容Embedding接口"""
+
+    NAME = "openai"
+
+    def __init__(self, config: dict):
+        super().__init__(
+            model=config["Embedding模型名称"],
+            dimensions=config.get("Embedding维度", 1024),
+            batch_size=config.get("Embedding批大小", 10)
+        )
+        # 共享的异步Embedding客户端（连接池复用，不阻塞事件循环）
+        self.client = get_shared_client(
+            api_key=config["Embedding模型密钥"],
+            base_url=config["Embedding模型地址"],
+            model=self.model,
+            dimensions=self.dimensions,
+            max_concurrency=config.get("Embedding最大并发数", 8),
+            max_connections=config.get("Embedding连接池大小", 16),
+            timeout=config.get("Embedding超时时间", 30.0)
+        )
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        return await self.client.embed(texts)
+
+
+class OnnxEmbeddingProvider(BaseEmbeddingProvider):
+    """本地ONNX句向量模型，在独立的推理线程中批量执行"""
+
+    NAME = "onnx"
+
+    def __init__(self, config: dict):
+        import numpy as np
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        model_path = config["本地Embedding模型路径"]
+        tokenizer_path = config.get(
+            "本地Embedding分词器路径",
+            os.path.join(os.path.dirname(model_path), "tokenizer.json")
+        )
+        max_length = config.get("本地Embedding最大长度", 256)
+
+        self._np = np
+        self.session = onnxruntime.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+        self.input_names = {item.name for item in self.session.get_inputs()}
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+        # 推理只占用一个线程，避免与向量库读写线程争抢
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="onnx-embedding")
+
+        # 实际维度以模型输出为准
+        dimensions = self.session.get_outputs()[0].shape[-1]
+        if not isinstance(dimensions, int):
+            dimensions = len(self._infer(["维度探测"])[0])
+        super().__init__(
+            model=self.model_id(model_path),
+            dimensions=dimensions,
+            batch_size=config.get("本地Embedding批大小", 32)
+        )
+
+    @staticmethod
+    def model_id(model_path: str) -> str:
+        """
+        模型标识：所在目录名 + 模型文件内容哈希
+
+        导出的ONNX文件通常都叫model.onnx，只用文件名时不同模型的向量会混入同一集合和同一缓存键
+        """
+        digest = hashlib.sha256()
+        with open(model_path, "rb") as model_file:
+            for block in iter(lambda: model_file.read(1024 * 1024), b""):
+                digest.update(block)
+        directory = os.path.basename(os.path.dirname(os.path.abspath(model_path)))
+        return f"onnx/{directory}/{digest.hexdigest()[:16]}"
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._infer, texts)
+
+    def _infer(self, texts: List[str]) -> List[List[float]]:
+        np = self._np
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            inputs["token_type_ids"] = np.array([encoding.type_ids for encoding in encodings], dtype=np.int64)
+
+        token_embeddings = self.session.run(None, inputs)[0]
+        # 按注意力掩码做平均池化，再做L2归一化
+        mask = attention_mask[..., None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.tolist()
+
+    async def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+class EmbeddingProviderFactory:
+    """Embedding提供方工厂"""
+
+    PROVIDERS = {
+        provider.NAME: provider
+        for provider in [
+            OpenAIEmbeddingProvider,
+            OnnxEmbeddingProvider
+        ]
+    }
+
+    @classmethod
+    def create(cls, config: dict) -> BaseEmbeddingProvider:
+        name = config.get("Embedding提供方", OpenAIEmbeddingProvider.NAME)
+        if name not in cls.PROVIDERS:
+            raise ValueError(f"不支持的Embedding提供方: {name}")
+        return cls.PROVIDERS[name](config)
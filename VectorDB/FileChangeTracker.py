@@ -0,0 +1,243 @@
+# VectorDB/FileChangeTracker.py
+"""
+文件变更跟踪模块
+
+维护 文件路径 → (入库时的修改时间、文件大小、记录ID) 索引，随记录的添加/删除增量更新；
+后台监控线程（优先使用watchdog的inotify等系统通知，不可用时退化为定时轮询）
+在文件变化时立即标记相关记录，查询接口直接返回预先计算好的结果
+"""
+import logging
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # watchdog为可选依赖
+    FileSystemEventHandler = object
+    Observer = None
+
+# 修改时间允许1秒误差
+MTIME_TOLERANCE = 1
+
+
+def normalize_path(filepath: str) -> str:
+    """统一路径格式作为索引键（绝对路径，Windows下忽略大小写）"""
+    return os.path.normcase(os.path.abspath(filepath))
+
+
+class _WatchdogHandler(FileSystemEventHandler):
+    """将watchdog事件转发给跟踪器"""
+
+    def __init__(self, tracker: "FileChangeTracker"):
+        super().__init__()
+        self.tracker = tracker
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            return
+        for path in (getattr(event, "src_path", None), getattr(event, "dest_path", None)):
+            if path:
+                self.tracker.check(path)
+
+
+class FileChangeTracker:
+    """文件变更跟踪器"""
+
+    def __init__(self, mode: str = "auto", poll_interval: float = 5.0):
+        """
+        :param mode: 监控模式 auto（watchdog优先）/ watchdog / polling / off
+        :param poll_interval: 轮询模式的检查间隔（秒）
+        """
+        self.mode = mode
+        self.poll_interval = poll_interval
+        # 规范化路径 → {"filepath": 原始路径, "size": 入库时文件大小, "records": {记录ID: 入库时修改时间}}
+        self._files: Dict[str, dict] = {}
+        # 记录ID → 规范化路径
+        self._record_paths: Dict[str, str] = {}
+        # 规范化路径 → {"mtime": 文件当前修改时间, "record_ids": 过期记录ID}（仅包含已变化的文件）
+        self._modified: Dict[str, dict] = {}
+        self._listeners: List[Callable[[str, List[str], float], None]] = []
+        self._lock = threading.RLock()
+        self._observer = None
+        self._watched_dirs = set()
+        self._poll_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    # ================= 索引维护 =================
+    def load(self, ids: List[str], metadatas: List[dict]) -> None:
+        """根据已有记录初始化索引（不检查文件，首次检查在启动监控时于后台完成）"""
+        for record_id, metadata in zip(ids, metadatas):
+            self._register(record_id, metadata)
+
+    def track(self, record_id: str, metadata: dict) -> None:
+        """记录添加后登记其文件路径"""
+        key = self._register(record_id, metadata)
+        if key is not None:
+            self.check(key)
+
+    def _register(self, record_id: str, metadata: dict) -> Optional[str]:
+        if not metadata or "filepath" not in metadata or "timestamp" not in metadata:
+            return None
+
+        key = normalize_path(metadata["filepath"])
+        with self._lock:
+            # 记录的文件路径发生变化时，先从原路径下移除
+            if self._record_paths.get(record_id, key) != key:
+                self.untrack([record_id])
+            entry = self._files.setdefault(key, {
+                "filepath": metadata["filepath"],
+                "size": None,
+                "records": {}
+            })
+            entry["records"][record_id] = float(metadata["timestamp"])
+            if metadata.get("filesize") is not None:
+                entry["size"] = int(metadata["filesize"])
+            self._record_paths[record_id] = key
+            self._watch_dir(key)
+        return key
+
+    def untrack(self, record_ids: List[str]) -> None:
+        """记录删除后移除索引"""
+        with self._lock:
+            for record_id in record_ids:
+                key = self._record_paths.pop(record_id, None)
+                if key is None:
+                    continue
+                entry = self._files[key]
+                entry["records"].pop(record_id, None)
+                if not entry["records"]:
+                    del self._files[key]
+                    self._modified.pop(key, None)
+                elif key in self._modified:
+                    modified_ids = self._modified[key]["record_ids"]
+                    if record_id in modified_ids:
+                        modified_ids.remove(record_id)
+                    if not modified_ids:
+                        del self._modified[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._files.clear()
+            self._record_paths.clear()
+            self._modified.clear()
+
+    # ================= 变更检测 =================
+    def check(self, filepath: str) -> bool:
+        """
+        检查单个文件是否相对入库时发生变化，并更新变更标记
+
+        :return: 文件是否处于已修改状态
+        """
+        key = normalize_path(filepath)
+        with self._lock:
+            entry = self._files.get(key)
+            if entry is None:
+                return False
+
+            try:
+                stat = os.stat(key)
+            except OSError:
+                # 文件不存在时不视为修改
+                self._modified.pop(key, None)
+                return False
+
+            stale_ids = [
+                record_id for record_id, mtime in entry["records"].items()
+                if abs(stat.st_mtime - mtime) > MTIME_TOLERANCE
+            ]
+            if entry["size"] is not None and entry["size"] != stat.st_size:
+                stale_ids = list(entry["records"])
+
+            if not stale_ids:
+                self._modified.pop(key, None)
+                return False
+
+            previous = self._modified.get(key)
+            newly_modified = previous is None or previous["mtime"] != stat.st_mtime
+            self._modified[key] = {"mtime": stat.st_mtime, "record_ids": stale_ids}
+            listeners = list(self._listeners)
+
+        if newly_modified:
+            for listener in listeners:
+                try:
+                    listener(entry["filepath"], stale_ids, stat.st_mtime)
+                except Exception as e:
+                    logging.error(f"文件变更通知失败: {str(e)}")
+        return True
+
+    def check_all(self) -> None:
+        """检查所有已登记的文件"""
+        with self._lock:
+            keys = list(self._files)
+        for key in keys:
+            self.check(key)
+
+    def modified_records(self) -> List[dict]:
+        """
+        返回已修改文件及其记录
+
+        :return: [{"filepath", "record_ids", "last_modified"}]，按修改时间倒序排列
+        """
+        with self._lock:
+            result = []
+            for key, modified in self._modified.items():
+                result.append({
+                    "filepath": self._files[key]["filepath"],
+                    "record_ids": list(modified["record_ids"]),
+                    "last_modified": modified["mtime"]
+                })
+        result.sort(key=lambda item: item["last_modified"], reverse=True)
+        return result
+
+    def add_listener(self, listener: Callable[[str, List[str], float], None]) -> None:
+        """注册变更回调，参数为 (文件路径, 受影响的记录ID, 文件当前修改时间)，在监控线程中调用"""
+        self._listeners.append(listener)
+
+    # ================= 后台监控 =================
+    def start(self) -> None:
+        """启动后台监控，并做一次全量检查"""
+        if self.mode == "off" or self._observer or self._poll_thread:
+            return
+
+        if self.mode in ("auto", "watchdog") and Observer is not None:
+            self._observer = Observer()
+            self._observer.daemon = True
+            with self._lock:
+                self._watched_dirs.clear()
+                for key in self._files:
+                    self._watch_dir(key)
+            self._observer.start()
+            logging.info("文件监控已启动（watchdog）")
+        else:
+            if self.mode == "watchdog":
+                logging.warning("未安装watchdog，文件监控退化为轮询模式")
+            self._stop_event.clear()
+            self._poll_thread = threading.Thread(target=self._poll_loop, name="file-change-poller", daemon=True)
+            self._poll_thread.start()
+            logging.info(f"文件监控已启动（轮询，间隔{self.poll_interval}秒）")
+
+        threading.Thread(target=self.check_all, name="file-change-initial-check", daemon=True).start()
+
+    def stop(self) -> None:
+        if self._observer:
+            self._observer.stop()
+            self._observer = None
+        if self._poll_thread:
+            self._stop_event.set()
+            self._poll_thread = None
+
+    def _watch_dir(self, key: str) -> None:
+        """为文件所在目录注册watchdog监听（同一目录只注册一次）"""
+        if self._observer is None:
+            return
+        directory = os.path.dirname(key)
+        if directory in self._watched_dirs or not os.path.isdir(directory):
+            return
+        self._observer.schedule(_WatchdogHandler(self), directory, recursive=False)
+        self._watched_dirs.add(directory)
+
+    def _poll_loop(self) -> None:
+        while not self._stop_event.wait(self.poll_interval):
+            self.check_all()
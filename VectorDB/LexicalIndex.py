@@ -0,0 +1,128 @@
+# VectorDB/LexicalIndex.py
+"""
+BM25倒排索引模块
+
+与Chroma集合同步维护的本地倒排索引，用于精确词项（文件名、EPSG代码、DLMC等字段名、地名）的检索；
+中文按单字和相邻二元组切分，英文和数字按完整词切分，并保留 EPSG:4326 这类复合词
+"""
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+# 英文/数字词，允许以 : . - 连接（如 EPSG:4326、level2_data.shp）
+_WORD_PATTERN = re.compile(r"[A-Za-z0-9_]+(?:[:.\-][A-Za-z0-9_]+)*")
+_CJK_PATTERN = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """中英文混合分词"""
+    tokens = []
+    for word in _WORD_PATTERN.findall(text):
+        word = word.lower()
+        tokens.append(word)
+        # 复合词同时拆分出各组成部分
+        parts = re.split(r"[:.\-_]", word)
+        if len(parts) > 1:
+            tokens.extend(part for part in parts if part)
+
+    for run in _CJK_PATTERN.findall(text):
+        tokens.extend(run)
+        tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """
+    倒数排名融合
+
+    :param rankings: 多个按相关度排序的ID列表
+    :param k: 平滑常数
+    :return: 按融合得分排序的 (ID, 得分) 列表
+    """
+    scores = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] += 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class LexicalIndex:
+    """BM25倒排索引"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        # 词项 → {文档ID: 词频}
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        # 文档ID → 词项计数
+        self._doc_terms: Dict[str, Counter] = {}
+        # 文档ID → 文档长度（词项数）
+        self._doc_lengths: Dict[str, int] = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._doc_terms)
+
+    def add(self, ids: List[str], documents: List[str]) -> None:
+        with self._lock:
+            for doc_id, document in zip(ids, documents):
+                if doc_id in self._doc_terms:
+                    self._remove(doc_id)
+                terms = Counter(tokenize(document or ""))
+                self._doc_terms[doc_id] = terms
+                self._doc_lengths[doc_id] = sum(terms.values())
+                self._total_length += self._doc_lengths[doc_id]
+                for term, frequency in terms.items():
+                    self._postings[term][doc_id] = frequency
+
+    def remove(self, ids: List[str]) -> None:
+        with self._lock:
+            for doc_id in ids:
+                self._remove(doc_id)
+
+    def _remove(self, doc_id: str) -> None:
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        self._total_length -= self._doc_lengths.pop(doc_id)
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._postings.clear()
+            self._doc_terms.clear()
+            self._doc_lengths.clear()
+            self._total_length = 0
+
+    def search(self, query: str, limit: Optional[int] = 10) -> List[Tuple[str, float]]:
+        """
+        BM25检索
+
+        :param limit: 返回的最大结果数，None表示返回全部命中的文档
+        :return: 按得分排序的 (文档ID, 得分) 列表
+        """
+        query_terms = set(tokenize(query))
+        with self._lock:
+            total = len(self._doc_terms)
+            if not total or not query_terms:
+                return []
+            average_length = self._total_length / total
+
+            scores = defaultdict(float)
+            for term in query_terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, frequency in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc_id] / average_length)
+                    scores[doc_id] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
@@ -0,0 +1,178 @@
+# VectorDB/MetadataStats.py
+"""
+元数据统计模块
+
+随记录的添加/删除增量维护每个元数据字段的取值计数；
+某个字段的不同取值超过上限后切换为近似模式：HyperLogLog估算基数，Space-Saving保留高频取值，内存占用有界
+"""
+import hashlib
+import math
+import threading
+from collections import Counter
+from typing import Dict, List
+
+
+class HyperLogLog:
+    """HyperLogLog基数估计"""
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(self.size)
+
+    def add(self, value: str) -> None:
+        h = int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+        index = h >> (64 - self.precision)
+        remaining = h & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - remaining.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.size)
+        estimate = alpha * self.size ** 2 / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        # 小基数时使用线性计数修正
+        if estimate <= 2.5 * self.size and zeros:
+            estimate = self.size * math.log(self.size / zeros)
+        return int(round(estimate))
+
+
+class SpaceSaving:
+    """Space-Saving高频值统计，最多保留capacity个取值"""
+
+    def __init__(self, capacity: int = 50):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+
+    def add(self, value: str, count: int = 1) -> None:
+        if value in self.counts or len(self.counts) < self.capacity:
+            self.counts[value] = self.counts.get(value, 0) + count
+            return
+        # 替换计数最小的取值，继承其计数作为误差上界
+        minimum = min(self.counts, key=self.counts.get)
+        self.counts[value] = self.counts.pop(minimum) + count
+
+    def remove(self, value: str) -> None:
+        if value in self.counts:
+            self.counts[value] -= 1
+            if self.counts[value] <= 0:
+                del self.counts[value]
+
+    def top(self, k: int = None) -> List[tuple]:
+        return sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:k]
+
+
+class FieldStats:
+    """单个元数据字段的统计"""
+
+    def __init__(self, exact_limit: int, top_k: int):
+        self.exact_limit = exact_limit
+        self.top_k = top_k
+        self.count = 0
+        self.values = Counter()
+        self.sketch = None
+        self.heavy_hitters = None
+
+    @property
+    def approximate(self) -> bool:
+        return self.sketch is not None
+
+    def add(self, value: str) -> None:
+        self.count += 1
+        if self.approximate:
+            self.sketch.add(value)
+            self.heavy_hitters.add(value)
+            return
+
+        self.values[value] += 1
+        if len(self.values) > self.exact_limit:
+            self._to_approximate()
+
+    def remove(self, value: str) -> None:
+        self.count = max(0, self.count - 1)
+        if self.approximate:
+            # HyperLogLog不支持删除，基数估计为上界
+            self.heavy_hitters.remove(value)
+            return
+
+        self.values[value] -= 1
+        if self.values[value] <= 0:
+            del self.values[value]
+
+    def distinct(self) -> int:
+        return self.sketch.count() if self.approximate else len(self.values)
+
+    def _to_approximate(self) -> None:
+        self.sketch = HyperLogLog()
+        self.heavy_hitters = SpaceSaving(self.top_k)
+        for value, count in self.values.items():
+            self.sketch.add(value)
+            self.heavy_hitters.add(value, count)
+        self.values = Counter()
+
+    def to_dict(self) -> dict:
+        top_values = self.heavy_hitters.top(self.top_k) if self.approximate else self.values.most_common(self.top_k)
+        return {
+            "mode": "approximate" if self.approximate else "exact",
+            "count": self.count,
+            "distinct": self.distinct(),
+            "top_values": [{"value": value, "count": count} for value, count in top_values]
+        }
+
+
+class MetadataStats:
+    """元数据统计存储"""
+
+    def __init__(self, exact_limit: int = 10000, top_k: int = 50):
+        """
+        :param exact_limit: 单个字段精确统计的最大不同取值数，超出后切换为近似模式
+        :param top_k: 近似模式下保留的高频取值数量
+        """
+        self.exact_limit = exact_limit
+        self.top_k = top_k
+        self.total = 0
+        self.fields: Dict[str, FieldStats] = {}
+        self._lock = threading.Lock()
+
+    def add(self, metadatas: List[dict]) -> None:
+        with self._lock:
+            for metadata in metadatas:
+                self.total += 1
+                for key, value in (metadata or {}).items():
+                    if key not in self.fields:
+                        self.fields[key] = FieldStats(self.exact_limit, self.top_k)
+                    self.fields[key].add(str(value))
+
+    def remove(self, metadatas: List[dict]) -> None:
+        with self._lock:
+            for metadata in metadatas:
+                self.total = max(0, self.total - 1)
+                for key, value in (metadata or {}).items():
+                    if key in self.fields:
+                        self.fields[key].remove(str(value))
+                        if self.fields[key].count == 0:
+                            del self.fields[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.total = 0
+            self.fields.clear()
+
+    def field_values(self) -> Dict[str, List[str]]:
+        """每个字段的取值列表（近似模式下为高频取值）"""
+        with self._lock:
+            result = {}
+            for key, field in self.fields.items():
+                if field.approximate:
+                    result[key] = sorted(value for value, _ in field.heavy_hitters.top())
+                else:
+                    result[key] = sorted(field.values)
+            return result
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "total_count": self.total,
+                "fields": {key: field.to_dict() for key, field in self.fields.items()}
+            }
@@ -0,0 +1,184 @@
+# VectorDB/NearDuplicateIndex.py
+"""
+近似重复检测模块
+
+对文本的字符5-gram计算MinHash签名，按分段（LSH banding）建立桶索引，
+写入前查找Jaccard相似度超过阈值的已有记录，在计算向量之前发现同一批测绘分幅等几乎相同的描述；
+签名持久化到SQLite，启动时加载后在内存中重建桶索引
+"""
+import sqlite3
+import threading
+import zlib
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# 大于2^32的素数，配合小于2^31的系数保证乘法不溢出uint64
+_PRIME = np.uint64(4294967311)
+_SHINGLE_SIZE = 5
+
+
+class NearDuplicateIndex:
+    """MinHash + LSH 近似重复索引"""
+
+    def __init__(self, path: str = None, threshold: float = 0.8, num_perm: int = 128, bands: int = 32,
+                 seed: int = 1):
+        """
+        :param path: SQLite文件路径，为None时只在内存中维护
+        :param threshold: Jaccard相似度阈值
+        :param num_perm: MinHash签名长度
+        :param bands: LSH分段数，每段 num_perm / bands 个签名值；128/32时相似度0.8的文本几乎都会进入候选
+        :param seed: 哈希系数的随机种子，持久化的签名依赖该值，不可随意修改
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm 必须是 bands 的整数倍")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 1 << 31, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 31, num_perm, dtype=np.uint64)
+
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._filepaths: Dict[str, Optional[str]] = {}
+        self._buckets: List[Dict[bytes, set]] = [defaultdict(set) for _ in range(bands)]
+        self._lock = threading.Lock()
+
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS signatures ("
+                "  id TEXT PRIMARY KEY,"
+                "  filepath TEXT,"
+                "  signature BLOB NOT NULL"
+                ")"
+            )
+            self._conn.commit()
+            for record_id, filepath, blob in self._conn.execute("SELECT id, filepath, signature FROM signatures"):
+                signature = np.frombuffer(blob, dtype=np.uint32)
+                if len(signature) == num_perm:
+                    self._insert(record_id, signature, filepath)
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def __contains__(self, record_id: str):
+        return record_id in self._signatures
+
+    def ids(self) -> set:
+        with self._lock:
+            return set(self._signatures)
+
+    def signature(self, text: str) -> np.ndarray:
+        """计算文本的MinHash签名"""
+        text = " ".join(str(text).lower().split())
+        if len(text) <= _SHINGLE_SIZE:
+            shingles = {text}
+        else:
+            shingles = {text[i:i + _SHINGLE_SIZE] for i in range(len(text) - _SHINGLE_SIZE + 1)}
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+            dtype=np.uint64, count=len(shingles)
+        )
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _PRIME
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def _insert(self, record_id: str, signature: np.ndarray, filepath: Optional[str]) -> None:
+        if record_id in self._signatures:
+            self._discard(record_id)
+        self._signatures[record_id] = signature
+        self._filepaths[record_id] = filepath
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            bucket[key].add(record_id)
+
+    def _discard(self, record_id: str) -> None:
+        signature = self._signatures.pop(record_id, None)
+        self._filepaths.pop(record_id, None)
+        if signature is None:
+            return
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            members = bucket.get(key)
+            if members is not None:
+                members.discard(record_id)
+                if not members:
+                    del bucket[key]
+
+    def query(self, signature: np.ndarray, filepath: str = None) -> Optional[Tuple[str, float]]:
+        """
+        查找最相似的近似重复记录
+
+        :param signature: 待检测文本的签名
+        :param filepath: 待检测文本的文件路径，同一文件的旧记录不视为重复（文件更新后的重建索引）
+        :return: (记录ID, 估计的Jaccard相似度)，没有超过阈值的记录时返回None
+        """
+        with self._lock:
+            candidates = set()
+            for bucket, key in zip(self._buckets, self._band_keys(signature)):
+                members = bucket.get(key)
+                if members:
+                    candidates.update(members)
+
+            best = None
+            for record_id in candidates:
+                if filepath and self._filepaths.get(record_id) == filepath:
+                    continue
+                similarity = float(np.mean(self._signatures[record_id] == signature))
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (record_id, similarity)
+            return best
+
+    def add(self, ids: List[str], documents: List[str], filepaths: List[Optional[str]] = None,
+            signatures: List[np.ndarray] = None) -> None:
+        """添加记录，可传入已计算好的签名"""
+        filepaths = filepaths or [None] * len(ids)
+        signatures = signatures or [self.signature(document or "") for document in documents]
+        with self._lock:
+            for record_id, signature, filepath in zip(ids, signatures, filepaths):
+                self._insert(record_id, signature, filepath)
+            if self._conn is not None:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO signatures (id, filepath, signature) VALUES (?, ?, ?)",
+                    [(record_id, filepath, signature.tobytes())
+                     for record_id, signature, filepath in zip(ids, signatures, filepaths)]
+                )
+                self._conn.commit()
+
+    def update_filepaths(self, ids: List[str], filepaths: List[Optional[str]]) -> None:
+        """记录的文件路径变化时同步更新"""
+        with self._lock:
+            changed = [
+                (filepath, record_id) for record_id, filepath in zip(ids, filepaths)
+                if record_id in self._signatures and self._filepaths[record_id] != filepath
+            ]
+            for filepath, record_id in changed:
+                self._filepaths[record_id] = filepath
+            if changed and self._conn is not None:
+                self._conn.executemany("UPDATE signatures SET filepath = ? WHERE id = ?", changed)
+                self._conn.commit()
+
+    def remove(self, ids: List[str]) -> None:
+        with self._lock:
+            for record_id in ids:
+                self._discard(record_id)
+            if self._conn is not None:
+                self._conn.executemany("DELETE FROM signatures WHERE id = ?", [(record_id,) for record_id in ids])
+                self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._signatures.clear()
+            self._filepaths.clear()
+            self._buckets = [defaultdict(set) for _ in range(self.bands)]
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM signatures")
+                self._conn.commit()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
@@ -0,0 +1,77 @@
+# VectorDB/QueryCache.py
+"""
+查询结果缓存模块
+
+以 (规范化查询文本, 返回条数, 元数据过滤条件) 为键的LRU/TTL缓存；
+集合每次写入都会递增代数并清空缓存，保证不会返回过期结果
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class QueryCache:
+    """写入感知的查询结果缓存"""
+
+    def __init__(self, max_entries: int = 256, ttl: float = 300):
+        """
+        :param max_entries: 最大缓存条目数
+        :param ttl: 缓存有效期（秒）
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(query: str, *args) -> str:
+        """生成缓存键：查询文本去除多余空白并转小写，其余参数序列化后拼接"""
+        normalized = " ".join(str(query).split()).lower()
+        return json.dumps([normalized, *args], sort_keys=True, ensure_ascii=False, default=str)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, value: Any, generation: int) -> None:
+        """
+        写入缓存
+
+        :param generation: 开始查询时的集合代数，查询期间发生过写入则不缓存
+        """
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """集合发生写入时调用"""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "generation": self.generation,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
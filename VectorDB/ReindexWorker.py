@@ -0,0 +1,151 @@
+# VectorDB/ReindexWorker.py
+"""
+后台重建索引模块
+
+接收已修改的文件路径，经有界并发的任务队列重新生成文件画像；
+画像或描述未变化时只刷新元数据，变化时重新生成描述并原子替换旧记录，失败时指数退避重试
+"""
+import asyncio
+import hashlib
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+
+class ReindexWorker:
+    """文件重建索引后台任务"""
+
+    def __init__(self, memory, profile: Callable[[str], Awaitable[dict]], describe: Callable[[str], Awaitable[str]],
+                 concurrency: int = 2, max_retries: int = 3, retry_delay: float = 2.0):
+        """
+        :param memory: VectorDBMemory实例
+        :param profile: 生成文件画像的协程函数，返回 {"status": ..., "data": ...}
+        :param describe: 生成文件描述（入库内容）的协程函数
+        :param concurrency: 同时处理的文件数
+        :param max_retries: 单个文件的最大重试次数
+        :param retry_delay: 首次重试的等待时间（秒），之后按指数增长
+        """
+        self.memory = memory
+        self.profile = profile
+        self.describe = describe
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._workers = []
+        self._pending = set()
+        # 文件路径 → 最近一次处理状态
+        self._status: Dict[str, dict] = {}
+        self._counters = {"reindexed": 0, "metadata_refreshed": 0, "failed": 0}
+
+    def start(self) -> None:
+        """启动工作协程，需在事件循环中调用"""
+        if self._workers:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"reindex-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+        logging.info(f"重建索引任务已启动，并发数 {self.concurrency}")
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, filepath: str) -> None:
+        """提交文件（同一文件排队期间不会重复入队）"""
+        if filepath in self._pending:
+            return
+        self._pending.add(filepath)
+        self._set_status(filepath, "queued", attempts=0)
+        self._queue.put_nowait(filepath)
+
+    def submit_threadsafe(self, filepath: str, *args) -> None:
+        """从其他线程（如文件监控线程）提交文件，可直接注册为FileChangeTracker的回调"""
+        self._loop.call_soon_threadsafe(self.submit, filepath)
+
+    def status(self) -> dict:
+        """返回队列及各文件的处理状态"""
+        return {
+            "queue_size": self._queue.qsize() if self._queue else 0,
+            "running": sum(1 for item in self._status.values() if item["state"] == "running"),
+            "counters": dict(self._counters),
+            "files": dict(self._status)
+        }
+
+    async def _worker(self) -> None:
+        while True:
+            filepath = await self._queue.get()
+            try:
+                await self._process_with_retry(filepath)
+            finally:
+                self._pending.discard(filepath)
+                self._queue.task_done()
+
+    async def _process_with_retry(self, filepath: str) -> None:
+        for attempt in range(1, self.max_retries + 1):
+            self._set_status(filepath, "running", attempts=attempt)
+            try:
+                state = await self._reindex(filepath)
+                self._counters[state] += 1
+                self._set_status(filepath, state, attempts=attempt)
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"重建索引失败（第{attempt}次）: {filepath}，{str(e)}")
+                if attempt == self.max_retries:
+                    self._counters["failed"] += 1
+                    self._set_status(filepath, "failed", attempts=attempt, error=str(e))
+                    return
+                # 指数退避并加入随机抖动
+                delay = self.retry_delay * (2 ** (attempt - 1))
+                await asyncio.sleep(delay + random.uniform(0, delay / 2))
+
+    async def _reindex(self, filepath: str) -> str:
+        """
+        重建单个文件的索引
+
+        :return: "reindexed"（重新生成并替换记录）或 "metadata_refreshed"（内容未变，仅刷新元数据）
+        """
+        records = await self.memory.get_records_by_filepath(filepath)
+
+        result = await self.profile(filepath)
+        if result.get("status") != "success":
+            raise RuntimeError(result.get("message", "文件画像生成失败"))
+        profile_hash = hashlib.md5(str(result["data"]).encode()).hexdigest()
+
+        # 文件画像未变化，描述无需重新生成
+        if records and all(metadata.get("profile_hash") == profile_hash for _, _, metadata in records):
+            await self.memory.refresh_file_metadata([record_id for record_id, _, _ in records], filepath)
+            return "metadata_refreshed"
+
+        description = await self.describe(filepath)
+        # 分块记录按整篇内容的哈希比较
+        description_hash = hashlib.md5(description.encode()).hexdigest()
+        if records and all(
+                metadata.get("content_hash", hashlib.md5(doc.encode()).hexdigest()) == description_hash
+                for _, doc, metadata in records):
+            await self.memory.refresh_file_metadata(
+                [record_id for record_id, _, _ in records], filepath, {"profile_hash": profile_hash}
+            )
+            return "metadata_refreshed"
+
+        await self.memory.replace_file_records(
+            [record_id for record_id, _, _ in records], description, filepath, {"profile_hash": profile_hash}
+        )
+        return "reindexed"
+
+    def _set_status(self, filepath: str, state: str, attempts: int, error: str = None) -> None:
+        self._status[filepath] = {
+            "state": state,
+            "attempts": attempts,
+            "error": error,
+            "updated_at": time.strftime('%Y-%m-%d %H:%M:%S')
+        }
@@ -0,0 +1,97 @@
+# VectorDB/SpatialIndex.py
+"""
+空间范围索引模块
+
+记录每条数据描述的经纬度范围，用STRtree建立内存R树索引，
+按bbox相交关系在向量检索之前筛选出空间相关的记录
+"""
+import re
+import threading
+from typing import Dict, List, Optional, Sequence, Set
+
+from shapely import box
+from shapely.strtree import STRtree
+
+EXTENT_KEYS = ("min_lon", "min_lat", "max_lon", "max_lat")
+
+# 匹配文件画像及GeoFileReader描述中的 “经度：a ~ b”、“纬度：c ~ d”
+_NUMBER = r"(-?\d+(?:\.\d+)?)"
+_LON_PATTERN = re.compile(r"经度[^\d\-\n]{0,10}" + _NUMBER + r"\s*[~～\-至到]\s*" + _NUMBER)
+_LAT_PATTERN = re.compile(r"纬度[^\d\-\n]{0,10}" + _NUMBER + r"\s*[~～\-至到]\s*" + _NUMBER)
+
+
+def parse_extent(text: str) -> Optional[dict]:
+    """从描述文本中解析经纬度范围，解析失败时返回None"""
+    lon = _LON_PATTERN.search(text or "")
+    lat = _LAT_PATTERN.search(text or "")
+    if not lon or not lat:
+        return None
+
+    min_lon, max_lon = sorted(float(value) for value in lon.groups())
+    min_lat, max_lat = sorted(float(value) for value in lat.groups())
+    if not (-180 <= min_lon <= 180 and -180 <= max_lon <= 180 and -90 <= min_lat <= 90 and -90 <= max_lat <= 90):
+        return None
+    return {"min_lon": min_lon, "min_lat": min_lat, "max_lon": max_lon, "max_lat": max_lat}
+
+
+def extent_from_metadata(metadata: dict) -> Optional[tuple]:
+    """从元数据中读取范围，返回 (min_lon, min_lat, max_lon, max_lat)"""
+    if not metadata or not all(key in metadata for key in EXTENT_KEYS):
+        return None
+    return tuple(float(metadata[key]) for key in EXTENT_KEYS)
+
+
+class SpatialIndex:
+    """基于STRtree的空间范围索引，STRtree不可修改，数据变化后在下次查询时重建"""
+
+    def __init__(self):
+        self._extents: Dict[str, tuple] = {}
+        self._tree: Optional[STRtree] = None
+        self._tree_ids: List[str] = []
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._extents)
+
+    def add(self, ids: List[str], metadatas: List[dict]) -> None:
+        with self._lock:
+            for record_id, metadata in zip(ids, metadatas):
+                extent = extent_from_metadata(metadata)
+                if extent is not None:
+                    self._extents[record_id] = extent
+                else:
+                    self._extents.pop(record_id, None)
+            self._dirty = True
+
+    def remove(self, ids: List[str]) -> None:
+        with self._lock:
+            for record_id in ids:
+                self._extents.pop(record_id, None)
+            self._dirty = True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._extents.clear()
+            self._tree = None
+            self._tree_ids = []
+            self._dirty = False
+
+    def intersects(self, bbox: Sequence[float]) -> Set[str]:
+        """
+        查询与bbox相交的记录
+
+        :param bbox: [min_lon, min_lat, max_lon, max_lat]
+        :return: 记录ID集合
+        """
+        with self._lock:
+            if self._dirty or self._tree is None:
+                self._tree_ids = list(self._extents)
+                self._tree = STRtree([box(*self._extents[record_id]) for record_id in self._tree_ids])
+                self._dirty = False
+            tree, tree_ids = self._tree, self._tree_ids
+
+        if not tree_ids:
+            return set()
+        indices = tree.query(box(*bbox), predicate="intersects")
+        return {tree_ids[index] for index in indices}
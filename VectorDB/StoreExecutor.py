@@ -0,0 +1,80 @@
+# VectorDB/StoreExecutor.py
+"""
+向量库执行器模块
+
+Chroma的接口都是同步调用（HNSW检索、SQLite读写），直接在事件循环中执行会阻塞所有请求。
+读操作交给有界线程池并发执行，写操作交给单线程通道串行执行；
+删除重建集合等操作以独占方式执行，期间不会有读操作使用旧集合
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Callable
+
+
+class ReadWriteLock:
+    """读写锁：读操作可并发，独占操作需等待进行中的读操作结束，并阻止新的读操作"""
+
+    def __init__(self):
+        self._readers = 0
+        self._exclusive = False
+        self._condition = asyncio.Condition()
+
+    @asynccontextmanager
+    async def shared(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: not self._exclusive)
+            self._readers += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._readers -= 1
+                self._condition.notify_all()
+
+    @asynccontextmanager
+    async def exclusive(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: not self._exclusive)
+            self._exclusive = True
+            await self._condition.wait_for(lambda: self._readers == 0)
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._exclusive = False
+                self._condition.notify_all()
+
+
+class StoreExecutor:
+    """读写分离的向量库线程池"""
+
+    def __init__(self, max_readers: int = 4):
+        """
+        :param max_readers: 并发读线程数
+        """
+        self._reader = ThreadPoolExecutor(max_workers=max_readers, thread_name_prefix="vector-store-reader")
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vector-store-writer")
+        self._lock = ReadWriteLock()
+
+    async def read(self, func: Callable, *args, **kwargs) -> Any:
+        """在读线程池中执行"""
+        loop = asyncio.get_running_loop()
+        async with self._lock.shared():
+            return await loop.run_in_executor(self._reader, functools.partial(func, *args, **kwargs))
+
+    async def write(self, func: Callable, *args, **kwargs) -> Any:
+        """在写通道中串行执行"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._writer, functools.partial(func, *args, **kwargs))
+
+    async def exclusive(self, func: Callable, *args, **kwargs) -> Any:
+        """等待进行中的读操作结束后，在写通道中独占执行"""
+        loop = asyncio.get_running_loop()
+        async with self._lock.exclusive():
+            return await loop.run_in_executor(self._writer, functools.partial(func, *args, **kwargs))
+
+    def shutdown(self) -> None:
+        self._reader.shutdown(wait=False)
+        self._writer.shutdown(wait=True)
@@ -0,0 +1,78 @@
+# VectorDB/VectorCompression.py
+"""
+向量压缩模块
+
+Matryoshka截断：保留向量前若干维并重新归一化后写入Chroma索引（text-embedding-v3等支持多维度输出的模型前几维已包含主要信息），
+检索时先用紧凑向量召回候选，再用旁路文件中的全精度向量重排；
+int8标量量化仅用于基准测试对比（Chroma索引只接受float32向量）
+"""
+from typing import List
+
+import numpy as np
+
+
+def normalize(matrix: np.ndarray) -> np.ndarray:
+    """按行L2归一化"""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.clip(norms, 1e-12, None)
+
+
+def truncate(matrix: np.ndarray, dimensions: int) -> np.ndarray:
+    """Matryoshka截断：保留前dimensions维并重新归一化"""
+    return normalize(np.asarray(matrix, dtype=np.float32)[..., :dimensions])
+
+
+def quantize_int8(matrix: np.ndarray) -> tuple:
+    """
+    按维度对称的int8标量量化
+
+    :return: (int8编码矩阵, 每个维度的缩放系数)
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    scale = np.clip(np.abs(matrix).max(axis=0), 1e-12, None) / 127.0
+    codes = np.clip(np.round(matrix / scale), -127, 127).astype(np.int8)
+    return codes, scale.astype(np.float32)
+
+
+def dequantize_int8(codes: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    return codes.astype(np.float32) * scale
+
+
+class VectorCompressor:
+    """向量压缩配置：决定写入Chroma索引的向量形式及检索时的重排候选数"""
+
+    MODES = ("none", "matryoshka")
+
+    def __init__(self, mode: str = "none", dimensions: int = 256, rerank_factor: int = 4):
+        """
+        :param mode: none（原始float32向量）或 matryoshka（截断到dimensions维）
+        :param dimensions: 截断后的维度
+        :param rerank_factor: 重排候选倍数，紧凑向量召回 n_results * rerank_factor 条后用全精度向量重排
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"不支持的向量压缩模式: {mode}")
+        self.mode = mode
+        self.dimensions = dimensions
+        self.rerank_factor = max(1, rerank_factor)
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "none"
+
+    @property
+    def space(self) -> dict:
+        """写入集合元数据的存储形式标识，压缩方式不同的向量不能混入同一集合"""
+        if not self.enabled:
+            return {}
+        return {"embedding:storage": f"{self.mode}:{self.dimensions}"}
+
+    def compress(self, vectors: List[List[float]]) -> List[List[float]]:
+        """将全精度向量转换为写入索引的紧凑向量"""
+        if not self.enabled or not vectors:
+            return vectors
+        return truncate(np.asarray(vectors, dtype=np.float32), self.dimensions).tolist()
+
+    def candidates(self, n_results: int) -> int:
+        """紧凑向量召回的候选数"""
+        return n_results * self.rerank_factor if self.enabled else n_results
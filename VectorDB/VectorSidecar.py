@@ -0,0 +1,215 @@
+# VectorDB/VectorSidecar.py
+"""
+全精度向量旁路存储模块
+
+按行存放归一化后的float32向量，以内存映射方式读写，只有被访问的页才会载入内存；
+行号与记录ID的对应关系以追加日志保存，启动时回放，删除后的空行在下次写入时复用；
+同时用于压缩存储时的全精度重排和小规模候选集的精确检索
+"""
+import os
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from VectorDB.VectorCompression import normalize
+
+
+class VectorSidecar:
+    """内存映射的全精度向量文件"""
+
+    def __init__(self, directory: str, name: str, dimensions: int, initial_capacity: int = 1024):
+        """
+        :param directory: 存放目录
+        :param name: 文件名（一般为集合名称）
+        :param dimensions: 向量维度
+        :param initial_capacity: 初始行数，写满后容量翻倍
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.dimensions = dimensions
+        self.initial_capacity = initial_capacity
+        self.vector_path = os.path.join(directory, f"{name}.f32")
+        self.log_path = os.path.join(directory, f"{name}.ids")
+        self._rows: Dict[str, int] = {}
+        self._row_ids: List[Optional[str]] = []
+        self._free: List[int] = []
+        self._size = 0
+        self._log_lines = 0
+        self._matrix = None
+        self._lock = threading.RLock()
+
+        self._load()
+        self._open(max(self.initial_capacity, self._size))
+        self._log = open(self.log_path, "a", encoding="utf-8")
+        if self._log_lines == 0:
+            self._append_log([f"#\t{self.dimensions}"])
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, record_id: str):
+        return record_id in self._rows
+
+    def _load(self) -> None:
+        """回放ID日志，维度与当前配置不一致时丢弃旧文件"""
+        if not os.path.exists(self.log_path):
+            self._remove_files()
+            return
+
+        with open(self.log_path, "r", encoding="utf-8") as log:
+            for line in log:
+                parts = line.rstrip("\n").split("\t")
+                self._log_lines += 1
+                if parts[0] == "#":
+                    if int(parts[1]) != self.dimensions:
+                        self._rows.clear()
+                        self._size = 0
+                        self._log_lines = 0
+                        self._remove_files()
+                        return
+                elif parts[0] == "+":
+                    row = int(parts[1])
+                    self._rows[parts[2]] = row
+                    self._size = max(self._size, row + 1)
+                elif parts[0] == "-":
+                    self._rows.pop(parts[2], None)
+
+        self._row_ids = [None] * self._size
+        for record_id, row in self._rows.items():
+            self._row_ids[row] = record_id
+        self._free = [row for row in range(self._size - 1, -1, -1) if self._row_ids[row] is None]
+
+    def _remove_files(self) -> None:
+        for path in (self.vector_path, self.log_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _open(self, capacity: int) -> None:
+        """按容量扩展文件并重新建立内存映射"""
+        if self._matrix is not None:
+            self._matrix.flush()
+            self._matrix = None
+        size = capacity * self.dimensions * 4
+        with open(self.vector_path, "ab") as file:
+            if file.tell() < size:
+                file.truncate(size)
+        capacity = os.path.getsize(self.vector_path) // (self.dimensions * 4)
+        self._matrix = np.memmap(self.vector_path, dtype=np.float32, mode="r+", shape=(capacity, self.dimensions))
+
+    def _append_log(self, lines: List[str]) -> None:
+        self._log.write("".join(f"{line}\n" for line in lines))
+        self._log.flush()
+        self._log_lines += len(lines)
+
+    def _compact_log(self) -> None:
+        """日志中失效的行过多时重写日志"""
+        temp_path = f"{self.log_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as log:
+            log.write(f"#\t{self.dimensions}\n")
+            log.writelines(f"+\t{row}\t{record_id}\n" for record_id, row in self._rows.items())
+        self._log.close()
+        os.replace(temp_path, self.log_path)
+        self._log = open(self.log_path, "a", encoding="utf-8")
+        self._log_lines = len(self._rows) + 1
+
+    def put(self, ids: List[str], vectors: List[List[float]]) -> None:
+        """写入（或覆盖）记录的全精度向量"""
+        if not ids:
+            return
+        vectors = normalize(np.asarray(vectors, dtype=np.float32))
+        with self._lock:
+            rows, lines = [], []
+            for record_id in ids:
+                row = self._rows.get(record_id)
+                if row is None:
+                    if self._free:
+                        row = self._free.pop()
+                    else:
+                        row = self._size
+                        self._size += 1
+                        self._row_ids.append(None)
+                    self._rows[record_id] = row
+                    self._row_ids[row] = record_id
+                    lines.append(f"+\t{row}\t{record_id}")
+                rows.append(row)
+
+            if self._size > self._matrix.shape[0]:
+                self._open(max(self._size, self._matrix.shape[0] * 2))
+            self._matrix[rows] = vectors
+            self._matrix.flush()
+            if lines:
+                self._append_log(lines)
+
+    def get(self, ids: List[str]) -> tuple:
+        """
+        读取全精度向量
+
+        :return: (存在于旁路文件中的ID列表, 对应的向量矩阵)
+        """
+        with self._lock:
+            found = [record_id for record_id in ids if record_id in self._rows]
+            rows = [self._rows[record_id] for record_id in found]
+            return found, np.array(self._matrix[rows], dtype=np.float32)
+
+    def ids(self) -> Set[str]:
+        with self._lock:
+            return set(self._rows)
+
+    def search(self, query_vector: List[float], k: int, ids: Set[str] = None) -> List[Tuple[str, float]]:
+        """
+        精确检索：一次矩阵向量乘计算余弦相似度，argpartition取前k个
+
+        :param query_vector: 查询向量
+        :param k: 返回条数
+        :param ids: 候选记录ID，None表示全部记录；不在旁路文件中的ID被忽略
+        :return: 按余弦距离升序排列的 (ID, 距离) 列表
+        """
+        query = normalize(np.asarray(query_vector, dtype=np.float32))
+        with self._lock:
+            if ids is None:
+                rows = None
+                scores = self._matrix[:self._size] @ query
+                if self._free:
+                    scores[self._free] = -np.inf
+            else:
+                rows = np.array([self._rows[record_id] for record_id in ids if record_id in self._rows], dtype=np.int64)
+                scores = self._matrix[rows] @ query if len(rows) else np.empty(0, dtype=np.float32)
+            row_ids = self._row_ids
+
+            k = min(k, len(self._rows) if rows is None else len(rows))
+            if k <= 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [
+                (row_ids[top_index if rows is None else rows[top_index]], float(1.0 - scores[top_index]))
+                for top_index in top
+            ]
+
+    def remove(self, ids: List[str]) -> None:
+        with self._lock:
+            lines = []
+            for record_id in ids:
+                row = self._rows.pop(record_id, None)
+                if row is not None:
+                    self._row_ids[row] = None
+                    self._free.append(row)
+                    lines.append(f"-\t{row}\t{record_id}")
+            if lines:
+                self._append_log(lines)
+            if self._log_lines > 2 * len(self._rows) + 1024:
+                self._compact_log()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rows.clear()
+            self._row_ids = []
+            self._free = []
+            self._size = 0
+            self._compact_log()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._matrix is not None:
+                self._matrix.flush()
+            self._log.close()
@@ -1,20 +1,77 @@
 from autogen_core.memory import Memory, MemoryContent, UpdateContextResult, MemoryQueryResult
 from autogen_core.model_context import ChatCompletionContext
+from autogen_core.models import SystemMessage
 import chromadb
 from chromadb.config import Settings
-from typing import List
+from typing import Callable, List
 import os
-from openai import OpenAI
 import json
+import asyncio
+import time
 import hashlib
+import math
+import logging
+import numpy as np
+from VectorDB.EmbeddingCache import EmbeddingCache
+from VectorDB.EmbeddingProviders import BaseEmbeddingProvider, EmbeddingProviderFactory
+from VectorDB.FileChangeTracker import FileChangeTracker
+from VectorDB.StoreExecutor import StoreExecutor
+from VectorDB.MetadataStats import MetadataStats
+from VectorDB.QueryCache import QueryCache
+from VectorDB.LexicalIndex import LexicalIndex, reciprocal_rank_fusion
+from VectorDB.SpatialIndex import SpatialIndex, parse_extent, EXTENT_KEYS
+from VectorDB.VectorCompression import VectorCompressor, normalize
+from VectorDB.VectorSidecar import VectorSidecar
+from VectorDB.NearDuplicateIndex import NearDuplicateIndex
+from VectorDB.DocumentChunker import DocumentChunker
+from VectorDB.ContextSelector import ContextSelector
+from connection_manager import manager
+from datetime import datetime
+from collections import defaultdict
 
 # 修改配置文件路径
 with open('config.json', 'r', encoding='utf-8') as configFile:
     config = json.load(configFile)
 
+# 近似重复内容的处理策略：keep 照常写入并标记、skip 跳过、merge 只在已有记录的元数据中记录来源
+NEAR_DUPLICATE_POLICIES = ("keep", "skip", "merge")
+
+# 可调整的HNSW参数及对应的配置项
+HNSW_CONFIG_KEYS = {
+    "M": "HNSW邻居数",
+    "construction_ef": "HNSW构建ef",
+    "search_ef": "HNSW检索ef",
+    "batch_size": "HNSW批大小",
+    "sync_threshold": "HNSW同步阈值"
+}
+
 
 class VectorDBMemory(Memory):
-    def __init__(self, collection_name: str = "autogen_memory"):
+    # 游标分页查询时间窗口的下限（秒）
+    MIN_CURSOR_WINDOW = 0.001
+
+    def __init__(self, collection_name: str = "autogen_memory", embedding_provider: BaseEmbeddingProvider = None,
+                 hnsw_params: dict = None, rebuild_on_mismatch: bool = None):
+        """
+        Args:
+            collection_name: 集合名称
+            embedding_provider: Embedding提供方，默认按配置"Embedding提供方"创建
+            hnsw_params: HNSW参数（M、construction_ef、search_ef、batch_size、sync_threshold），
+                优先级高于配置"集合HNSW参数"中该集合的设置及全局的HNSW配置项
+            rebuild_on_mismatch: 已有集合的向量空间与当前Embedding配置不一致时，是否删除并按当前配置重建集合
+                （原有数据全部丢失），默认读取配置"向量空间不一致时重建集合"，不重建时抛出异常
+        """
+        # Embedding提供方（远程接口或本地模型）
+        self.embedding_provider = embedding_provider or EmbeddingProviderFactory.create(config)
+        self.embedding_model = self.embedding_provider.model
+        self.embedding_dimensions = self.embedding_provider.dimensions
+        # 向量压缩：索引中存放截断后的紧凑向量，全精度向量存放在旁路文件中用于重排
+        self.compressor = VectorCompressor(
+            mode=config.get("向量压缩模式", "none"),
+            dimensions=config.get("向量压缩维度", 256),
+            rerank_factor=config.get("重排候选倍数", 4)
+        )
+
         # 从配置文件获取数据库路径
         db_path = os.path.normpath(os.path.join(config["向量数据库路径"]))
         print(f"数据库存储路径: {db_path}")
@@ -23,9 +80,169 @@ class VectorDBMemory(Memory):
         os.makedirs(db_path, exist_ok=True)
         
         self.client = chromadb.PersistentClient(path=db_path)
+        self.hnsw_metadata = self._hnsw_metadata(collection_name, hnsw_params)
         self.collection = self.client.get_or_create_collection(
             name=collection_name,
-            metadata={"hnsw:space": "cosine"}
+            metadata={"hnsw:space": "cosine", **self.hnsw_metadata, **self._embedding_space()}
+        )
+        if rebuild_on_mismatch is None:
+            rebuild_on_mismatch = config.get("向量空间不一致时重建集合", False)
+        self._check_embedding_space(rebuild_on_mismatch)
+        self._check_hnsw_params()
+        # 归一化全精度向量的内存映射矩阵，用于压缩存储时的重排及小规模候选集的精确检索
+        self.vector_sidecar = VectorSidecar(
+            os.path.join(db_path, "vectors"), collection_name, self.embedding_dimensions
+        )
+        self.exact_search_threshold = config.get("精确检索阈值", 20000)
+        self.search_plan_counts = {"exact": 0, "ann": 0}
+        # Chroma为同步接口，统一放到线程池执行：读操作并发，写操作串行
+        self._store = StoreExecutor(max_readers=config.get("向量库读线程数", 4))
+
+        # Embedding持久化缓存（与向量数据库同目录）
+        self.embedding_cache = EmbeddingCache(
+            db_path,
+            max_entries=config.get("Embedding缓存容量", 50000)
+        )
+
+        # 文件变更跟踪索引（启动时加载一次，之后随增删增量维护）
+        self.file_tracker = FileChangeTracker(
+            mode=config.get("文件监控模式", "auto"),
+            poll_interval=config.get("文件监控轮询间隔", 5)
+        )
+        existing = self.collection.get(include=["documents", "metadatas"])
+        self.file_tracker.load(existing['ids'], existing['metadatas'])
+
+        # 元数据统计、BM25倒排索引及空间范围索引（与文件跟踪索引共用启动时的一次加载，之后随增删增量维护）
+        self.metadata_stats = MetadataStats(
+            exact_limit=config.get("统计精确模式上限", 10000),
+            top_k=config.get("统计高频值数量", 50)
+        )
+        self.metadata_stats.add(existing['metadatas'])
+        self.lexical_index = LexicalIndex()
+        self.lexical_index.add(existing['ids'], existing['documents'])
+        self.spatial_index = SpatialIndex()
+        self.spatial_index.add(existing['ids'], existing['metadatas'])
+        self._sync_vector_sidecar(existing['ids'])
+
+        # 近似重复检测索引（MinHash签名持久化，写入前在计算向量之前检测）
+        self.near_duplicate_policy = config.get("近重复处理策略", "keep")
+        if self.near_duplicate_policy not in NEAR_DUPLICATE_POLICIES:
+            raise ValueError(f"不支持的近重复处理策略: {self.near_duplicate_policy}")
+        self.near_duplicate_index = NearDuplicateIndex(
+            os.path.join(db_path, f"near_duplicates_{collection_name}.sqlite3"),
+            threshold=config.get("近重复阈值", 0.8)
+        )
+        self._sync_near_duplicate_index(existing)
+
+        # 长文本分块：超过Token上限的内容按markdown结构切分，同一文档的分块组成一个分组
+        self.chunker = DocumentChunker(max_tokens=config.get("分块最大Token数", 512))
+
+        # 查询结果缓存，集合发生写入时失效
+        self.query_cache = QueryCache(
+            max_entries=config.get("查询缓存容量", 256),
+            ttl=config.get("查询缓存有效期", 300)
+        )
+
+        # 对话上下文的记忆注入：相关度阈值、跨轮去重、Token预算及每个对话的检索缓存
+        self.context_selector = ContextSelector(
+            token_budget=config.get("记忆注入Token预算", 1500),
+            max_distance=config.get("记忆相关度阈值", 0.6),
+            cache_size=config.get("对话检索缓存容量", 32)
+        )
+
+    def _sync_vector_sidecar(self, ids: List[str]) -> None:
+        """
+        启动时对齐全精度向量文件与集合：移除集合中已不存在的记录；
+        未压缩的集合从Chroma补齐缺失的向量（压缩存储的集合无法补齐，这些记录只走近似检索）
+        """
+        stale = self.vector_sidecar.ids() - set(ids)
+        if stale:
+            self.vector_sidecar.remove(list(stale))
+
+        missing = [record_id for record_id in ids if record_id not in self.vector_sidecar]
+        if not missing:
+            return
+        if self.compressor.enabled:
+            logging.warning(f"{len(missing)} 条记录缺少全精度向量，检索时只使用近似检索")
+            return
+        for i in range(0, len(missing), 1000):
+            batch = self.collection.get(ids=missing[i:i + 1000], include=["embeddings"])
+            self.vector_sidecar.put(batch['ids'], batch['embeddings'])
+
+    @staticmethod
+    def _hnsw_metadata(collection_name: str, hnsw_params: dict = None) -> dict:
+        """合并全局配置、集合级配置和构造参数，生成集合的HNSW元数据"""
+        params = {name: config[key] for name, key in HNSW_CONFIG_KEYS.items() if key in config}
+        params.update(config.get("集合HNSW参数", {}).get(collection_name, {}))
+        params.update(hnsw_params or {})
+
+        unknown = set(params) - set(HNSW_CONFIG_KEYS)
+        if unknown:
+            raise ValueError(f"不支持的HNSW参数: {', '.join(sorted(unknown))}")
+        if params.get("batch_size", 100) > params.get("sync_threshold", 1000):
+            raise ValueError("HNSW参数 batch_size 不能大于 sync_threshold")
+        return {f"hnsw:{name}": value for name, value in params.items()}
+
+    def _check_hnsw_params(self) -> None:
+        """已有集合的HNSW参数在创建时确定，与当前配置不一致时给出提示"""
+        metadata = self.collection.metadata or {}
+        changed = {
+            key: (metadata.get(key), value)
+            for key, value in self.hnsw_metadata.items()
+            if metadata.get(key) != value
+        }
+        if changed:
+            logging.warning(
+                f"集合 {self.collection.name} 的HNSW参数与配置不一致（当前值, 配置值）: {changed}，"
+                f"新参数将在集合重建（clear）后生效"
+            )
+
+    def _sync_near_duplicate_index(self, existing: dict) -> None:
+        """启动时对齐近似重复索引与集合：移除已不存在的记录，补算缺失记录的签名"""
+        stale = self.near_duplicate_index.ids() - set(existing['ids'])
+        if stale:
+            self.near_duplicate_index.remove(list(stale))
+        missing = [
+            (record_id, doc, (metadata or {}).get("filepath"))
+            for record_id, doc, metadata in zip(existing['ids'], existing['documents'], existing['metadatas'])
+            if record_id not in self.near_duplicate_index
+        ]
+        if missing:
+            self.near_duplicate_index.add(*(list(column) for column in zip(*missing)))
+
+    def _embedding_space(self) -> dict:
+        """集合的向量空间标识：Embedding提供方、模型、维度及压缩方式"""
+        return {**self.embedding_provider.space, **self.compressor.space}
+
+    def _check_embedding_space(self, rebuild_on_mismatch: bool = False) -> None:
+        """
+        校验集合的向量空间与当前Embedding配置一致，防止不同模型或压缩方式的向量混入同一集合
+
+        Args:
+            rebuild_on_mismatch: 不一致时删除并按当前配置重建集合，而不是抛出异常
+        """
+        metadata = self.collection.metadata or {}
+        expected = self._embedding_space()
+        stored = {key: value for key, value in metadata.items() if key.startswith("embedding:")}
+        if not stored:
+            # 旧版本创建的集合未记录向量空间
+            logging.warning(f"集合 {self.collection.name} 未记录向量空间信息，按当前Embedding配置使用")
+            return
+        if stored == expected:
+            return
+        if rebuild_on_mismatch:
+            logging.warning(
+                f"集合 {self.collection.name} 的向量空间 {stored} 与当前Embedding配置 {expected} 不一致，删除并重建集合"
+            )
+            name = self.collection.name
+            self.client.delete_collection(name=name)
+            self.collection = self.client.get_or_create_collection(
+                name=name, metadata={"hnsw:space": "cosine", **self.hnsw_metadata, **expected}
+            )
+            return
+        raise ValueError(
+            f"集合 {self.collection.name} 的向量空间 {stored} 与当前Embedding配置 {expected} 不一致，"
+            f"请更换集合名称，或在配置中设置 \"向量空间不一致时重建集合\": true 后重启（原有数据将被删除）"
         )
 
     async def add(self, content: MemoryContent, filepath: str = None, cancellation_token=None) -> None:
@@ -37,38 +254,377 @@ class VectorDBMemory(Memory):
             filepath: 可选的文件路径，如果提供则会自动添加文件路径和修改时间到元数据中
             cancellation_token: 取消令牌
         """
-        # 如果提供了filepath，添加文件路径和修改时间到元数据中
-        if filepath:
-            import os
-            from datetime import datetime
-            
-            # 确保文件存在
-            if not os.path.exists(filepath):
-                raise FileNotFoundError(f"文件不存在: {filepath}")
-            
-            # 获取文件最后修改时间
-            file_mtime = os.path.getmtime(filepath)
+        await self._add(content, filepath)
+
+    async def _add(self, content: MemoryContent, filepath: str = None, replaces: List[str] = None) -> List[str]:
+        """
+        添加内容，超过Token上限时分块写入
+        
+        Args:
+            replaces: 被新内容替换的旧记录ID，与新记录的写入一并在独占通道中执行
             
-            # 更新元数据
-            if content.metadata is None:
-                content.metadata = {}
-            content.metadata.update({
-                "filepath": filepath,
-                "timestamp": str(file_mtime)  # 转换为字符串存储
-            })
+        Returns:
+            List[str]: 内容对应的记录ID（跳过或合并时为空）
+        """
+        self._prepare_metadata(content, filepath)
+        replaces = replaces or []
+
+        chunks = self.chunker.split(str(content.content))
+        if len(chunks) > 1:
+            return await self._add_chunked(str(content.content), chunks, content.metadata, replaces)
         
-        # 将内容转换为向量并存储
-        vector = self._get_embedding(content.content)
         # 生成一个基于内容的唯一ID
         content_id = hashlib.md5(str(content.content).encode()).hexdigest()
+
+        # 内容已存在时只刷新元数据，不再计算向量
+        if await self._store.read(self._existing_ids, [content_id]):
+            await self._write_replacing(replaces, [content_id], self._update_metadata, [content_id], [content.metadata])
+            return [content_id]
+
+        # 与已有记录近似重复时按策略处理，跳过或合并时不再计算向量
+        signature = self.near_duplicate_index.signature(str(content.content))
+        duplicate = self.near_duplicate_index.query(signature, content.metadata.get("filepath"))
+        if duplicate:
+            duplicate_id, similarity = duplicate
+            logging.info(f"内容 {content_id} 与记录 {duplicate_id} 近似重复（相似度 {similarity:.2f}）")
+            if self.near_duplicate_policy == "skip":
+                if replaces:
+                    await self._store.exclusive(self._delete_ids, replaces)
+                return []
+            if self.near_duplicate_policy == "merge":
+                await self._write_replacing(
+                    replaces, [],
+                    self._merge_near_duplicates, [(duplicate_id, content.metadata.get("filepath") or content_id)]
+                )
+                return []
+            content.metadata["near_duplicate_of"] = duplicate_id
+
+        # 将内容转换为向量并存储
+        vector = await self._get_embedding(content.content)
+        
+        await self._write_replacing(
+            replaces, [content_id],
+            self._write_records,
+            [content_id],
+            [vector],
+            [str(content.content)],
+            [content.metadata]
+        )
+        return [content_id]
+
+    async def _write_replacing(self, replaces: List[str], new_ids: List[str], func: Callable, *args) -> None:
+        """
+        在写通道中执行写入；有被替换的旧记录时，写入与删除旧记录在独占通道中一并执行，
+        检索不会看到新旧记录并存的中间状态
+        """
+        stale_ids = [record_id for record_id in replaces if record_id not in new_ids]
+        if stale_ids:
+            await self._store.exclusive(self._replace_records, stale_ids, func, *args)
+        else:
+            await self._store.write(func, *args)
+
+    def _replace_records(self, stale_ids: List[str], func: Callable, *args) -> None:
+        """执行写入后删除被替换的旧记录（在独占通道中执行）"""
+        func(*args)
+        self._delete_ids(stale_ids)
+
+    async def _add_chunked(self, text: str, chunks: List[str], metadata: dict, replaces: List[str] = None) -> List[str]:
+        """
+        分块写入长文本
         
+        分组ID由文件路径（没有文件路径时为内容）生成，分块ID为 分组ID-分块序号，同一文件重复写入时ID保持不变；
+        内容未变化时只刷新元数据，变化时在独占通道中整组替换，检索不会看到新旧分块混杂的中间状态
+        """
+        content_hash = hashlib.md5(text.encode()).hexdigest()
+        group_id = hashlib.md5(str(metadata.get("filepath") or text).encode()).hexdigest()
+        ids = [f"{group_id}-{index}" for index in range(len(chunks))]
+
+        existing = await self._store.read(
+            lambda: self.collection.get(where={"group_id": group_id}, include=["metadatas"])
+        )
+        if len(existing['ids']) == len(chunks) and all(
+                (old or {}).get("content_hash") == content_hash for old in existing['metadatas']):
+            await self._write_replacing(
+                replaces or [], existing['ids'],
+                self._update_metadata, existing['ids'], [dict(metadata) for _ in existing['ids']]
+            )
+            return existing['ids']
+
+        vectors = await self._get_embeddings(chunks)
+        metadatas = [
+            {**metadata, "group_id": group_id, "chunk_index": index, "chunk_count": len(chunks),
+             "content_hash": content_hash}
+            for index in range(len(chunks))
+        ]
+        stale_ids = [record_id for record_id in replaces or [] if record_id not in ids]
+        await self._store.exclusive(
+            self._replace_records, stale_ids, self._replace_group, group_id, ids, vectors, chunks, metadatas
+        )
+        return ids
+
+    def _replace_group(self, group_id: str, ids: List[str], embeddings: List[List[float]], documents: List[str],
+                       metadatas: List[dict]) -> None:
+        """删除分组的旧分块并写入新分块（在独占通道中执行）"""
+        self._delete_ids(self.collection.get(where={"group_id": group_id}, include=[])['ids'])
+        self._write_records(ids, embeddings, documents, metadatas)
+
+    async def add_many(self, contents: List[MemoryContent], filepaths: List[str] = None) -> List[dict]:
+        """
+        批量添加内容到向量数据库，Embedding按批次请求，写入时按Chroma单次写入上限分片提交
+        
+        Args:
+            contents: MemoryContent对象列表
+            filepaths: 与contents一一对应的文件路径列表，可包含None
+            
+        Returns:
+            List[dict]: 每条内容的处理结果，包含 index、id、status、message
+        """
+        filepaths = filepaths or [None] * len(contents)
+        statuses = []
+        pending = []  # (index, content_id, content)
+        chunked = []  # (index, content, chunks)
+        seen_ids = set()
+
+        for index, (content, filepath) in enumerate(zip(contents, filepaths)):
+            content_id = hashlib.md5(str(content.content).encode()).hexdigest()
+            try:
+                self._prepare_metadata(content, filepath)
+            except FileNotFoundError as e:
+                statuses.append({"index": index, "id": content_id, "status": "error", "message": str(e)})
+                continue
+
+            if content_id in seen_ids:
+                statuses.append({"index": index, "id": content_id, "status": "skipped", "message": "批次内重复内容"})
+                continue
+
+            # 超过Token上限的内容分块写入
+            chunks = self.chunker.split(str(content.content))
+            if len(chunks) > 1:
+                seen_ids.add(content_id)
+                chunked.append((index, content, chunks))
+                statuses.append({"index": index, "id": content_id, "status": "success", "message": f"已分为{len(chunks)}块添加"})
+                continue
+
+            seen_ids.add(content_id)
+            pending.append((index, content_id, content))
+            statuses.append({"index": index, "id": content_id, "status": "success", "message": "已添加"})
+
+        # 已存在的内容只刷新元数据，不再计算向量
+        existing_ids = await self._store.read(self._existing_ids, [content_id for _, content_id, _ in pending])
+        if existing_ids:
+            existing = [(index, content_id, content) for index, content_id, content in pending if content_id in existing_ids]
+            pending = [item for item in pending if item[1] not in existing_ids]
+            try:
+                await self._store.write(
+                    self._update_metadata,
+                    [content_id for _, content_id, _ in existing],
+                    [content.metadata for _, _, content in existing]
+                )
+                for index, _, _ in existing:
+                    statuses[index]["message"] = "内容已存在，已更新元数据"
+            except Exception as e:
+                for index, _, _ in existing:
+                    statuses[index].update({"status": "error", "message": str(e)})
+
+        # 与已有记录或批次内先前内容近似重复时按策略处理
+        merges = []  # (index, 已有记录ID, 来源)
+        if pending:
+            batch_index = NearDuplicateIndex(threshold=self.near_duplicate_index.threshold)
+            kept = []
+            for index, content_id, content in pending:
+                filepath = content.metadata.get("filepath")
+                signature = self.near_duplicate_index.signature(str(content.content))
+                duplicate = (self.near_duplicate_index.query(signature, filepath)
+                             or batch_index.query(signature, filepath))
+                if duplicate and self.near_duplicate_policy != "keep":
+                    duplicate_id, similarity = duplicate
+                    if self.near_duplicate_policy == "skip":
+                        statuses[index].update({
+                            "status": "skipped",
+                            "message": f"与记录 {duplicate_id} 近似重复（相似度 {similarity:.2f}）"
+                        })
+                    else:
+                        merges.append((index, duplicate_id, filepath or content_id))
+                        statuses[index]["message"] = f"与记录 {duplicate_id} 近似重复，已合并"
+                    continue
+                if duplicate:
+                    content.metadata["near_duplicate_of"] = duplicate[0]
+                batch_index.add([content_id], [None], [filepath], [signature])
+                kept.append((index, content_id, content))
+            pending = kept
+
+        # Chroma单次写入的记录数有上限，超出时分片计算向量并写入
+        batch_size = self.client.get_max_batch_size()
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            try:
+                vectors = await self._get_embeddings([str(content.content) for _, _, content in batch])
+                await self._store.write(
+                    self._write_records,
+                    [content_id for _, content_id, _ in batch],
+                    vectors,
+                    [str(content.content) for _, _, content in batch],
+                    [content.metadata for _, _, content in batch]
+                )
+            except Exception as e:
+                # 分片写入失败时，整个分片标记为失败，其他分片不受影响
+                for index, _, _ in batch:
+                    statuses[index].update({"status": "error", "message": str(e)})
+
+        for index, content, chunks in chunked:
+            try:
+                ids = await self._add_chunked(str(content.content), chunks, content.metadata)
+                statuses[index]["id"] = ids[0].rsplit("-", 1)[0]
+            except Exception as e:
+                statuses[index].update({"status": "error", "message": str(e)})
+
+        # 合并在写入之后进行，目标可能是同一批次中刚写入的记录
+        if merges:
+            try:
+                await self._store.write(
+                    self._merge_near_duplicates, [(duplicate_id, source) for _, duplicate_id, source in merges]
+                )
+            except Exception as e:
+                for index, _, _ in merges:
+                    statuses[index].update({"status": "error", "message": str(e)})
+
+        return statuses
+
+    def _prepare_metadata(self, content: MemoryContent, filepath: str = None) -> None:
+        """
+        补充元数据：写入时间created_at（用于按时间倒序的游标分页），
+        未提供经纬度范围时从内容中解析（用于空间检索），
+        如果提供了filepath，再添加文件路径和修改时间
+        """
+        if content.metadata is None:
+            content.metadata = {}
+        content.metadata["created_at"] = time.time()
+
+        if not all(key in content.metadata for key in EXTENT_KEYS):
+            extent = parse_extent(str(content.content))
+            if extent:
+                content.metadata.update(extent)
+
+        if not filepath:
+            return
+
+        # 确保文件存在
+        if not os.path.exists(filepath):
+            raise FileNotFoundError(f"文件不存在: {filepath}")
+        
+        # 获取文件最后修改时间
+        file_mtime = os.path.getmtime(filepath)
+        
+        # 更新元数据
+        content.metadata.update({
+            "filepath": filepath,
+            "timestamp": str(file_mtime),  # 转换为字符串存储
+            "filesize": os.path.getsize(filepath)
+        })
+
+    def _existing_ids(self, ids: List[str]) -> set:
+        """返回已存在于集合中的ID"""
+        # Chroma不接受空的ID列表
+        if not ids:
+            return set()
+        return set(self.collection.get(ids=ids, include=[])['ids'])
+
+    def _write_records(self, ids: List[str], embeddings: List[List[float]], documents: List[str],
+                       metadatas: List[dict]) -> None:
+        """写入记录并同步更新各辅助索引（在写通道中执行），已存在的ID只更新元数据"""
+        existing_ids = self._existing_ids(ids)
+        if existing_ids:
+            self._update_metadata(
+                [record_id for record_id in ids if record_id in existing_ids],
+                [metadata for record_id, metadata in zip(ids, metadatas) if record_id in existing_ids]
+            )
+            rows = [row for row in zip(ids, embeddings, documents, metadatas) if row[0] not in existing_ids]
+            if not rows:
+                return
+            ids, embeddings, documents, metadatas = (list(column) for column in zip(*rows))
+
         self.collection.add(
-            ids=[content_id],
-            embeddings=[vector],
-            documents=[str(content.content)],
-            metadatas=[content.metadata or {}]
+            ids=ids,
+            embeddings=self.compressor.compress(embeddings),
+            documents=documents,
+            metadatas=metadatas
+        )
+        self.vector_sidecar.put(ids, embeddings)
+        self._index_records(ids, documents, metadatas)
+
+    def _merge_near_duplicates(self, merges: List[tuple]) -> None:
+        """
+        将近似重复内容的来源（文件路径或内容ID）记录到已有记录的元数据中（在写通道中执行）
+        
+        Args:
+            merges: (已有记录ID, 来源) 列表
+        """
+        existing = self.collection.get(ids=list({duplicate_id for duplicate_id, _ in merges}), include=["metadatas"])
+        sources = {
+            record_id: [source for source in (metadata or {}).get("near_duplicates", "").split(";") if source]
+            for record_id, metadata in zip(existing['ids'], existing['metadatas'])
+        }
+        for duplicate_id, source in merges:
+            if duplicate_id in sources and source not in sources[duplicate_id]:
+                sources[duplicate_id].append(source)
+        self._update_metadata(
+            list(sources),
+            [{"near_duplicates": ";".join(items), "near_duplicate_count": len(items)} for items in sources.values()]
         )
 
+    def _update_metadata(self, ids: List[str], metadatas: List[dict]) -> None:
+        """
+        合并更新已有记录的元数据，不重新计算向量（在写通道中执行）
+        
+        保留记录原有的写入时间created_at，使分页顺序与写入顺序保持一致
+        """
+        existing = self.collection.get(ids=ids, include=["metadatas"])
+        updates = dict(zip(ids, metadatas))
+        merged = []
+        for record_id, old_metadata in zip(existing['ids'], existing['metadatas']):
+            metadata = {**(old_metadata or {}), **(updates[record_id] or {})}
+            if old_metadata and "created_at" in old_metadata:
+                metadata["created_at"] = old_metadata["created_at"]
+            merged.append(metadata)
+        if not merged:
+            return
+
+        self.collection.update(ids=existing['ids'], metadatas=merged)
+        self.metadata_stats.remove(existing['metadatas'])
+        self.metadata_stats.add(merged)
+        self.spatial_index.add(existing['ids'], merged)
+        self.near_duplicate_index.update_filepaths(existing['ids'], [metadata.get("filepath") for metadata in merged])
+        self.query_cache.invalidate()
+        for record_id, metadata in zip(existing['ids'], merged):
+            self.file_tracker.track(record_id, metadata)
+
+    def _index_records(self, ids: List[str], documents: List[str], metadatas: List[dict]) -> None:
+        """记录写入后同步更新各辅助索引"""
+        for record_id, metadata in zip(ids, metadatas):
+            self.file_tracker.track(record_id, metadata)
+        self.metadata_stats.add(metadatas)
+        self.lexical_index.add(ids, documents)
+        self.spatial_index.add(ids, metadatas)
+        self.near_duplicate_index.add(ids, documents, [(metadata or {}).get("filepath") for metadata in metadatas])
+        self.query_cache.invalidate()
+
+    def _delete_ids(self, ids: List[str]) -> None:
+        """按ID删除记录并同步更新各辅助索引（在写通道中执行）"""
+        if not ids:
+            return
+        # 先读取待删除记录的元数据，用于更新统计
+        existing = self.collection.get(ids=ids, include=["metadatas"])
+        if not existing['ids']:
+            return
+        self.collection.delete(ids=existing['ids'])
+        self.file_tracker.untrack(existing['ids'])
+        self.metadata_stats.remove(existing['metadatas'])
+        self.lexical_index.remove(existing['ids'])
+        self.spatial_index.remove(existing['ids'])
+        self.vector_sidecar.remove(existing['ids'])
+        self.near_duplicate_index.remove(existing['ids'])
+        self.query_cache.invalidate()
+
     async def query(self, query: str | MemoryContent, metadata_filter: dict = None, cancellation_token=None, **kwargs) -> MemoryQueryResult:
         """
         查询相关内容，支持语义搜索和元数据过滤
@@ -81,80 +637,363 @@ class VectorDBMemory(Memory):
                 - 多条件: {"speaker": "user1", "type": "test"}
             cancellation_token: 取消令牌
             **kwargs: 其他参数
+                - n_results: 返回条数，默认5条
+                - mode: 检索模式 vector/lexical/hybrid，默认读取配置"检索模式"
             
         Returns:
             MemoryQueryResult: 查询结果
         """
-        # 将查询转换为向量
-        query_vector = self._get_embedding(str(query))
+        n_results = kwargs.get("n_results", 5)  # 默认返回5条结果
+        mode = kwargs.get("mode") or config.get("检索模式", "vector")
+        hits = await self._search(str(query), n_results, metadata_filter, mode, kwargs.get("bbox"))
+        return self._to_query_result(hits)
+
+    async def _search(self, text: str, n_results: int, metadata_filter: dict = None, mode: str = "vector",
+                      bbox: List[float] = None) -> List[tuple]:
+        """
+        检索入口
+        
+        Args:
+            text: 查询文本
+            n_results: 返回条数
+            metadata_filter: 元数据过滤条件
+            mode: 检索模式
+                - vector: 向量语义检索
+                - lexical: BM25词项检索，无需计算查询向量
+                - hybrid: 向量与BM25结果按倒数排名融合
+            bbox: 空间范围 [min_lon, min_lat, max_lon, max_lat]，只检索范围与之相交的数据
+                
+        Returns:
+            List[tuple]: (ID, 内容, 元数据, 向量距离) 列表，词项检索结果的向量距离为None；
+                分块记录合并为所属文档，ID为分组ID，内容为完整文档
+        """
+        if mode not in ("vector", "lexical", "hybrid"):
+            raise ValueError(f"不支持的检索模式: {mode}")
 
-        # 构建查询参数
+        # 命中查询缓存时直接返回，无需计算向量和检索
+        cache_key = self.query_cache.make_key(text, n_results, metadata_filter, mode, bbox)
+        generation = self.query_cache.generation
+        cached = self.query_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        # 先用R树筛选空间范围相交的记录，向量检索只在这些记录中进行
+        candidate_ids = None
+        if bbox:
+            candidate_ids = self.spatial_index.intersects(bbox)
+            if not candidate_ids:
+                self.query_cache.put(cache_key, [], generation)
+                return []
+
+        # 存在分块记录时多取候选，同一文档的多个分块合并后仍能凑满n_results条
+        limit = n_results
+        if "group_id" in self.metadata_stats.fields:
+            limit = n_results * config.get("分块检索候选倍数", 3)
+
+        if mode == "lexical":
+            hits = await self._store.read(self._lexical_search, text, limit, metadata_filter, candidate_ids)
+        else:
+            # 混合检索时两路各取更多候选再融合
+            candidates = limit * config.get("混合检索候选倍数", 3) if mode == "hybrid" else limit
+            query_vector = await self._get_embedding(text)
+            hits = await self._store.read(self._vector_search, query_vector, candidates, metadata_filter, candidate_ids)
+            if mode == "hybrid":
+                lexical_hits = await self._store.read(
+                    self._lexical_search, text, candidates, metadata_filter, candidate_ids
+                )
+                hits = self._fuse_hits(hits, lexical_hits, limit)
+
+        hits = await self._store.read(self._collapse_groups, hits, n_results)
+        self.query_cache.put(cache_key, hits, generation)
+        return hits
+
+    def _vector_search(self, query_vector: List[float], n_results: int, metadata_filter: dict = None,
+                       candidate_ids: set = None) -> List[tuple]:
+        # 候选记录较少时直接精确检索，否则走HNSW近似检索
+        use_exact, exact_ids = self._plan_vector_search(metadata_filter, candidate_ids)
+        self.search_plan_counts["exact" if use_exact else "ann"] += 1
+        if use_exact:
+            return self._exact_search(query_vector, n_results, exact_ids)
+
+        # 构建查询参数（启用压缩时用紧凑向量多召回一些候选，再用全精度向量重排）
         query_params = {
-            "query_embeddings": [query_vector],
-            "n_results": kwargs.get("n_results", 5)  # 默认返回5条结果
+            "query_embeddings": self.compressor.compress([query_vector]),
+            "n_results": self.compressor.candidates(n_results),
+            "include": ["documents", "metadatas", "distances"]
         }
         
         # 如果提供了元数据过滤条件，添加到查询参数中
         if metadata_filter:
-            query_params["where"] = metadata_filter
+            query_params["where"] = self._build_where(metadata_filter)
+        # 限定在空间筛选出的记录中检索
+        if candidate_ids is not None:
+            query_params["ids"] = list(candidate_ids)
 
         # 执行向量搜索
         results = self.collection.query(**query_params)
+        hits = list(zip(results['ids'][0], results['documents'][0], results['metadatas'][0], results['distances'][0]))
+        if self.compressor.enabled:
+            hits = self._rescore(query_vector, hits, n_results)
+        return hits
 
-        # 构建返回结果
+    def _plan_vector_search(self, metadata_filter: dict = None, candidate_ids: set = None) -> tuple:
+        """
+        检索规划：候选记录数不超过“精确检索阈值”且都有全精度向量时使用精确检索
+        
+        Returns:
+            tuple: (是否精确检索, 候选ID集合)，候选ID为None表示全部记录
+        """
+        threshold = self.exact_search_threshold
+        if candidate_ids is not None and len(candidate_ids) > threshold:
+            return False, None
+
+        if metadata_filter:
+            # 只取阈值+1个ID，过滤后仍超过阈值时无需取全
+            params = {"where": self._build_where(metadata_filter), "include": []}
+            if candidate_ids is not None:
+                params["ids"] = list(candidate_ids)
+            else:
+                params["limit"] = threshold + 1
+            matched = self.collection.get(**params)['ids']
+            if len(matched) > threshold:
+                return False, None
+            candidate_ids = set(matched)
+        elif candidate_ids is None:
+            # 无过滤条件时按集合规模判断，且要求每条记录都有全精度向量
+            total = self.metadata_stats.total
+            return total <= threshold and len(self.vector_sidecar) == total, None
+
+        if all(record_id in self.vector_sidecar for record_id in candidate_ids):
+            return True, candidate_ids
+        return False, None
+
+    def _exact_search(self, query_vector: List[float], n_results: int, candidate_ids: set = None) -> List[tuple]:
+        """在全精度向量矩阵上精确检索，再从Chroma读取命中记录的内容和元数据"""
+        ranked = self.vector_sidecar.search(query_vector, n_results, candidate_ids)
+        if not ranked:
+            return []
+        results = self.collection.get(ids=[doc_id for doc_id, _ in ranked], include=["documents", "metadatas"])
+        records = {
+            doc_id: (doc, metadata)
+            for doc_id, doc, metadata in zip(results['ids'], results['documents'], results['metadatas'])
+        }
+        return [(doc_id, *records[doc_id], distance) for doc_id, distance in ranked if doc_id in records]
+
+    def _rescore(self, query_vector: List[float], hits: List[tuple], n_results: int) -> List[tuple]:
+        """用旁路文件中的全精度向量重新计算候选的余弦距离，旁路文件中没有的记录保留原距离"""
+        found, matrix = self.vector_sidecar.get([hit[0] for hit in hits])
+        distances = {}
+        if found:
+            scores = matrix @ normalize(np.asarray(query_vector, dtype=np.float32))
+            distances = dict(zip(found, (1.0 - scores).tolist()))
+        rescored = [(doc_id, doc, metadata, distances.get(doc_id, distance)) for doc_id, doc, metadata, distance in hits]
+        rescored.sort(key=lambda hit: hit[3])
+        return rescored[:n_results]
+
+    def _lexical_search(self, text: str, n_results: int, metadata_filter: dict = None,
+                        candidate_ids: set = None) -> List[tuple]:
+        # 有过滤条件时取全部命中的文档，按排名分批交给Chroma按元数据过滤，凑满n_results条或取完为止
+        filtered = bool(metadata_filter) or candidate_ids is not None
+        ranked = self.lexical_index.search(text, limit=None if filtered else n_results)
+        if candidate_ids is not None:
+            ranked = [(doc_id, score) for doc_id, score in ranked if doc_id in candidate_ids]
+        if not ranked:
+            return []
+
+        hits = []
+        batch_size = max(n_results * 10, 100) if metadata_filter else len(ranked)
+        for start in range(0, len(ranked), batch_size):
+            batch = [doc_id for doc_id, _ in ranked[start:start + batch_size]]
+            results = self.collection.get(
+                ids=batch,
+                where=self._build_where(metadata_filter),
+                include=["documents", "metadatas"]
+            )
+            records = {
+                doc_id: (doc, metadata)
+                for doc_id, doc, metadata in zip(results['ids'], results['documents'], results['metadatas'])
+            }
+            hits.extend((doc_id, *records[doc_id], None) for doc_id in batch if doc_id in records)
+            if len(hits) >= n_results:
+                break
+        return hits[:n_results]
+
+    def _collapse_groups(self, hits: List[tuple], n_results: int) -> List[tuple]:
+        """
+        将同一文档的分块命中合并为一条结果：位置取排名最靠前的分块，内容还原为完整文档，
+        元数据中的 matched_chunks 为命中的分块序号
+        """
+        collapsed, groups = [], {}
+        for hit in hits:
+            metadata = hit[2] or {}
+            group_id = metadata.get("group_id")
+            if group_id is None:
+                collapsed.append(hit)
+            elif group_id in groups:
+                groups[group_id]["matched"].append(metadata.get("chunk_index"))
+            else:
+                groups[group_id] = {"position": len(collapsed), "matched": [metadata.get("chunk_index")]}
+                collapsed.append(hit)
+        collapsed = collapsed[:n_results]
+
+        group_ids = [group_id for group_id, group in groups.items() if group["position"] < len(collapsed)]
+        if not group_ids:
+            return collapsed
+
+        results = self.collection.get(where={"group_id": {"$in": group_ids}}, include=["documents", "metadatas"])
+        parts = defaultdict(list)
+        for doc, metadata in zip(results['documents'], results['metadatas']):
+            parts[metadata["group_id"]].append((metadata["chunk_index"], doc))
+
+        for group_id in group_ids:
+            position = groups[group_id]["position"]
+            _, _, metadata, distance = collapsed[position]
+            metadata = {key: value for key, value in metadata.items() if key != "chunk_index"}
+            metadata["matched_chunks"] = sorted(groups[group_id]["matched"])
+            document = "".join(doc for _, doc in sorted(parts[group_id]))
+            collapsed[position] = (group_id, document, metadata, distance)
+        return collapsed
+
+    @staticmethod
+    def _fuse_hits(vector_hits: List[tuple], lexical_hits: List[tuple], n_results: int) -> List[tuple]:
+        """按倒数排名融合向量检索和BM25检索的结果"""
+        hits = {hit[0]: hit for hit in lexical_hits}
+        hits.update({hit[0]: hit for hit in vector_hits})
+        fused = reciprocal_rank_fusion([
+            [hit[0] for hit in vector_hits],
+            [hit[0] for hit in lexical_hits]
+        ])
+        return [hits[doc_id] for doc_id, _ in fused[:n_results]]
+
+    @staticmethod
+    def _to_query_result(hits: List[tuple]) -> MemoryQueryResult:
+        """将检索结果构建为查询结果，每次构建新对象，避免调用方修改缓存内容"""
         memory_contents = []
-        for doc, metadata in zip(results['documents'][0], results['metadatas'][0]):
+        for _, doc, metadata, _ in hits:
             memory_contents.append(
                 MemoryContent(
                     content=doc,
                     mime_type="text/plain",
-                    metadata=metadata
+                    metadata=dict(metadata) if metadata else metadata
                 )
             )
 
         return MemoryQueryResult(results=memory_contents)
 
-    async def clear(self) -> None:
+    async def clear(self, fast: bool = True) -> None:
+        """
+        清空集合
+        
+        Args:
+            fast: 为True时直接删除并重建集合，耗时与数据量无关；为False时逐条删除
+        """
+        if fast:
+            # 独占执行，避免读操作使用已删除的旧集合
+            await self._store.exclusive(self._recreate_collection)
+        else:
+            await self._store.write(self._clear)
+
+    def _clear(self) -> None:
         # 获取所有数据
-        results = self.collection.get()
+        results = self.collection.get(include=[])
         if results['ids']:
             # 如果有数据，则删除所有ID
             self.collection.delete(ids=results['ids'])
+        self._reset_indexes()
+
+    def _recreate_collection(self) -> None:
+        """删除并以相同配置重建集合，HNSW参数和向量空间标识使用当前配置"""
+        name = self.collection.name
+        # 重建后的集合为空，旧的向量空间标识不再适用，写入当前Embedding配置的标识
+        metadata = {
+            key: value for key, value in (self.collection.metadata or {"hnsw:space": "cosine"}).items()
+            if not key.startswith("embedding:")
+        }
+        metadata.update({**self.hnsw_metadata, **self._embedding_space()})
+        self.client.delete_collection(name=name)
+        self.collection = self.client.get_or_create_collection(name=name, metadata=metadata)
+        self._reset_indexes()
+
+    def _reset_indexes(self) -> None:
+        """集合清空后重置各辅助索引"""
+        self.file_tracker.clear()
+        self.metadata_stats.clear()
+        self.lexical_index.clear()
+        self.spatial_index.clear()
+        self.vector_sidecar.clear()
+        self.near_duplicate_index.clear()
+        self.query_cache.invalidate()
 
     async def close(self) -> None:
         # 在新版本中不需要显式调用 persist
-        pass
+        self.file_tracker.stop()
+        self._store.shutdown()
+        self.embedding_cache.close()
+        self.vector_sidecar.close()
+        self.near_duplicate_index.close()
+        await self.embedding_provider.close()
 
     async def update_context(self, model_context: ChatCompletionContext) -> UpdateContextResult:
+        """
+        将与最近一条消息相关、且尚未出现在该对话中的记忆，在Token预算内合并为一条系统消息注入上下文
+        """
         # 获取当前对话的上下文
         messages = await model_context.get_messages()
-        last_message = messages[-1].content if messages else ""
+        query_text = self.context_selector.query_text(messages)
+        if not query_text:
+            return UpdateContextResult(memories=MemoryQueryResult(results=[]))
+
+        # 同一对话中重复的检索直接使用对话级缓存，记忆库写入后失效
+        state = self.context_selector.state(model_context)
+        generation = self.query_cache.generation
+        hits = state.cached(query_text, generation)
+        if hits is None:
+            hits = await self._search(
+                query_text,
+                config.get("记忆检索候选数", 10),
+                mode=config.get("检索模式", "vector")
+            )
+            state.remember(query_text, hits, generation)
 
-        # 查询相关记忆
-        query_result = await self.query(last_message)
+        # 按相关度阈值、跨轮去重和Token预算选择需要注入的记忆
+        selected = self.context_selector.select(hits, state, messages)
+        if selected:
+            await model_context.add_message(SystemMessage(content=self.context_selector.render(selected)))
 
-        # 将相关记忆添加到上下文中
-        for memory in query_result.results:
-            model_context.add_system_message(str(memory.content))
+        return UpdateContextResult(memories=self._to_query_result(selected))
 
-        return UpdateContextResult(memories=query_result)
+    async def _get_embedding(self, text: str) -> List[float]:
+        return (await self._get_embeddings([text]))[0]
 
-    def _get_embedding(self, text: str) -> List[float]:
-        client = OpenAI(
-            api_key=config["Embedding模型密钥"],
-            base_url=config["Embedding模型地址"]
+    async def _get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """批量获取向量：优先读取缓存，未命中的文本按批次并发请求Embedding接口"""
+        # 缓存读写涉及SQLite查询和提交，整批在线程池中执行，不阻塞事件循环
+        loop = asyncio.get_running_loop()
+        vectors = await loop.run_in_executor(
+            None, self.embedding_cache.get_many, self.embedding_model, self.embedding_dimensions, texts
         )
-        response = client.embeddings.create(
-            model=config["Embedding模型名称"],
-            input=text,
-            dimensions=1024,
-            encoding_format="float"
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if not missing:
+            return vectors
+
+        batch_size = max(1, self.embedding_provider.batch_size)
+        batches = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
+        results = await asyncio.gather(*[
+            self.embedding_provider.embed([texts[i] for i in batch]) for batch in batches
+        ])
+
+        for batch, batch_vectors in zip(batches, results):
+            for i, vector in zip(batch, batch_vectors):
+                vectors[i] = vector
+        await loop.run_in_executor(
+            None, self.embedding_cache.put_many, self.embedding_model, self.embedding_dimensions,
+            [texts[i] for i in missing], [vectors[i] for i in missing]
         )
-        return response.data[0].embedding
+        return vectors
 
     async def get_all(self) -> List[MemoryContent]:
         """获取集合中的所有数据"""
-        results = self.collection.get()
+        results = await self._store.read(lambda: self.collection.get())
         
         memory_contents = []
         for doc, metadata in zip(results['documents'], results['metadatas']):
@@ -168,18 +1007,32 @@ class VectorDBMemory(Memory):
         return memory_contents
 
     async def delete_by_id(self, content_id: str) -> None:
-        """根据ID删除特定内容"""
-        self.collection.delete(ids=[content_id])
+        """根据ID删除特定内容，ID为分组ID时删除整组分块"""
+        await self._store.exclusive(self._delete_document, content_id)
         
     async def delete_by_metadata(self, metadata_filter: dict) -> None:
         """根据元数据条件删除内容"""
-        self.collection.delete(where=metadata_filter)
+        await self._store.write(self._delete_where, metadata_filter)
+
+    def _delete_where(self, metadata_filter: dict) -> None:
+        # 先取出匹配的ID，以便同步更新辅助索引
+        ids = self.collection.get(where=metadata_filter, include=[])['ids']
+        self._delete_ids(ids)
         
     async def delete_by_content(self, content: str) -> None:
-        """根据内容删除匹配的文档"""
+        """根据内容删除匹配的文档（分块写入的文档删除整个分组）"""
         # 生成内容的ID
         content_id = hashlib.md5(str(content).encode()).hexdigest()
-        self.collection.delete(ids=[content_id])
+        await self._store.exclusive(self._delete_document, content_id)
+
+    def _delete_document(self, document_id: str) -> None:
+        """删除单条记录，或分组ID/内容哈希与之相同的整组分块（在独占通道中执行）"""
+        self._delete_ids([document_id])
+        self._delete_where({"$or": [{"group_id": document_id}, {"content_hash": document_id}]})
+
+    async def delete_by_filepath(self, filepath: str) -> None:
+        """删除文件对应的全部记录（包括整组分块），独占执行"""
+        await self._store.exclusive(self._delete_where, {"filepath": filepath})
 
     async def get_metadata_stats(self) -> dict:
         """
@@ -188,43 +1041,52 @@ class VectorDBMemory(Memory):
         Returns:
             dict: 包含以下信息：
                 - total_count: 总记录数
-                - metadata_fields: 所有元数据字段及其唯一值列表
+                - metadata_fields: 所有元数据字段及其唯一值列表（近似统计模式下为高频取值）
                 - collection_info: 集合信息
+                - embedding_cache: Embedding缓存命中统计
         """
-        # 获取所有数据
-        results = self.collection.get()
-        
-        # 统计信息
+        # 统计信息由元数据统计存储增量维护，无需扫描集合
+        total = self.metadata_stats.total
         stats = {
-            "total_count": len(results['documents']),
-            "metadata_fields": {},
+            "total_count": total,
+            "metadata_fields": self.metadata_stats.field_values(),
             "collection_info": {
                 "name": self.collection.name,
-                "count": len(results['documents'])
-            }
+                "count": total
+            },
+            "embedding_cache": self.embedding_cache.stats()
         }
+        return stats
+
+    async def get_memory_stats(self) -> dict:
+        """
+        获取详细的元数据统计信息
         
-        # 统计每个元数据字段的唯一值
-        for metadata in results['metadatas']:
-            for key, value in metadata.items():
-                if key not in stats["metadata_fields"]:
-                    stats["metadata_fields"][key] = set()
-                stats["metadata_fields"][key].add(str(value))
-        
-        # 将集合转换为列表
-        for key in stats["metadata_fields"]:
-            stats["metadata_fields"][key] = sorted(list(stats["metadata_fields"][key]))
-            
+        Returns:
+            dict: 包含以下信息：
+                - total_count: 总记录数
+                - fields: 每个字段的统计模式（exact/approximate）、记录数、不同取值数及高频取值
+                - embedding_cache: Embedding缓存命中统计
+                - query_cache: 查询缓存命中统计
+                - vector_search: 精确检索/近似检索的次数
+        """
+        stats = self.metadata_stats.to_dict()
+        stats["embedding_cache"] = self.embedding_cache.stats()
+        stats["query_cache"] = self.query_cache.stats()
+        stats["vector_search"] = dict(self.search_plan_counts)
         return stats
 
-    async def get_paginated_data(self, page: int = 1, page_size: int = 100, metadata_filter: dict = None) -> dict:
+    async def get_paginated_data(self, page: int = 1, page_size: int = 100, metadata_filter: dict = None,
+                                 cursor: str = None) -> dict:
         """
-        分页获取数据
+        分页获取数据（新数据在前），分页和过滤均下推到Chroma执行
         
         Args:
             page: 页码，从1开始
             page_size: 每页记录数
             metadata_filter: 元数据过滤条件
+            cursor: 游标（上一页返回的next_cursor，格式为 "写入时间created_at|记录ID|上一页时间跨度"）。
+                提供时使用游标分页，忽略page参数；未记录created_at的旧数据不参与游标分页
             
         Returns:
             dict: 包含以下信息：
@@ -233,36 +1095,45 @@ class VectorDBMemory(Memory):
                 - current_page: 当前页码
                 - page_size: 每页记录数
                 - data: 当前页的数据列表
+                - next_cursor: 下一页游标，没有更多数据时为None
+
+        Raises:
+            ValueError: 游标格式不正确
         """
-        # 获取所有数据
-        results = self.collection.get()
-        
-        # 应用元数据过滤
-        filtered_data = []
-        if metadata_filter:
-            for doc, metadata in zip(results['documents'], results['metadatas']):
-                # 检查是否满足所有过滤条件
-                if all(metadata.get(k) == v for k, v in metadata_filter.items()):
-                    filtered_data.append((doc, metadata))
+        if cursor is not None:
+            position = self._parse_cursor(cursor)
+            return await self._store.read(self._get_page_by_cursor, cursor, position, page_size, metadata_filter)
+        return await self._store.read(self._get_page_by_offset, page, page_size, metadata_filter)
+
+    def _get_page_by_offset(self, page: int, page_size: int, metadata_filter: dict = None) -> dict:
+        """偏移分页：倒序第page页"""
+        where = self._build_where(metadata_filter)
+
+        # 计算分页信息（有过滤条件时只取ID计数，不加载文档和元数据）
+        if where:
+            total = len(self.collection.get(where=where, include=[])['ids'])
         else:
-            filtered_data = list(zip(results['documents'], results['metadatas']))
-        
-        # 反转列表，使新数据在前
-        filtered_data.reverse()
-        
-        # 计算分页信息
-        total = len(filtered_data)
+            total = self.collection.count()
         total_pages = (total + page_size - 1) // page_size
         
         # 确保页码有效
         page = max(1, min(page, total_pages))
         
-        # 计算当前页的数据范围
-        start_idx = (page - 1) * page_size
-        end_idx = min(start_idx + page_size, total)
-        
-        # 获取当前页的数据
-        current_page_data = filtered_data[start_idx:end_idx]
+        # Chroma按写入顺序返回数据，倒序第page页对应正序的 [offset, offset + limit)
+        end_idx = max(0, total - (page - 1) * page_size)
+        offset = max(0, end_idx - page_size)
+        limit = end_idx - offset
+
+        current_page_data = []
+        if limit > 0:
+            results = self.collection.get(
+                where=where,
+                limit=limit,
+                offset=offset,
+                include=["documents", "metadatas"]
+            )
+            current_page_data = list(zip(results['ids'], results['documents'], results['metadatas']))
+            current_page_data.reverse()
         
         # 构建返回结果
         return {
@@ -275,10 +1146,121 @@ class VectorDBMemory(Memory):
                     "content": doc,
                     "metadata": metadata
                 }
-                for doc, metadata in current_page_data
-            ]
+                for _, doc, metadata in current_page_data
+            ],
+            "next_cursor": self._next_cursor(current_page_data, page_size)
         }
 
+    def _get_page_by_cursor(self, cursor: str, position: tuple, page_size: int, metadata_filter: dict = None) -> dict:
+        """
+        游标分页：按 (created_at, ID) 倒序，返回排在游标之后的 page_size 条数据
+        
+        同一批写入的记录可能具有相同的写入时间，以记录ID作为第二排序键，保证翻页时不遗漏；
+        从游标处向前逐段查询互不重叠的时间窗口，窗口内数据足够一页时即停止：首段窗口取上一页数据的时间跨度，
+        之后按已查询区间的数据密度估计剩余数据所需的窗口，每条记录只读取一次
+
+        Args:
+            position: 解析后的游标 (写入时间, 记录ID, 上一页时间跨度)
+        """
+        created_at, record_id, window = position
+        if window is None:
+            window = float(config.get("分页游标初始窗口", 3600))
+        keys = []
+        upper = created_at
+        while True:
+            lower = upper - window
+            # 首段包含与游标同一时刻的数据，之后各段以上一段的下界为开区间上界，互不重叠
+            conditions = [{"created_at": {"$lte" if upper == created_at else "$lt": upper}}]
+            if lower > 0:
+                conditions.append({"created_at": {"$gte": lower}})
+            if metadata_filter:
+                conditions.append(self._build_where(metadata_filter))
+
+            # Chroma的 $and 至少需要两个条件
+            where = conditions[0] if len(conditions) == 1 else {"$and": conditions}
+            results = self.collection.get(where=where, include=["metadatas"])
+            keys.extend(
+                key for key in (
+                    (metadata.get("created_at", 0), item_id)
+                    for item_id, metadata in zip(results['ids'], results['metadatas'])
+                )
+                if key < (created_at, record_id)
+            )
+            if len(keys) >= page_size or lower <= 0:
+                break
+            upper = lower
+            if keys:
+                window = (created_at - lower) * (page_size - len(keys)) / len(keys) * 1.25
+            else:
+                window *= 4
+            window = max(window, self.MIN_CURSOR_WINDOW)
+        keys.sort(reverse=True)
+
+        current_page_data = []
+        page_ids = [item_id for _, item_id in keys[:page_size]]
+        if page_ids:
+            results = self.collection.get(ids=page_ids, include=["documents", "metadatas"])
+            current_page_data = sorted(
+                zip(results['ids'], results['documents'], results['metadatas']),
+                key=lambda item: (item[2].get("created_at", 0), item[0]),
+                reverse=True
+            )
+
+        return {
+            "page_size": page_size,
+            "cursor": cursor,
+            "data": [
+                {
+                    "content": doc,
+                    "metadata": metadata
+                }
+                for _, doc, metadata in current_page_data
+            ],
+            "next_cursor": self._next_cursor(current_page_data, page_size)
+        }
+
+    @staticmethod
+    def _parse_cursor(cursor) -> tuple:
+        """
+        解析游标为 (写入时间, 记录ID, 上一页时间跨度)；只有写入时间的游标表示该时刻之前的全部数据，
+        没有时间跨度时使用配置的初始窗口
+
+        Raises:
+            ValueError: 游标格式不正确
+        """
+        parts = str(cursor).split("|")
+        try:
+            if len(parts) > 3:
+                raise ValueError
+            created_at = float(parts[0])
+            window = float(parts[2]) if len(parts) == 3 else None
+            if not math.isfinite(created_at) or window is not None and not (math.isfinite(window) and window > 0):
+                raise ValueError
+        except ValueError:
+            raise ValueError(f"无效的分页游标: {cursor}") from None
+        return created_at, parts[1] if len(parts) > 1 else "", window
+
+    @classmethod
+    def _next_cursor(cls, page_data: list, page_size: int):
+        """当前页已满时，以最旧一条数据的 (写入时间, ID) 及本页数据的时间跨度作为下一页游标"""
+        if len(page_data) < page_size:
+            return None
+        record_id, _, metadata = page_data[-1]
+        if "created_at" not in metadata:
+            return None
+        times = [item[2]["created_at"] for item in page_data if "created_at" in item[2]]
+        window = max(max(times) - min(times), cls.MIN_CURSOR_WINDOW)
+        return f"{metadata['created_at']!r}|{record_id}|{window!r}"
+
+    @staticmethod
+    def _build_where(metadata_filter: dict = None):
+        """将多字段的等值过滤条件转换为Chroma的 $and 表达式"""
+        if not metadata_filter:
+            return None
+        if len(metadata_filter) == 1 or any(key.startswith("$") for key in metadata_filter):
+            return metadata_filter
+        return {"$and": [{key: value} for key, value in metadata_filter.items()]}
+
     async def list_modified_data(self) -> dict:
         """
         列出所有被修改的数据
@@ -293,39 +1275,100 @@ class VectorDBMemory(Memory):
                     - file_path: 文件路径
                     - last_modified: 最后修改时间
         """
-        import os
-        from datetime import datetime
-        
-        # 获取所有数据
-        results = self.collection.get()
-        
-        # 存储修改过的数据
+        # 已修改文件由后台监控预先标记，这里只读取受影响的记录
+        modified_files = self.file_tracker.modified_records()
+        record_ids = [record_id for item in modified_files for record_id in item["record_ids"]]
+        if not record_ids:
+            return {"total": 0, "modified_data": []}
+
+        results = await self._store.read(
+            lambda: self.collection.get(ids=record_ids, include=["documents", "metadatas"])
+        )
+        records = {
+            record_id: (doc, metadata)
+            for record_id, doc, metadata in zip(results['ids'], results['documents'], results['metadatas'])
+        }
+
+        # 存储修改过的数据（modified_files已按修改时间倒序排列）
         modified_data = []
-        
-        # 遍历所有数据
-        for doc, metadata in zip(results['documents'], results['metadatas']):
-            # 检查是否包含必要的元数据
-            if 'timestamp' in metadata and 'filepath' in metadata:
-                file_path = metadata['filepath']
-                
-                # 检查文件是否存在
-                if os.path.exists(file_path):
-                    # 获取文件最后修改时间
-                    file_mtime = os.path.getmtime(file_path)
-                    
-                    # 如果文件修改时间与元数据中的时间戳不同，说明文件被修改过
-                    if abs(file_mtime - float(metadata['timestamp'])) > 1:  # 允许1秒的误差
-                        modified_data.append({
-                            "content": doc,
-                            "metadata": metadata,
-                            "file_path": file_path,
-                            "last_modified": datetime.fromtimestamp(file_mtime).strftime('%Y-%m-%d %H:%M:%S')
-                        })
-        
-        # 按最后修改时间倒序排序
-        modified_data.sort(key=lambda x: x['last_modified'], reverse=True)
+        for item in modified_files:
+            for record_id in item["record_ids"]:
+                if record_id not in records:
+                    continue
+                doc, metadata = records[record_id]
+                modified_data.append({
+                    "content": doc,
+                    "metadata": metadata,
+                    "file_path": item["filepath"],
+                    "last_modified": datetime.fromtimestamp(item["last_modified"]).strftime('%Y-%m-%d %H:%M:%S')
+                })
         
         return {
             "total": len(modified_data),
             "modified_data": modified_data
         }
+
+    async def get_records_by_filepath(self, filepath: str) -> List[tuple]:
+        """获取指定文件路径的所有记录，返回 (ID, 内容, 元数据) 列表"""
+        results = await self._store.read(
+            lambda: self.collection.get(where={"filepath": filepath}, include=["documents", "metadatas"])
+        )
+        return list(zip(results['ids'], results['documents'], results['metadatas']))
+
+    async def refresh_file_metadata(self, ids: List[str], filepath: str, extra_metadata: dict = None) -> None:
+        """
+        内容未变化时只刷新记录的文件修改时间等元数据，不重新计算向量
+        
+        Args:
+            ids: 需要刷新的记录ID
+            filepath: 文件路径
+            extra_metadata: 额外写入的元数据
+        """
+        await self._store.write(self._refresh_file_metadata, ids, filepath, extra_metadata)
+
+    def _refresh_file_metadata(self, ids: List[str], filepath: str, extra_metadata: dict = None) -> None:
+        metadata = {
+            "filepath": filepath,
+            "timestamp": str(os.path.getmtime(filepath)),
+            "filesize": os.path.getsize(filepath),
+            **(extra_metadata or {})
+        }
+        self._update_metadata(ids, [dict(metadata) for _ in ids])
+
+    async def replace_file_records(self, old_ids: List[str], content: str, filepath: str,
+                                   extra_metadata: dict = None) -> List[str]:
+        """
+        用新内容替换文件的旧记录：写入新记录和删除旧记录在独占通道中一并执行，替换过程中始终有可用数据
+        
+        Returns:
+            List[str]: 新记录ID（分块写入时为各分块ID）
+        """
+        memory_content = MemoryContent(content=content, mime_type="text/plain", metadata=dict(extra_metadata or {}))
+        return await self._add(memory_content, filepath, replaces=old_ids)
+
+    def start_file_watcher(self, notify: bool = None) -> None:
+        """
+        启动后台文件监控，需在事件循环中调用
+        
+        Args:
+            notify: 是否在文件变化时通过WebSocket推送通知，默认读取配置"文件变更推送"
+        """
+        if notify is None:
+            notify = config.get("文件变更推送", True)
+        if notify:
+            loop = asyncio.get_running_loop()
+
+            def push_notification(filepath: str, record_ids: List[str], file_mtime: float):
+                message = json.dumps({
+                    "type": "memory",
+                    "operation": "file-modified",
+                    "data": {
+                        "file_path": filepath,
+                        "record_ids": record_ids,
+                        "last_modified": datetime.fromtimestamp(file_mtime).strftime('%Y-%m-%d %H:%M:%S')
+                    }
+                })
+                asyncio.run_coroutine_threadsafe(manager.send_message(message), loop)
+
+            self.file_tracker.add_listener(push_notification)
+        self.file_tracker.start()
@@ -37,11 +37,16 @@ agent = AssistantAgent(
     model_client_stream=True,
 )
 
-geoFileAgent = AssistantAgent(
-    name="GeoFileReader",
-    model_client=model_client,
-    system_message="你是文件理解器，你会收到一条条文件地址，你的工作是使用文件阅读工具，结合地理信息领域的知识，精确且结构化的描述地理数据，一定要陈述其绝对文件路径。遇到经纬度的范围时，可以适当补充其大致位置信息，使用markdown格式，不要有多余的输出。",
-    tools=[read_tool],
-    reflect_on_tool_use=True,
-    model_client_stream=True,
-)
+def create_geo_file_agent() -> AssistantAgent:
+    """创建文件理解智能体，后台重建索引时每个任务使用独立的实例，不与交互请求共用对话上下文"""
+    return AssistantAgent(
+        name="GeoFileReader",
+        model_client=model_client,
+        system_message="你是文件理解器，你会收到一条条文件地址，你的工作是使用文件阅读工具，结合地理信息领域的知识，精确且结构化的描述地理数据，一定要陈述其绝对文件路径。遇到经纬度的范围时，可以适当补充其大致位置信息，使用markdown格式，不要有多余的输出。",
+        tools=[read_tool],
+        reflect_on_tool_use=True,
+        model_client_stream=True,
+    )
+
+
+geoFileAgent = create_geo_file_agent()
@@ -0,0 +1,41 @@
+# backend/api_models.py
+"""
+HTTP接口的请求模型
+
+请求参数在此校验，不合法时FastAPI直接返回422，不会进入记忆库的处理逻辑
+"""
+from typing import Optional, Dict, Any, List, Literal, Tuple
+
+from pydantic import BaseModel, field_validator
+
+
+class MemoryContent(BaseModel):
+    content: str
+    metadata: Optional[Dict[str, Any]] = None
+    filepath: Optional[str] = None
+
+
+class MemoryBatch(BaseModel):
+    items: List[MemoryContent]
+
+
+class DeleteRequest(BaseModel):
+    content_id: Optional[str] = None
+    content: Optional[str] = None
+    metadata_filter: Optional[Dict[str, Any]] = None
+    filepath: Optional[str] = None
+
+
+class QueryRequest(BaseModel):
+    query: str
+    n_results: Optional[int] = 5
+    mode: Optional[Literal["vector", "lexical", "hybrid"]] = None
+    bbox: Optional[Tuple[float, float, float, float]] = None
+
+    @field_validator("bbox")
+    @classmethod
+    def check_bbox(cls, bbox):
+        # 范围必须为 [min_lon, min_lat, max_lon, max_lat]，不合法时返回422
+        if bbox is not None and (bbox[0] > bbox[2] or bbox[1] > bbox[3]):
+            raise ValueError("bbox 应为 [min_lon, min_lat, max_lon, max_lat]，且最小值不大于最大值")
+        return bbox
@@ -1,7 +1,7 @@
 # chat_handler.py
 from typing import AsyncGenerator
 
-from agent_config import agent,geoFileAgent
+from agent_config import agent,geoFileAgent,create_geo_file_agent
 import json
 async def handle_chat(q: str) -> str:
     result = await agent.run(task=q)  # 使用 await 调用 run 方法
@@ -14,4 +14,10 @@ async def handle_readGeoFile(q: str) -> str:
     result = await geoFileAgent.run(task=q)  # 使用 await 调用 run 方法
     final_response = result.messages[-1].content  # 获取最终响应消息
     print(result)
-    return final_response
\ No newline at end of file
+    return final_response
+
+
+async def handle_reindexGeoFile(q: str) -> str:
+    # 后台重建索引可能并发执行，每个任务使用新的智能体，对话上下文互不干扰，也不会累积到交互请求的上下文中
+    result = await create_geo_file_agent().run(task=q)
+    return result.messages[-1].content
\ No newline at end of file
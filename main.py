@@ -1,23 +1,36 @@
 # backend/main.py
 import multiprocessing
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from chat_handler import handle_chat,handle_readGeoFile
 from connection_manager import manager
 from fastapi.responses import StreamingResponse
 import uvicorn
-from agent_config import agent
-from Vector_DB_Memory import VectorDBMemory
-from pydantic import BaseModel
 from typing import Optional, Dict, Any
+from api_models import MemoryContent, MemoryBatch, DeleteRequest, QueryRequest
 import logging
 import sys
 import traceback
+import json
 from datetime import datetime
 
+with open('config.json', 'r', encoding='utf-8') as configFile:
+    config = json.load(configFile)
+
+
+def create_app() -> FastAPI:
+    """
+    创建应用，同时创建智能体、记忆库和后台任务
+
+    文件解析进程池以spawn方式启动，工作进程会以 __mp_main__ 的名义重新导入本模块，
+    因此这些对象只在此处创建，模块顶层只在非工作进程中调用，避免每个工作进程重复打开向量库
+    """
+    from chat_handler import handle_chat, handle_readGeoFile, handle_reindexGeoFile
+    from agent_config import agent
+    from Vector_DB_Memory import VectorDBMemory
+    from VectorDB.ReindexWorker import ReindexWorker
+    from GeoFile.Processors.DataInputProcessor import FileProcessorFactory, profile_cache, worker_pool
 
-try:
     app = FastAPI()
 
     # CORS 中间件设置
@@ -67,10 +80,33 @@ try:
 
     GeoFileMemory = VectorDBMemory(collection_name="GeoFile")
 
-    class MemoryContent(BaseModel):
-        content: str
-        metadata: Optional[Dict[str, Any]] = None
-        filepath: Optional[str] = None
+    # 已修改文件的后台重建索引任务：重新生成文件画像，必要时由GeoFileReader重新描述
+    reindex_worker = ReindexWorker(
+        GeoFileMemory,
+        profile=FileProcessorFactory.create_processor,
+        describe=handle_reindexGeoFile,
+        concurrency=config.get("重建索引并发数", 2),
+        max_retries=config.get("重建索引最大重试次数", 3)
+    )
+
+    @app.on_event("startup")
+    async def start_memory_watcher():
+        # 后台监控已入库文件的变化，变化的文件自动进入重建索引队列
+        if config.get("自动重建索引", True):
+            reindex_worker.start()
+            GeoFileMemory.file_tracker.add_listener(reindex_worker.submit_threadsafe)
+        GeoFileMemory.start_file_watcher()
+
+    @app.on_event("shutdown")
+    async def stop_worker_pool():
+        # 关闭文件解析进程池，画像缓存中尚未落盘的使用顺序写入磁盘
+        worker_pool.shutdown()
+        profile_cache.close()
+
+    @app.get("/reindex_status")
+    async def reindex_status():
+        """查询后台重建索引任务的状态"""
+        return {"status": "success", **reindex_worker.status()}
 
     @app.post("/add_memory")
     async def add_memory(content: MemoryContent):
@@ -78,25 +114,43 @@ try:
         await GeoFileMemory.add(content, content.filepath)
         return {"status": "success", "message": "内容已成功添加到向量数据库"}
 
+    @app.post("/add_memory_batch")
+    async def add_memory_batch(batch: MemoryBatch):
+        """
+        批量添加内容到向量数据库
+        返回每条内容的处理状态
+        """
+        results = await GeoFileMemory.add_many(
+            batch.items,
+            [item.filepath for item in batch.items]
+        )
+        failed = sum(1 for item in results if item["status"] == "error")
+        return {
+            "status": "success" if failed == 0 else "partial",
+            "total": len(results),
+            "failed": failed,
+            "results": results
+        }
+
 
     @app.get("/get_memory")
-    async def get_memory(page: int = 1,page_size: int = 100,metadata_filter: Optional[Dict[str, Any]] = None):
-        result = await GeoFileMemory.get_paginated_data(page=page,page_size=page_size,metadata_filter=metadata_filter)
+    async def get_memory(page: int = 1,page_size: int = 100,metadata_filter: Optional[Dict[str, Any]] = None,cursor: Optional[str] = None):
+        try:
+            result = await GeoFileMemory.get_paginated_data(page=page,page_size=page_size,metadata_filter=metadata_filter,cursor=cursor)
+        except ValueError as e:
+            # 游标格式不正确（被篡改或截断）
+            raise HTTPException(status_code=400, detail=str(e))
         return result
 
-    class DeleteRequest(BaseModel):
-        content_id: Optional[str] = None
-        content: Optional[str] = None
-        metadata_filter: Optional[Dict[str, Any]] = None
-
     @app.post("/delete_memory")
     async def delete_memory(request: DeleteRequest):
         """
         删除向量数据库中的内容
-        支持通过以下三种方式之一删除：
+        支持通过以下四种方式之一删除：
         1. content_id: 通过ID删除
         2. content: 通过内容删除
         3. metadata_filter: 通过元数据条件删除
+        4. filepath: 删除文件对应的全部记录（包括整组分块）
         """
         if request.content_id:
             await GeoFileMemory.delete_by_id(request.content_id)
@@ -107,8 +161,11 @@ try:
         elif request.metadata_filter:
             await GeoFileMemory.delete_by_metadata(request.metadata_filter)
             return {"status": "success", "message": "已删除匹配元数据条件的内容"}
+        elif request.filepath:
+            await GeoFileMemory.delete_by_filepath(request.filepath)
+            return {"status": "success", "message": f"已删除文件 {request.filepath} 的全部记录"}
         else:
-            return {"status": "error", "message": "请提供content_id、content或metadata_filter中的至少一个参数"}
+            return {"status": "error", "message": "请提供content_id、content、metadata_filter或filepath中的至少一个参数"}
 
     @app.get("/clear_memory")
     async def clear_memory_get():
@@ -128,9 +185,11 @@ try:
             "modified_data": result.get("modified_data", [])
         }
 
-    class QueryRequest(BaseModel):
-        query: str
-        n_results: Optional[int] = 5
+    @app.get("/memory_stats")
+    async def memory_stats():
+        """获取记忆库的元数据统计信息"""
+        result = await GeoFileMemory.get_memory_stats()
+        return {"status": "success", **result}
 
     @app.post("/query_memory")
     async def query_memory(request: QueryRequest):
@@ -140,10 +199,14 @@ try:
         Args:
             query: 查询文本
             n_results: 返回结果数量，默认5条
+            mode: 检索模式 vector（向量）/ lexical（BM25，无需计算向量）/ hybrid（混合），默认读取配置
+            bbox: 空间范围 [min_lon, min_lat, max_lon, max_lat]，只返回范围与之相交的数据
         """
         result = await GeoFileMemory.query(
             query=request.query,
-            n_results=request.n_results
+            n_results=request.n_results,
+            mode=request.mode,
+            bbox=request.bbox
         )
         return {
             "status": "success",
@@ -156,20 +219,33 @@ try:
             ]
         }
 
-    # 启动服务
-    if __name__ == "__main__":
-        multiprocessing.freeze_support()
-        try:
-            logging.info("Starting server...")
-            uvicorn.run(app, host="127.0.0.1", port=8000)
-        except Exception as e:
-            logging.error(f"Server error: {str(e)}")
-            logging.error(traceback.format_exc())
-            input("Press Enter to exit...")  # 保持窗口打开
-except Exception as e:
-    logging.error(f"Application error: {str(e)}")
-    logging.error(traceback.format_exc())
-    input("Press Enter to exit...")  # 保持窗口打开
+    return app
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+
+# 模块级应用，供 uvicorn main:app 等方式导入；文件解析进程以 __mp_main__ 的名义重新导入时不创建
+if __name__ != "__mp_main__":
+    try:
+        app = create_app()
+    except Exception as e:
+        logging.error(f"Application error: {str(e)}")
+        logging.error(traceback.format_exc())
+        if __name__ != "__main__":
+            raise
+        input("Press Enter to exit...")  # 保持窗口打开
+        sys.exit(1)
+
+# 启动服务
+if __name__ == "__main__":
+    try:
+        logging.info("Starting server...")
+        uvicorn.run(app, host="127.0.0.1", port=8000)
+    except Exception as e:
+        logging.error(f"Server error: {str(e)}")
+        logging.error(traceback.format_exc())
+        input("Press Enter to exit...")  # 保持窗口打开
 
 
 import backoff
\ No newline at end of file
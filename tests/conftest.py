@@ -0,0 +1,13 @@
+# tests/conftest.py
+"""
+测试公共配置
+
+各模块导入时按相对路径读取config.json，测试在项目根目录下运行
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(ROOT)
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
@@ -0,0 +1,54 @@
+# tests/test_api_models.py
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from api_models import QueryRequest
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+
+    @app.post("/query_memory")
+    async def query_memory(request: QueryRequest):
+        return request.model_dump()
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("mode", [None, "vector", "lexical", "hybrid"])
+def test_query_accepts_supported_modes(mode):
+    assert QueryRequest(query="道路", mode=mode).mode == mode
+
+
+def test_query_rejects_unknown_mode():
+    with pytest.raises(ValidationError):
+        QueryRequest(query="道路", mode="fuzzy")
+
+
+def test_query_accepts_valid_bbox():
+    request = QueryRequest(query="道路", bbox=[110, 20, 120, 30])
+    assert request.bbox == (110, 20, 120, 30)
+
+
+@pytest.mark.parametrize("bbox", [
+    [110, 20, 120],
+    [110, 20, 120, 30, 40],
+    [120, 20, 110, 30],
+    [110, 30, 120, 20],
+    ["a", 20, 120, 30],
+])
+def test_query_rejects_invalid_bbox(bbox):
+    with pytest.raises(ValidationError):
+        QueryRequest(query="道路", bbox=bbox)
+
+
+@pytest.mark.parametrize("body", [
+    {"query": "道路", "mode": "fuzzy"},
+    {"query": "道路", "bbox": [120, 20, 110, 30]},
+    {"query": "道路", "bbox": [1, 2, 3]},
+])
+def test_invalid_query_returns_422(client, body):
+    assert client.post("/query_memory", json=body).status_code == 422
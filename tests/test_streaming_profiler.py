@@ -0,0 +1,74 @@
+# tests/test_streaming_profiler.py
+import pandas as pd
+import pytest
+from pandas.errors import ParserError
+
+from GeoFile.Tools.DataInputTools import classify_field_type
+from GeoFile.Tools.StreamingProfiler import profile_csv
+
+ENGINES = ["pyarrow", "c"]
+
+# 列名 -> 各行取值，覆盖Python数值解析比pandas宽松的写法
+COLUMNS = {
+    "plain_int": ["1", "22"],
+    "padded_int": [" 12 ", "3"],
+    "float": ["1e5", ".5"],
+    "infinity": ["Infinity", "-inf"],
+    "underscore": ["1_000", "2"],
+    "arabic_digits": ["١٢", "3"],
+    "fullwidth_digits": ["１２", "1"],
+    "hex": ["0x10", "1"],
+    "text": ["道路", "河流"],
+}
+
+
+def write_csv(path, columns: dict) -> str:
+    rows = zip(*columns.values())
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(",".join(columns) + "\n")
+        for row in rows:
+            file.write(",".join(f'"{value}"' for value in row) + "\n")
+    return str(path)
+
+
+def whole_file_type(frame: pd.DataFrame, col: str) -> str:
+    field_type = classify_field_type(frame[col].dtype, frame[col])
+    # 流式画像不区分Float和Double
+    return "Double" if field_type == "Float" else field_type
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_field_types_match_whole_file_read(tmp_path, engine):
+    path = write_csv(tmp_path / "data.csv", COLUMNS)
+    frame = pd.read_csv(path, engine="python")
+    table = profile_csv(path, engine=engine)
+    for col in COLUMNS:
+        assert table.profiles[col].field_type() == whole_file_type(frame, col), col
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_large_integers_keep_exact_bounds(tmp_path, engine):
+    values = [str(2 ** 53 + 1), str(2 ** 62), "-5"]
+    path = write_csv(tmp_path / "data.csv", {"id": values})
+    stats = profile_csv(path, engine=engine).profiles["id"].stats()
+    assert stats["min"] == -5
+    assert stats["max"] == 2 ** 62
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_ragged_rows_raise_whole_file_parser_error(tmp_path, engine):
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\n1,2\n3,4,5\n", encoding="utf-8")
+    with pytest.raises(ParserError, match=r"^Expected 2 fields in line 3, saw 3$"):
+        profile_csv(str(path), engine=engine)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_chunked_read_counts_rows_and_nulls(tmp_path, engine):
+    values = [str(i) if i % 10 else "" for i in range(1, 1001)]
+    path = write_csv(tmp_path / "data.csv", {"value": values})
+    table = profile_csv(path, engine=engine, chunksize=64, block_size=256)
+    profile = table.profiles["value"]
+    assert table.rows == 1000
+    assert profile.nulls == 100
+    assert profile.stats()["max"] == 999
@@ -0,0 +1,134 @@
+# tests/test_vector_db_memory.py
+import asyncio
+import hashlib
+import itertools
+
+import pytest
+from autogen_core.memory import MemoryContent
+
+import Vector_DB_Memory
+from Vector_DB_Memory import VectorDBMemory
+from VectorDB.DocumentChunker import DocumentChunker
+from VectorDB.EmbeddingProviders import BaseEmbeddingProvider
+
+
+class HashEmbeddingProvider(BaseEmbeddingProvider):
+    """按文本哈希生成确定的向量，不访问网络"""
+
+    NAME = "test"
+
+    def __init__(self):
+        super().__init__(model="hash", dimensions=8, batch_size=16)
+
+    async def embed(self, texts):
+        return [[byte / 255 + 0.01 for byte in hashlib.sha256(text.encode()).digest()[:8]] for text in texts]
+
+
+@pytest.fixture
+def memory(tmp_path, monkeypatch):
+    monkeypatch.setitem(Vector_DB_Memory.config, "向量数据库路径", str(tmp_path))
+    memory = VectorDBMemory(collection_name="testing", embedding_provider=HashEmbeddingProvider())
+    yield memory
+    asyncio.run(memory.close())
+
+
+def contents(count: int, prefix: str = "记录", **metadata):
+    return [
+        MemoryContent(content=f"{prefix} {i} 第{i}条测试数据 {'x' * i}", mime_type="text/plain", metadata=dict(metadata))
+        for i in range(count)
+    ]
+
+
+def test_add_many_empty_batch(memory):
+    assert asyncio.run(memory.add_many([])) == []
+
+
+def test_add_many_all_files_missing(memory):
+    statuses = asyncio.run(memory.add_many(contents(2), ["missing_a.shp", "missing_b.shp"]))
+    assert [status["status"] for status in statuses] == ["error", "error"]
+    assert memory.collection.count() == 0
+
+
+def test_add_many_in_batch_duplicates(memory):
+    items = contents(1) + contents(1)
+    statuses = asyncio.run(memory.add_many(items))
+    assert [status["status"] for status in statuses] == ["success", "skipped"]
+    assert memory.collection.count() == 1
+
+
+def test_add_many_existing_content_updates_metadata(memory):
+    asyncio.run(memory.add_many(contents(1)))
+    statuses = asyncio.run(memory.add_many(contents(1, source="again")))
+    assert statuses[0]["message"] == "内容已存在，已更新元数据"
+    assert memory.collection.get(include=["metadatas"])["metadatas"][0]["source"] == "again"
+
+
+def test_add_many_only_chunked(memory):
+    memory.chunker = DocumentChunker(max_tokens=20)
+    item = MemoryContent(content="# 标题\n\n" + "道路数据 " * 200, mime_type="text/plain", metadata={})
+    statuses = asyncio.run(memory.add_many([item]))
+    assert statuses[0]["status"] == "success"
+    assert memory.collection.count() > 1
+
+
+def test_add_many_splits_writes_at_max_batch_size(memory, monkeypatch):
+    monkeypatch.setattr(memory.client, "get_max_batch_size", lambda: 4)
+    statuses = asyncio.run(memory.add_many(contents(10)))
+    assert all(status["status"] == "success" for status in statuses)
+    assert memory.collection.count() == 10
+
+
+def test_cursor_pagination_walks_every_record_once(memory, monkeypatch):
+    # 每3条记录共用一个写入时间，检验同一时刻的记录按ID翻页时不遗漏、不重复
+    ticks = itertools.count()
+    monkeypatch.setattr(Vector_DB_Memory.time, "time", lambda: 1_700_000_000 + next(ticks) // 3)
+    asyncio.run(memory.add_many(contents(25)))
+
+    stored = memory.collection.get(include=["metadatas"])
+    expected = [
+        record_id for _, record_id in
+        sorted(((metadata["created_at"], record_id) for record_id, metadata in
+                zip(stored["ids"], stored["metadatas"])), reverse=True)
+    ]
+
+    async def walk():
+        first = await memory.get_paginated_data(page=1, page_size=4)
+        seen = [item["metadata"]["created_at"] for item in first["data"]]
+        cursor, pages = first["next_cursor"], 1
+        while cursor:
+            page = await memory.get_paginated_data(page_size=4, cursor=cursor)
+            seen.extend(item["metadata"]["created_at"] for item in page["data"])
+            cursor, pages = page["next_cursor"], pages + 1
+        return seen, pages
+
+    seen, pages = asyncio.run(walk())
+    assert len(seen) == len(expected) == 25
+    assert seen == sorted(seen, reverse=True)
+    assert pages == 7
+
+
+def test_cursor_pagination_accepts_bare_timestamp(memory):
+    asyncio.run(memory.add_many(contents(3)))
+    page = asyncio.run(memory.get_paginated_data(page_size=10, cursor="9999999999"))
+    assert len(page["data"]) == 3
+
+
+@pytest.mark.parametrize("cursor", ["abc", "nan", "inf", "1|x|0", "1|x|-5", "1|x|y", "1|a|2|3"])
+def test_invalid_cursor_raises_value_error(memory, cursor):
+    with pytest.raises(ValueError, match="无效的分页游标"):
+        asyncio.run(memory.get_paginated_data(cursor=cursor))
+
+
+def test_invalid_search_mode_raises_value_error(memory):
+    with pytest.raises(ValueError, match="不支持的检索模式"):
+        asyncio.run(memory._search("道路", 5, mode="fuzzy"))
+
+
+@pytest.mark.parametrize("mode", ["lexical", "hybrid"])
+def test_lexical_search_applies_filter_beyond_top_candidates(memory, mode):
+    common = contents(300, prefix="道路 road", type="common")
+    rare = contents(2, prefix="道路 road 稀有", type="rare")
+    asyncio.run(memory.add_many(common + rare))
+    hits = asyncio.run(memory._search("道路 road", 5, {"type": "rare"}, mode))
+    assert len(hits) == 2
+    assert {hit[2]["type"] for hit in hits} == {"rare"}
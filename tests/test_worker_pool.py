@@ -0,0 +1,89 @@
+# tests/test_worker_pool.py
+import asyncio
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from GeoFile.Processors.WorkerPool import WorkerPool
+
+
+def square(value):
+    return value * value
+
+
+def sleep_and_return(seconds, value):
+    time.sleep(seconds)
+    return value
+
+
+def crash():
+    os._exit(1)
+
+
+def fail():
+    raise RuntimeError("任务自身的错误")
+
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool(max_workers=2, timeout=30)
+    yield pool
+    pool.shutdown()
+
+
+def test_run_returns_result(pool):
+    assert asyncio.run(pool.run(square, 7)) == 49
+
+
+def test_job_errors_are_raised_unchanged(pool):
+    with pytest.raises(RuntimeError, match="任务自身的错误"):
+        asyncio.run(pool.run(fail))
+
+
+def test_timeout_raises_and_pool_recovers(pool):
+    async def scenario():
+        with pytest.raises(TimeoutError):
+            await pool.run(sleep_and_return, 10, None, timeout=1)
+        return await pool.run(square, 3)
+
+    assert asyncio.run(scenario()) == 9
+
+
+def test_timeout_does_not_fail_other_running_jobs(pool):
+    async def scenario():
+        return await asyncio.gather(
+            pool.run(sleep_and_return, 10, None, timeout=1),
+            pool.run(sleep_and_return, 2, "完成"),
+            return_exceptions=True
+        )
+
+    timed_out, survivor = asyncio.run(scenario())
+    assert isinstance(timed_out, TimeoutError)
+    assert survivor == "完成"
+
+
+def test_crash_is_reported_only_for_the_crashing_job(pool):
+    async def scenario():
+        return await asyncio.gather(
+            pool.run(crash),
+            pool.run(sleep_and_return, 2, "完成"),
+            return_exceptions=True
+        )
+
+    crashed, survivor = asyncio.run(scenario())
+    assert isinstance(crashed, BrokenProcessPool)
+    assert survivor == "完成"
+
+
+def test_cancelled_job_terminates_and_pool_recovers(pool):
+    async def scenario():
+        task = asyncio.ensure_future(pool.run(sleep_and_return, 10, None))
+        await asyncio.sleep(2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return await pool.run(square, 4)
+
+    assert asyncio.run(scenario()) == 16